@@ -2,25 +2,40 @@ from typing import Generator
 from app.services.cnn_service import CNNService
 from app.services.filter_service import FilterService
 from app.core.config import get_settings
+from app.core.metrics import create_stage_timer
 
 
 _cnn_service: CNNService = None
 _filter_service: FilterService = None
+_stage_timing_enabled: bool = True
 
 
 def initialize_services() -> None:
-    global _cnn_service, _filter_service
+    global _cnn_service, _filter_service, _stage_timing_enabled
     settings = get_settings()
+    _stage_timing_enabled = settings.stage_timing_enabled
     
     _cnn_service = CNNService(
         cnn_model_path=settings.cnn_model_path,
         image_size=settings.image_size,
-        num_classes=settings.num_classes
+        num_classes=settings.num_classes,
+        backend=settings.inference_backend,
+        numpy_model_path=settings.numpy_model_path,
+        thread_profile=settings.tf_thread_profile,
+        intra_op_threads=settings.tf_intra_op_threads,
+        inter_op_threads=settings.tf_inter_op_threads,
+        model_variant=settings.model_variant,
+        student_model_path=settings.student_model_path,
+        student_numpy_model_path=settings.student_numpy_model_path
     )
     
     _filter_service = FilterService()
 
 
+def services_initialized() -> bool:
+    return _cnn_service is not None and _filter_service is not None
+
+
 def get_cnn_service() -> Generator[CNNService, None, None]:
     if _cnn_service is None:
         raise RuntimeError("CNN service not initialized")
@@ -30,4 +45,8 @@ def get_cnn_service() -> Generator[CNNService, None, None]:
 def get_filter_service() -> Generator[FilterService, None, None]:
     if _filter_service is None:
         raise RuntimeError("Filter service not initialized")
-    yield _filter_service
\ No newline at end of file
+    yield _filter_service
+
+
+def get_stage_timer():
+    return create_stage_timer(_stage_timing_enabled)
@@ -7,8 +7,10 @@ from fastapi import (
     Depends, 
     UploadFile, 
     File,
-    Form
+    Form,
+    Response
 )
+from fastapi.responses import JSONResponse
 from PIL import Image
 
 from app.schemas.models import (
@@ -19,8 +21,13 @@ from app.schemas.models import (
 )
 from app.services.cnn_service import CNNService
 from app.services.filter_service import FilterService
-from app.api.dependencies import get_cnn_service, get_filter_service
+from app.api.dependencies import (
+    get_cnn_service,
+    get_filter_service,
+    get_stage_timer
+)
 from app.core.config import get_settings
+from app.core.metrics import render_metrics
 
 
 logger = logging.getLogger(__name__)
@@ -77,7 +84,8 @@ async def classify_image(
     file: UploadFile = File(...),
     filter_name: str = Form("none"),
     cnn_service: CNNService = Depends(get_cnn_service),
-    filter_service: FilterService = Depends(get_filter_service)
+    filter_service: FilterService = Depends(get_filter_service),
+    timer=Depends(get_stage_timer)
 ):
     logger.info(f"Classification request with filter: {filter_name}")
     
@@ -89,30 +97,50 @@ async def classify_image(
         )
     
     try:
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
-        logger.info(
-            f"Image loaded: size={image.size}, mode={image.mode}"
-        )
-        
-        if filter_name != "none":
-            image = filter_service.apply_filter(image, filter_name)
-            logger.info(f"Filter '{filter_name}' applied")
+        with timer.stage("total"):
+            with timer.stage("read"):
+                contents = await file.read()
+            
+            with timer.stage("decode"):
+                image = Image.open(io.BytesIO(contents))
+                image.load()
+            
+            logger.info(
+                f"Image loaded: size={image.size}, mode={image.mode}"
+            )
+            
+            if filter_name != "none":
+                with timer.stage("filter"):
+                    image = filter_service.apply_filter(image, filter_name)
+                logger.info(f"Filter '{filter_name}' applied")
+            
+            prediction_result = cnn_service.predict(image, timer=timer)
+            
+            with timer.stage("serialize"):
+                classification = ClassificationResponse(
+                    predicted_class=prediction_result["predicted_class"],
+                    confidence=prediction_result["confidence"],
+                    probabilities=prediction_result["probabilities"],
+                    filter_applied=filter_name
+                )
+                response = JSONResponse(content=classification.model_dump())
         
-        prediction_result = cnn_service.predict(image)
+        if timer.enabled:
+            timer.observe()
+            response.headers["Server-Timing"] = timer.server_timing()
         
         logger.info("Classification completed successfully")
-        return ClassificationResponse(
-            predicted_class=prediction_result["predicted_class"],
-            confidence=prediction_result["confidence"],
-            probabilities=prediction_result["probabilities"],
-            filter_applied=filter_name
-        )
+        return response
     
     except Exception as error:
         logger.error(f"Error during classification: {error}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Classification failed: {str(error)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/metrics", tags=["Monitoring"])
+async def get_metrics():
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
@@ -15,6 +15,19 @@ class Settings(BaseSettings):
     image_size: int = 28
     num_classes: int = 10
     
+    inference_backend: str = "tensorflow"
+    numpy_model_path: str = "models/mnist_cnn_weights.npz"
+    model_variant: str = "default"
+    student_model_path: str = "models/mnist_cnn_student.keras"
+    student_numpy_model_path: str = "models/mnist_cnn_student_weights.npz"
+    workers: int = 1
+    
+    tf_thread_profile: str = ""
+    tf_intra_op_threads: int = 0
+    tf_inter_op_threads: int = 0
+    
+    stage_timing_enabled: bool = True
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=False,
@@ -0,0 +1,94 @@
+import os
+import time
+from contextlib import nullcontext
+from typing import Dict, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+
+STAGE_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+CLASSIFY_STAGE_SECONDS = Histogram(
+    "cnn_classify_stage_seconds",
+    "Time spent in each stage of a /classify request",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+
+
+class _Stage:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer: "StageTimer", name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = time.perf_counter() - self.start
+        durations = self.timer.durations
+        durations[self.name] = durations.get(self.name, 0.0) + elapsed
+        return False
+
+
+class StageTimer:
+    enabled = True
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def observe(self, histogram: Histogram = CLASSIFY_STAGE_SECONDS) -> None:
+        for name, seconds in self.durations.items():
+            histogram.labels(stage=name).observe(seconds)
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.3f}"
+            for name, seconds in self.durations.items()
+        )
+
+
+class NullStageTimer:
+    enabled = False
+    durations: Dict[str, float] = {}
+
+    _context = nullcontext()
+
+    def stage(self, name: str) -> nullcontext:
+        return self._context
+
+    def observe(self, histogram: Histogram = CLASSIFY_STAGE_SECONDS) -> None:
+        pass
+
+    def server_timing(self) -> str:
+        return ""
+
+
+NULL_STAGE_TIMER = NullStageTimer()
+
+
+def create_stage_timer(enabled: bool):
+    return StageTimer() if enabled else NULL_STAGE_TIMER
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
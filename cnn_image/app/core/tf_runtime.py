@@ -0,0 +1,93 @@
+import os
+import math
+import logging
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+THREAD_PROFILES = ("latency", "throughput")
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    cpu_max = Path("/sys/fs/cgroup/cpu.max")
+    try:
+        quota, period = cpu_max.read_text().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return max(1, cpus)
+
+
+def resolve_thread_counts(
+    profile: Optional[str],
+    intra_op_threads: int = 0,
+    inter_op_threads: int = 0,
+    cpus: Optional[int] = None
+) -> Tuple[int, int]:
+    if profile and profile not in THREAD_PROFILES:
+        raise ValueError(
+            f"Unknown TensorFlow thread profile '{profile}'. "
+            f"Expected one of {THREAD_PROFILES}"
+        )
+
+    cpus = cpus or available_cpus()
+
+    if profile == "latency":
+        intra, inter = cpus, 1
+    elif profile == "throughput":
+        intra, inter = 1, cpus
+    else:
+        intra, inter = 0, 0
+
+    if intra_op_threads > 0:
+        intra = intra_op_threads
+    if inter_op_threads > 0:
+        inter = inter_op_threads
+
+    return intra, inter
+
+
+def configure_tensorflow_threads(
+    profile: Optional[str],
+    intra_op_threads: int = 0,
+    inter_op_threads: int = 0
+) -> Tuple[int, int]:
+    intra, inter = resolve_thread_counts(
+        profile,
+        intra_op_threads,
+        inter_op_threads
+    )
+    if intra == 0 and inter == 0:
+        logger.info("Using TensorFlow default thread pools")
+        return intra, inter
+
+    import tensorflow as tf
+
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra)
+        tf.config.threading.set_inter_op_parallelism_threads(inter)
+    except RuntimeError as error:
+        logger.warning(
+            f"TensorFlow runtime already initialized, thread settings "
+            f"not applied: {error}"
+        )
+        return (
+            tf.config.threading.get_intra_op_parallelism_threads(),
+            tf.config.threading.get_inter_op_parallelism_threads()
+        )
+
+    logger.info(
+        f"TensorFlow threads configured: profile={profile or 'custom'}, "
+        f"intra_op={intra}, inter_op={inter}"
+    )
+    return intra, inter
@@ -6,7 +6,7 @@ from fastapi.responses import JSONResponse
 from app.core.config import get_settings
 from app.core.logging_config import setup_logging
 from app.api.routes import router
-from app.api.dependencies import initialize_services
+from app.api.dependencies import initialize_services, services_initialized
 
 
 settings = get_settings()
@@ -19,8 +19,11 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.service_name} service")
     
     try:
-        initialize_services()
-        logger.info("Services initialized successfully")
+        if services_initialized():
+            logger.info("Using services preloaded by the parent process")
+        else:
+            initialize_services()
+            logger.info("Services initialized successfully")
     except Exception as error:
         logger.error(f"Failed to initialize services: {error}")
         logger.warning("Service will start but model may not be available")
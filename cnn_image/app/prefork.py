@@ -0,0 +1,177 @@
+import gc
+import os
+import sys
+import shutil
+import signal
+import socket
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, Tuple
+
+import uvicorn
+
+from app.core.config import get_settings
+from app.core.logging_config import setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+
+FORK_SAFE_BACKENDS = ("numpy",)
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def prepare_metrics_dir() -> Tuple[Path, bool]:
+    """Empties PROMETHEUS_MULTIPROC_DIR (or creates a temporary one).
+
+    prometheus_client reads the variable when it is imported, so this has
+    to run first. Returns the directory and whether it was created here.
+    """
+    configured = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if configured is None:
+        path = Path(tempfile.mkdtemp(prefix="cnn_image_metrics_"))
+    else:
+        path = Path(configured)
+        path.mkdir(parents=True, exist_ok=True)
+        for stale in path.glob("*.db"):
+            stale.unlink()
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(path)
+    return path, configured is None
+
+
+def _run_worker(app, sock: socket.socket, log_level: str) -> None:
+    config = uvicorn.Config(
+        app,
+        log_level=log_level.lower(),
+        lifespan="on"
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def _spawn_worker(app, sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        exit_code = 0
+        try:
+            _run_worker(app, sock, log_level)
+        except Exception as error:
+            logger.error(f"Worker {os.getpid()} crashed: {error}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+    return pid
+
+
+def serve(host: str, port: int, workers: int) -> None:
+    settings = get_settings()
+    setup_logging(settings.service_name, settings.log_level)
+
+    if settings.inference_backend not in FORK_SAFE_BACKENDS:
+        raise RuntimeError(
+            f"Pre-fork mode requires one of {FORK_SAFE_BACKENDS} as "
+            f"INFERENCE_BACKEND, got '{settings.inference_backend}'. "
+            "TensorFlow runtimes are not fork-safe."
+        )
+
+    # Each worker writes its samples to files in this directory and
+    # /metrics merges them, instead of reporting only the worker that
+    # happened to accept the scrape.
+    metrics_dir, owns_metrics_dir = prepare_metrics_dir()
+
+    from prometheus_client import multiprocess
+
+    from app.api.dependencies import (
+        initialize_services,
+        services_initialized
+    )
+    from app.main import app
+
+    initialize_services()
+    if not services_initialized():
+        raise RuntimeError("Services could not be initialized")
+
+    # Objects created so far are never collected again, so the collector
+    # does not dirty their pages after fork.
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind_socket(host, port)
+    logger.info(
+        f"Model loaded in parent {os.getpid()}, forking {workers} workers "
+        f"on {host}:{port}"
+    )
+
+    children: Dict[int, int] = {}
+    for slot in range(workers):
+        children[_spawn_worker(app, sock, settings.log_level)] = slot
+
+    shutting_down = False
+
+    def _shutdown(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is None:
+            continue
+        multiprocess.mark_process_dead(pid)
+        if not shutting_down:
+            logger.warning(
+                f"Worker {pid} exited with status {status}, respawning"
+            )
+            children[_spawn_worker(app, sock, settings.log_level)] = slot
+
+    sock.close()
+    if owns_metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+    logger.info("All workers stopped")
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description=(
+            "Serve cnn_image with workers forked from a parent that "
+            "holds the model weights"
+        )
+    )
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.workers)
+    args = parser.parse_args()
+
+    try:
+        serve(args.host, args.port, args.workers)
+    except RuntimeError as error:
+        logger.error(str(error))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,7 @@ class ErrorResponse(BaseModel):
 
 class ModelInfoResponse(BaseModel):
     model_type: str
+    model_variant: str = "default"
     input_size: str
     num_classes: int
     classes: List[str]
@@ -1,54 +1,120 @@
 import logging
 import numpy as np
 from pathlib import Path
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 from PIL import Image
-import tensorflow as tf
-from tensorflow import keras
+
+from app.core.metrics import NULL_STAGE_TIMER
+from app.core.tf_runtime import configure_tensorflow_threads
+from app.services.numpy_backend import NumpyCNN
 
 logger = logging.getLogger(__name__)
 
 
+SUPPORTED_BACKENDS = ("tensorflow", "numpy")
+MODEL_VARIANTS = ("default", "student")
+
+
+def preprocess_image(image: Image.Image, image_size: int) -> np.ndarray:
+    if image.mode != 'L':
+        image = image.convert('L')
+    
+    image = image.resize((image_size, image_size))
+    
+    image_array = np.array(image)
+    image_array = image_array.astype('float32') / 255.0
+    image_array = np.expand_dims(image_array, axis=-1)
+    image_array = np.expand_dims(image_array, axis=0)
+    
+    return image_array
+
+
 class CNNService:
-    def __init__(self, cnn_model_path: str, image_size: int, num_classes: int):
+    def __init__(
+        self,
+        cnn_model_path: str,
+        image_size: int,
+        num_classes: int,
+        backend: str = "tensorflow",
+        numpy_model_path: str = "models/mnist_cnn_weights.npz",
+        thread_profile: Optional[str] = None,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        model_variant: str = "default",
+        student_model_path: str = "models/mnist_cnn_student.keras",
+        student_numpy_model_path: str = "models/mnist_cnn_student_weights.npz"
+    ):
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(
+                f"Unsupported inference backend '{backend}'. "
+                f"Expected one of {SUPPORTED_BACKENDS}"
+            )
+        if model_variant not in MODEL_VARIANTS:
+            raise ValueError(
+                f"Unsupported model variant '{model_variant}'. "
+                f"Expected one of {MODEL_VARIANTS}"
+            )
+        
+        if model_variant == "student":
+            cnn_model_path = student_model_path
+            numpy_model_path = student_numpy_model_path
+        
+        self.model_variant = model_variant
         self.cnn_model_path = cnn_model_path
+        self.numpy_model_path = numpy_model_path
         self.image_size = image_size
         self.num_classes = num_classes
+        self.backend = backend
+        self.thread_profile = thread_profile
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
         self.model = None
         self.class_names = [str(i) for i in range(num_classes)]
         self._load_model()
     
     def _load_model(self) -> None:
+        model_path = (
+            self.numpy_model_path if self.backend == "numpy"
+            else self.cnn_model_path
+        )
+        
         try:
-            model_file = Path(self.cnn_model_path)
+            model_file = Path(model_path)
             if not model_file.exists():
                 logger.warning(
-                    f"Model file not found at {self.cnn_model_path}. "
+                    f"Model file not found at {model_path}. "
                     "Model needs to be trained first."
                 )
                 return
             
-            self.model = keras.models.load_model(self.cnn_model_path)
-            logger.info(f"Model loaded successfully from {self.cnn_model_path}")
+            if self.backend == "numpy":
+                self.model = NumpyCNN.load(model_path)
+            else:
+                configure_tensorflow_threads(
+                    self.thread_profile,
+                    self.intra_op_threads,
+                    self.inter_op_threads
+                )
+                from tensorflow import keras
+                self.model = keras.models.load_model(model_path)
+            
+            logger.info(
+                f"Model loaded successfully from {model_path} "
+                f"(backend={self.backend}, variant={self.model_variant})"
+            )
         
         except Exception as error:
             logger.error(f"Failed to load model: {error}")
             raise RuntimeError(f"Could not load CNN model: {error}")
     
     def preprocess_image(self, image: Image.Image) -> np.ndarray:
-        if image.mode != 'L':
-            image = image.convert('L')
-        
-        image = image.resize((self.image_size, self.image_size))
-        
-        image_array = np.array(image)
-        image_array = image_array.astype('float32') / 255.0
-        image_array = np.expand_dims(image_array, axis=-1)
-        image_array = np.expand_dims(image_array, axis=0)
-        
-        return image_array
+        return preprocess_image(image, self.image_size)
     
-    def predict(self, image: Image.Image) -> Dict[str, any]:
+    def predict(
+        self,
+        image: Image.Image,
+        timer=NULL_STAGE_TIMER
+    ) -> Dict[str, any]:
         if self.model is None:
             logger.error("Model not loaded, cannot make prediction")
             raise RuntimeError(
@@ -56,9 +122,11 @@ class CNNService:
             )
         
         try:
-            processed_image = self.preprocess_image(image)
+            with timer.stage("preprocess"):
+                processed_image = self.preprocess_image(image)
             
-            predictions = self.model.predict(processed_image, verbose=0)
+            with timer.stage("predict"):
+                predictions = self.model.predict(processed_image, verbose=0)
             predicted_class = np.argmax(predictions[0])
             confidence = float(predictions[0][predicted_class])
             
@@ -82,12 +150,23 @@ class CNNService:
             logger.error(f"Error during prediction: {error}")
             raise RuntimeError(f"Failed to make prediction: {error}")
     
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        if self.model is None:
+            raise RuntimeError(
+                "Model not available. Please train the model first."
+            )
+        
+        return np.asarray(
+            self.model.predict(batch, batch_size=len(batch), verbose=0)
+        )
+    
     def is_available(self) -> bool:
         return self.model is not None
     
     def get_model_info(self) -> Dict[str, any]:
         return {
             "model_type": "CNN for MNIST digit classification",
+            "model_variant": self.model_variant,
             "input_size": f"{self.image_size}x{self.image_size} grayscale",
             "num_classes": self.num_classes,
             "classes": self.class_names,
@@ -0,0 +1,197 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+
+ARCHITECTURE_KEY = "architecture"
+
+
+def _activation(x: np.ndarray, name: str) -> np.ndarray:
+    if name in (None, "linear"):
+        return x
+    if name == "relu":
+        return np.maximum(x, 0.0, out=x)
+    if name == "softmax":
+        x = x - x.max(axis=-1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=-1, keepdims=True)
+        return x
+    raise ValueError(f"Unsupported activation: {name}")
+
+
+def _pad_same(x: np.ndarray, kernel_size: tuple, strides: tuple) -> np.ndarray:
+    pads = []
+    for size, kernel, stride in zip(x.shape[1:3], kernel_size, strides):
+        out = -(-size // stride)
+        total = max((out - 1) * stride + kernel - size, 0)
+        pads.append((total // 2, total - total // 2))
+    return np.pad(x, ((0, 0), pads[0], pads[1], (0, 0)))
+
+
+def _windows(
+    x: np.ndarray,
+    kernel_size: tuple,
+    strides: tuple,
+    padding: str
+) -> np.ndarray:
+    if padding == "same":
+        x = _pad_same(x, kernel_size, strides)
+    windows = sliding_window_view(x, kernel_size, axis=(1, 2))
+    return windows[:, ::strides[0], ::strides[1]]
+
+
+class NumpyCNN:
+    """Keras-free forward pass over weights exported by pipeline.export_numpy.
+
+    Weights are plain read-only NumPy arrays, so a model loaded in a parent
+    process is shared copy-on-write by forked workers.
+    """
+
+    def __init__(self, layers: List[Dict], weights: Dict[str, np.ndarray]):
+        self.layers = layers
+        self.weights = {}
+        for name, array in weights.items():
+            array = np.ascontiguousarray(array, dtype=np.float32)
+            array.setflags(write=False)
+            self.weights[name] = array
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyCNN":
+        with np.load(Path(path), allow_pickle=False) as archive:
+            layers = json.loads(str(archive[ARCHITECTURE_KEY]))
+            weights = {
+                name: archive[name]
+                for name in archive.files
+                if name != ARCHITECTURE_KEY
+            }
+        logger.info(f"NumPy model loaded from {path} ({len(layers)} layers)")
+        return cls(layers, weights)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.weights.values())
+
+    def _weight(self, index: int, name: str) -> np.ndarray:
+        return self.weights[f"layer{index}_{name}"]
+
+    def _conv2d(self, x: np.ndarray, index: int, spec: Dict) -> np.ndarray:
+        kernel = self._weight(index, "kernel")
+        windows = _windows(
+            x,
+            kernel.shape[:2],
+            tuple(spec.get("strides", (1, 1))),
+            spec.get("padding", "valid")
+        )
+        out = np.tensordot(
+            windows,
+            kernel.transpose(2, 0, 1, 3),
+            axes=([3, 4, 5], [0, 1, 2])
+        )
+        if spec.get("use_bias", True):
+            out += self._weight(index, "bias")
+        return out
+
+    def _depthwise(
+        self,
+        x: np.ndarray,
+        kernel: np.ndarray,
+        spec: Dict
+    ) -> np.ndarray:
+        windows = _windows(
+            x,
+            kernel.shape[:2],
+            tuple(spec.get("strides", (1, 1))),
+            spec.get("padding", "valid")
+        )
+        # Channel c with multiplier m lands on output channel c * M + m,
+        # the same order Keras uses.
+        out = np.einsum("nhwcij,ijcm->nhwcm", windows, kernel, optimize=True)
+        return out.reshape(out.shape[:3] + (-1,))
+
+    def _depthwise_conv2d(
+        self,
+        x: np.ndarray,
+        index: int,
+        spec: Dict
+    ) -> np.ndarray:
+        out = self._depthwise(x, self._weight(index, "kernel"), spec)
+        if spec.get("use_bias", True):
+            out += self._weight(index, "bias")
+        return out
+
+    def _separable_conv2d(
+        self,
+        x: np.ndarray,
+        index: int,
+        spec: Dict
+    ) -> np.ndarray:
+        depthwise = self._depthwise(
+            x,
+            self._weight(index, "depthwise_kernel"),
+            spec
+        )
+        out = depthwise @ self._weight(index, "pointwise_kernel")[0, 0]
+        if spec.get("use_bias", True):
+            out += self._weight(index, "bias")
+        return out
+
+    def _max_pooling2d(self, x: np.ndarray, spec: Dict) -> np.ndarray:
+        pool_size = tuple(spec.get("pool_size", (2, 2)))
+        strides = tuple(spec.get("strides") or pool_size)
+        if pool_size == strides and spec.get("padding", "valid") == "valid":
+            n, h, w, c = x.shape
+            ph, pw = pool_size
+            x = x[:, :h - h % ph, :w - w % pw]
+            return x.reshape(n, h // ph, ph, w // pw, pw, c).max(axis=(2, 4))
+        windows = _windows(x, pool_size, strides, spec.get("padding", "valid"))
+        return windows.max(axis=(4, 5))
+
+    def _dense(self, x: np.ndarray, index: int, spec: Dict) -> np.ndarray:
+        out = x @ self._weight(index, "kernel")
+        if spec.get("use_bias", True):
+            out += self._weight(index, "bias")
+        return out
+
+    def forward(self, inputs: np.ndarray) -> np.ndarray:
+        x = np.asarray(inputs, dtype=np.float32)
+        for index, spec in enumerate(self.layers):
+            layer_type = spec["type"]
+            if layer_type == "conv2d":
+                x = self._conv2d(x, index, spec)
+            elif layer_type == "max_pooling2d":
+                x = self._max_pooling2d(x, spec)
+            elif layer_type == "separable_conv2d":
+                x = self._separable_conv2d(x, index, spec)
+            elif layer_type == "depthwise_conv2d":
+                x = self._depthwise_conv2d(x, index, spec)
+            elif layer_type == "global_average_pooling2d":
+                x = x.mean(axis=(1, 2))
+            elif layer_type == "flatten":
+                x = x.reshape(x.shape[0], -1)
+            elif layer_type == "dense":
+                x = self._dense(x, index, spec)
+            elif layer_type == "dropout":
+                continue
+            else:
+                raise ValueError(f"Unsupported layer type: {layer_type}")
+            x = _activation(x, spec.get("activation"))
+        return x
+
+    def predict(
+        self,
+        inputs: np.ndarray,
+        batch_size: Optional[int] = None,
+        verbose: int = 0
+    ) -> np.ndarray:
+        if batch_size is None or len(inputs) <= batch_size:
+            return self.forward(inputs)
+        return np.concatenate([
+            self.forward(inputs[start:start + batch_size])
+            for start in range(0, len(inputs), batch_size)
+        ])
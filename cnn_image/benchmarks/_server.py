@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import subprocess
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def uvicorn_command(port: int, workers: int = 1) -> List[str]:
+    return [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers)
+    ]
+
+
+def wait_until_ready(port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    url = f"http://127.0.0.1:{port}/health"
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if json.loads(response.read()).get("model_loaded"):
+                    return
+        except Exception:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Service on port {port} did not become ready")
+
+
+@contextmanager
+def run_service(
+    command: List[str],
+    port: int,
+    env: Optional[Dict[str, str]] = None,
+    timeout: float = 180.0
+) -> Iterator[subprocess.Popen]:
+    process = subprocess.Popen(
+        command,
+        cwd=SERVICE_DIR,
+        env={**os.environ, "LOG_LEVEL": "WARNING", **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(port, timeout)
+        yield process
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
@@ -0,0 +1,292 @@
+import io
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from PIL import Image
+
+from benchmarks._server import (
+    SERVICE_DIR,
+    free_port,
+    run_service,
+    uvicorn_command
+)
+
+
+DEFAULT_MIX = {
+    "sizes": {"28": 0.6, "64": 0.3, "256": 0.1},
+    "filters": {"none": 0.55, "blur": 0.15, "sharpen": 0.15,
+                "edge_detection": 0.15}
+}
+
+
+def _weighted(choices: Dict[str, float]) -> Tuple[List[str], List[float]]:
+    names = list(choices)
+    return names, [float(choices[name]) for name in names]
+
+
+def build_requests(
+    mix: Dict,
+    count: int,
+    seed: int
+) -> List[Tuple[str, bytes, str]]:
+    rng = random.Random(seed)
+    pixels = np.random.default_rng(seed)
+    sizes, size_weights = _weighted(mix["sizes"])
+    filters, filter_weights = _weighted(mix["filters"])
+
+    payloads = {}
+    for size in sizes:
+        image = Image.fromarray(
+            pixels.integers(0, 255, (int(size), int(size)), dtype=np.uint8)
+        )
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        payloads[size] = buffer.getvalue()
+
+    return [
+        (size, payloads[size], filter_name)
+        for size, filter_name in zip(
+            rng.choices(sizes, size_weights, k=count),
+            rng.choices(filters, filter_weights, k=count)
+        )
+    ]
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    request: Tuple[str, bytes, str],
+    results: List[Dict]
+) -> None:
+    size, payload, filter_name = request
+    start = time.perf_counter()
+    try:
+        response = await client.post(
+            "/classify",
+            files={"file": (f"{size}.png", payload, "image/png")},
+            data={"filter_name": filter_name}
+        )
+        ok = response.status_code == 200
+        status = response.status_code
+    except httpx.HTTPError as error:
+        ok = False
+        status = type(error).__name__
+    results.append({
+        "latency": time.perf_counter() - start,
+        "ok": ok,
+        "status": status,
+        "size": size,
+        "filter": filter_name
+    })
+
+
+async def run_step(
+    base_url: str,
+    rps: float,
+    duration: float,
+    mix: Dict,
+    seed: int,
+    timeout: float
+) -> Dict:
+    requests = build_requests(mix, max(1, int(rps * duration)), seed)
+    results: List[Dict] = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        limits=limits
+    ) as client:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks = []
+        for index, request in enumerate(requests):
+            # Open-loop schedule: send times do not depend on completions,
+            # so a slow server shows up as queueing latency.
+            delay = started + index / rps - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_send(client, request, results)))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - started
+
+    return summarize(results, rps, elapsed)
+
+
+def summarize(results: List[Dict], target_rps: float, elapsed: float) -> Dict:
+    latencies = np.array([result["latency"] for result in results])
+    succeeded = [result for result in results if result["ok"]]
+    errors: Dict[str, int] = {}
+    for result in results:
+        if not result["ok"]:
+            status = str(result["status"])
+            errors[status] = errors.get(status, 0) + 1
+
+    def percentile(q: float) -> Optional[float]:
+        if latencies.size == 0:
+            return None
+        return float(np.percentile(latencies, q) * 1000)
+
+    return {
+        "target_rps": target_rps,
+        "achieved_rps": len(succeeded) / elapsed if elapsed else 0.0,
+        "requests": len(results),
+        "error_rate": 1 - len(succeeded) / len(results) if results else 0.0,
+        "errors": errors,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": float(latencies.max() * 1000) if latencies.size else None
+    }
+
+
+def find_saturation(
+    steps: List[Dict],
+    slo_p99_ms: float,
+    max_error_rate: float,
+    min_throughput_ratio: float = 0.9
+) -> Optional[float]:
+    saturation = None
+    for step in steps:
+        saturated = (
+            step["p99_ms"] is None
+            or step["p99_ms"] > slo_p99_ms
+            or step["error_rate"] > max_error_rate
+            or step["achieved_rps"] < step["target_rps"] * min_throughput_ratio
+        )
+        step["within_slo"] = not saturated
+        if saturated and saturation is None:
+            saturation = step["target_rps"]
+    return saturation
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SERVICE_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_load_test(
+    base_url: str,
+    rates: List[float],
+    duration: float,
+    mix: Dict,
+    seed: int,
+    timeout: float,
+    slo_p99_ms: float,
+    max_error_rate: float
+) -> Dict:
+    steps = []
+    for rps in rates:
+        steps.append(
+            await run_step(base_url, rps, duration, mix, seed, timeout)
+        )
+    saturation = find_saturation(steps, slo_p99_ms, max_error_rate)
+    return {
+        "build": {
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine()
+        },
+        "config": {
+            "rates": rates,
+            "step_duration_seconds": duration,
+            "mix": mix,
+            "seed": seed,
+            "slo_p99_ms": slo_p99_ms,
+            "max_error_rate": max_error_rate
+        },
+        "steps": steps,
+        "saturation_rps": saturation,
+        "max_rps_within_slo": max(
+            (step["target_rps"] for step in steps if step["within_slo"]),
+            default=None
+        )
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Open-loop load test for /classify that reports latency "
+            "percentiles, error rate and the saturation point as JSON"
+        )
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        nargs="+",
+        default=[5, 10, 20, 40, 80],
+        help="Target request rates, run in order as separate steps"
+    )
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument(
+        "--mix",
+        default=None,
+        help="JSON file with weighted 'sizes' and 'filters'"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--slo-p99-ms", type=float, default=250.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--url",
+        default=None,
+        help="Target an already running service instead of starting one"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--backend",
+        default=None,
+        help="INFERENCE_BACKEND for the locally started service"
+    )
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    mix = json.loads(Path(args.mix).read_text()) if args.mix else DEFAULT_MIX
+
+    def execute(base_url: str) -> Dict:
+        return asyncio.run(run_load_test(
+            base_url,
+            args.rps,
+            args.duration,
+            mix,
+            args.seed,
+            args.timeout,
+            args.slo_p99_ms,
+            args.max_error_rate
+        ))
+
+    if args.url:
+        report = execute(args.url)
+    else:
+        port = free_port()
+        env = {"INFERENCE_BACKEND": args.backend} if args.backend else {}
+        with run_service(uvicorn_command(port, args.workers), port, env):
+            report = execute(f"http://127.0.0.1:{port}")
+        report["config"]["workers"] = args.workers
+        report["config"]["backend"] = args.backend or "default"
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import json
+import time
+import argparse
+import multiprocessing
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def _replica(
+    profile: str,
+    model_path: str,
+    duration: float,
+    warmup: int,
+    barrier,
+    queue: multiprocessing.Queue
+) -> None:
+    from PIL import Image
+    from app.core.tf_runtime import resolve_thread_counts
+    from app.services.cnn_service import CNNService
+
+    service = CNNService(
+        cnn_model_path=model_path,
+        image_size=28,
+        num_classes=10,
+        thread_profile=profile or None
+    )
+
+    rng = np.random.default_rng()
+    images = [
+        Image.fromarray(rng.integers(0, 255, (28, 28), dtype=np.uint8))
+        for _ in range(16)
+    ]
+    for index in range(warmup):
+        service.predict(images[index % len(images)])
+
+    barrier.wait()
+
+    latencies = []
+    deadline = time.monotonic() + duration
+    index = 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        service.predict(images[index % len(images)])
+        latencies.append(time.perf_counter() - start)
+        index += 1
+
+    queue.put({
+        "threads": resolve_thread_counts(profile or None),
+        "latencies": latencies
+    })
+
+
+def benchmark_profile(
+    profile: str,
+    model_path: str,
+    replicas: int,
+    duration: float,
+    warmup: int
+) -> Dict:
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    barrier = context.Barrier(replicas)
+
+    processes = [
+        context.Process(
+            target=_replica,
+            args=(profile, model_path, duration, warmup, barrier, queue)
+        )
+        for _ in range(replicas)
+    ]
+    for process in processes:
+        process.start()
+
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = [value for result in results for value in result["latencies"]]
+    intra, inter = results[0]["threads"]
+    return {
+        "profile": profile or "default",
+        "intra_op_threads": intra,
+        "inter_op_threads": inter,
+        "replicas": replicas,
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / duration,
+        "p50_latency_ms": _percentile(latencies, 50) * 1000,
+        "p99_latency_ms": _percentile(latencies, 99) * 1000
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure p99 latency and requests per second of CNNService "
+            "under each TensorFlow thread profile"
+        )
+    )
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        default=["", "latency", "throughput"],
+        help="Profiles to compare; an empty string keeps TF defaults"
+    )
+    parser.add_argument(
+        "--model-path",
+        default="models/mnist_cnn_model.keras"
+    )
+    parser.add_argument(
+        "--replicas",
+        type=int,
+        default=2,
+        help="Concurrent service processes sharing this host's CPUs"
+    )
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = [
+        benchmark_profile(
+            profile,
+            args.model_path,
+            args.replicas,
+            args.duration,
+            args.warmup
+        )
+        for profile in args.profiles
+    ]
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks._server import run_service, uvicorn_command
+
+
+def _prefork_command(port: int, workers: int) -> List[str]:
+    return [
+        sys.executable, "-m", "app.prefork",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers)
+    ]
+
+
+LAYOUTS = {
+    "per_process_tensorflow": {
+        "env": {"INFERENCE_BACKEND": "tensorflow"},
+        "command": uvicorn_command
+    },
+    "prefork_numpy": {
+        "env": {"INFERENCE_BACKEND": "numpy"},
+        "command": _prefork_command
+    }
+}
+
+
+def _children(pid: int) -> List[int]:
+    result = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        if ppid == pid:
+            child = int(entry.name)
+            result.append(child)
+            result.extend(_children(child))
+    return result
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as smaps:
+        for line in smaps:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Shared_Clean", "Private_Dirty"):
+                values[key.lower() + "_kb"] = int(rest.split()[0])
+    return values
+
+
+def measure_layout(
+    name: str,
+    workers: int,
+    port: int,
+    timeout: float,
+    settle: float
+) -> Dict:
+    layout = LAYOUTS[name]
+    command = layout["command"](port, workers)
+
+    with run_service(command, port, layout["env"], timeout) as process:
+        time.sleep(settle)
+
+        processes = []
+        for pid in [process.pid] + _children(process.pid):
+            try:
+                memory = _memory_kb(pid)
+            except OSError:
+                continue
+            processes.append({"pid": pid, **memory})
+
+    worker_stats = [p for p in processes if p["pid"] != process.pid]
+    return {
+        "layout": name,
+        "workers": workers,
+        "processes": processes,
+        "total_rss_kb": sum(p["rss_kb"] for p in processes),
+        "total_pss_kb": sum(p["pss_kb"] for p in processes),
+        "mean_worker_rss_kb": (
+            sum(p["rss_kb"] for p in worker_stats) / len(worker_stats)
+            if worker_stats else 0
+        ),
+        "mean_worker_pss_kb": (
+            sum(p["pss_kb"] for p in worker_stats) / len(worker_stats)
+            if worker_stats else 0
+        )
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare per-worker RSS/PSS of cnn_image launch modes"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=18002)
+    parser.add_argument("--timeout", type=float, default=180.0)
+    parser.add_argument("--settle", type=float, default=3.0)
+    parser.add_argument(
+        "--layouts",
+        nargs="+",
+        choices=sorted(LAYOUTS),
+        default=sorted(LAYOUTS)
+    )
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = [
+        measure_layout(
+            name,
+            args.workers,
+            args.port,
+            args.timeout,
+            args.settle
+        )
+        for name in args.layouts
+    ]
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
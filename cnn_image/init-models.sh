@@ -17,8 +17,17 @@ echo "✓ MLflow disponible"
 echo ""
 echo "Entrenando modelo CNN..."
 cd /service
-python -m pipeline.train
+python -m pipeline.train \
+    --batch-size "${CNN_BATCH_SIZE:-auto}" \
+    --jit-compile "${CNN_JIT_COMPILE:-off}"
 echo "✓ Modelo CNN entrenado"
 
+if [ "${MODEL_VARIANT:-default}" = "student" ]; then
+    echo ""
+    echo "Destilando modelo estudiante..."
+    python -m pipeline.distill --epochs "${CNN_DISTILL_EPOCHS:-5}"
+    echo "✓ Modelo estudiante listo"
+fi
+
 echo ""
 echo "Modelo listo - iniciando servicio..."
\ No newline at end of file
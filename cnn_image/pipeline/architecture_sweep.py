@@ -0,0 +1,281 @@
+# file: cnn_image/pipeline/architecture_sweep.py
+import json
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import mlflow
+from tensorflow import keras
+
+from app.services.numpy_backend import NumpyCNN
+from pipeline.dataset import NormalizedView, load_mnist
+from pipeline.export_numpy import export_numpy_weights
+from pipeline.input_pipeline import make_dataset, split_validation
+from pipeline.latency import serving_latencies
+from pipeline.mlflow_batch import BatchedMlflowLogger
+from pipeline.model_builder import build_mnist_cnn
+from pipeline.train import setup_experiment
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_VARIANTS = [
+    {"name": "baseline"},
+    {"name": "gap", "head": "gap"},
+    {"name": "separable", "separable": True},
+    {"name": "separable_gap", "separable": True, "head": "gap"},
+    {"name": "w0.5", "width_multiplier": 0.5},
+    {"name": "w0.5_separable_gap", "width_multiplier": 0.5,
+     "separable": True, "head": "gap"},
+    {"name": "w0.25_separable_gap", "width_multiplier": 0.25,
+     "separable": True, "head": "gap"},
+    {"name": "w2_gap_dense64", "width_multiplier": 2.0, "head": "gap",
+     "dense_units": 64},
+]
+
+
+def pareto_frontier(
+    results: List[Dict],
+    latency_key: str,
+    accuracy_key: str = "test_accuracy"
+) -> List[str]:
+    # A variant is on the frontier when no other one is at least as fast
+    # and as accurate while being strictly better on one of the two.
+    frontier = []
+    for candidate in results:
+        dominated = any(
+            other[latency_key] <= candidate[latency_key]
+            and other[accuracy_key] >= candidate[accuracy_key]
+            and (
+                other[latency_key] < candidate[latency_key]
+                or other[accuracy_key] > candidate[accuracy_key]
+            )
+            for other in results
+        )
+        if not dominated:
+            frontier.append(candidate["name"])
+    return sorted(
+        frontier,
+        key=lambda name: next(
+            result[latency_key] for result in results
+            if result["name"] == name
+        )
+    )
+
+
+def smallest_meeting_bar(
+    results: List[Dict],
+    min_accuracy: float,
+    accuracy_key: str = "test_accuracy"
+) -> Optional[Dict]:
+    eligible = [
+        result for result in results if result[accuracy_key] >= min_accuracy
+    ]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda result: result["parameters"])
+
+
+def _train_variant(
+    variant: Dict,
+    arrays,
+    epochs: int,
+    batch_size: int
+) -> keras.Model:
+    options = {key: value for key, value in variant.items() if key != "name"}
+    model = build_mnist_cnn(input_shape=(28, 28, 1), num_classes=10, **options)
+    model.compile(
+        loss='sparse_categorical_crossentropy',
+        optimizer='adam',
+        metrics=['accuracy']
+    )
+
+    (x_fit, y_fit), (x_val, y_val) = split_validation(
+        arrays.x_train,
+        arrays.y_train,
+        0.1
+    )
+    model.fit(
+        make_dataset(x_fit, y_fit, batch_size=batch_size, training=True),
+        validation_data=make_dataset(
+            x_val,
+            y_val,
+            batch_size=batch_size,
+            training=False
+        ),
+        epochs=epochs,
+        verbose=0
+    )
+    return model
+
+
+def run_sweep(
+    variants: List[Dict] = DEFAULT_VARIANTS,
+    epochs: int = 3,
+    batch_size: int = 128,
+    min_accuracy: float = 0.98,
+    latency_backend: str = "tensorflow",
+    repeats: int = 50,
+    output_dir: str = "models/architecture_sweep"
+) -> Dict:
+    setup_experiment()
+    arrays = load_mnist()
+    latency_images = NormalizedView(arrays.x_test)[:64]
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    latency_key = f"latency_single_p50_ms_{latency_backend}"
+
+    results = []
+    with mlflow.start_run(run_name="architecture_sweep"):
+        for variant in variants:
+            name = variant["name"]
+            logger.info(f"Training variant {name}")
+
+            with mlflow.start_run(run_name=name, nested=True), \
+                    BatchedMlflowLogger() as tracker:
+                tracker.log_params({**variant, "epochs": epochs})
+
+                model = _train_variant(variant, arrays, epochs, batch_size)
+                _, test_accuracy = model.evaluate(
+                    make_dataset(
+                        arrays.x_test,
+                        arrays.y_test,
+                        batch_size=batch_size,
+                        training=False
+                    ),
+                    verbose=0
+                )
+
+                model_path = output_path / f"{name}.keras"
+                model.save(str(model_path))
+                numpy_model = NumpyCNN.load(
+                    str(export_numpy_weights(
+                        model,
+                        str(output_path / f"{name}.npz")
+                    ))
+                )
+                latencies = serving_latencies(
+                    {
+                        "tensorflow": lambda x: model.predict(x, verbose=0),
+                        "numpy": numpy_model.forward
+                    },
+                    latency_images,
+                    repeats=repeats
+                )
+
+                result = {
+                    "name": name,
+                    "variant": variant,
+                    "parameters": int(model.count_params()),
+                    "test_accuracy": float(test_accuracy),
+                    **latencies
+                }
+                results.append(result)
+                tracker.log_metrics({
+                    "parameters": result["parameters"],
+                    "test_accuracy": result["test_accuracy"],
+                    **latencies
+                })
+                mlflow.log_artifact(str(model_path))
+
+            logger.info(
+                f"{name}: accuracy={test_accuracy:.4f}, "
+                f"params={result['parameters']}, "
+                f"{latency_key}={result[latency_key]:.2f}"
+            )
+
+        frontier = pareto_frontier(results, latency_key)
+        recommended = smallest_meeting_bar(results, min_accuracy)
+        summary = {
+            "latency_key": latency_key,
+            "min_accuracy": min_accuracy,
+            "pareto_frontier": frontier,
+            "recommended": recommended["name"] if recommended else None,
+            "results": results
+        }
+
+        summary_path = output_path / "sweep_summary.json"
+        summary_path.write_text(json.dumps(summary, indent=2))
+        mlflow.log_artifact(str(summary_path))
+        mlflow.log_dict(
+            {
+                "latency_key": latency_key,
+                "points": [
+                    {
+                        "name": result["name"],
+                        "latency_ms": result[latency_key],
+                        "test_accuracy": result["test_accuracy"],
+                        "parameters": result["parameters"]
+                    }
+                    for result in results if result["name"] in frontier
+                ]
+            },
+            "pareto_frontier.json"
+        )
+        mlflow.set_tags({
+            "pareto_frontier": ",".join(frontier),
+            "recommended_variant": summary["recommended"] or "none"
+        })
+
+    if recommended is None:
+        logger.warning(f"No variant reached test accuracy {min_accuracy}")
+    else:
+        logger.info(
+            f"Smallest variant meeting {min_accuracy}: {recommended['name']} "
+            f"({recommended['parameters']} parameters)"
+        )
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Train CNN architecture variants and log their latency/accuracy "
+            "Pareto frontier to MLflow"
+        )
+    )
+    parser.add_argument(
+        "--variants",
+        default=None,
+        help="JSON file with a list of build_mnist_cnn options plus 'name'"
+    )
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--min-accuracy", type=float, default=0.98)
+    parser.add_argument(
+        "--latency-backend",
+        choices=["tensorflow", "numpy"],
+        default="tensorflow",
+        help="Backend whose single-image latency defines the frontier"
+    )
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--output-dir", default="models/architecture_sweep")
+    args = parser.parse_args()
+
+    variants = (
+        json.loads(Path(args.variants).read_text())
+        if args.variants else DEFAULT_VARIANTS
+    )
+    summary = run_sweep(
+        variants=variants,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        min_accuracy=args.min_accuracy,
+        latency_backend=args.latency_backend,
+        repeats=args.repeats,
+        output_dir=args.output_dir
+    )
+    print(json.dumps(
+        {key: summary[key] for key in ("pareto_frontier", "recommended")},
+        indent=2
+    ))
+
+
+if __name__ == "__main__":
+    main()
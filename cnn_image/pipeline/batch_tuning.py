@@ -0,0 +1,160 @@
+import math
+import time
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+import numpy as np
+import mlflow
+from tensorflow import keras
+
+from app.core.tf_runtime import available_cpus
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CANDIDATES = (32, 64, 128, 256, 512, 1024, 2048)
+
+
+def available_memory_bytes() -> int:
+    available = None
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                available = int(line.split()[1]) * 1024
+                break
+    except OSError:
+        pass
+
+    try:
+        limit = Path("/sys/fs/cgroup/memory.max").read_text().strip()
+        current = int(Path("/sys/fs/cgroup/memory.current").read_text())
+        if limit != "max":
+            headroom = int(limit) - current
+            available = headroom if available is None else min(
+                available,
+                headroom
+            )
+    except (OSError, ValueError):
+        pass
+
+    return available if available is not None else 2 * 1024 ** 3
+
+
+def estimate_sample_bytes(model: keras.Model) -> int:
+    activations = sum(
+        math.prod(dim for dim in layer.output.shape[1:] if dim)
+        for layer in model.layers
+    )
+    # Forward activations, their gradients and optimizer scratch space,
+    # all in float32.
+    return activations * 4 * 3
+
+
+def measure_throughput(
+    build_model: Callable[[bool], keras.Model],
+    images: np.ndarray,
+    labels: np.ndarray,
+    batch_size: int,
+    jit_compile: bool,
+    steps: int = 10,
+    warmup_steps: int = 2
+) -> float:
+    model = build_model(jit_compile)
+    x = images[:batch_size]
+    y = labels[:batch_size]
+
+    for _ in range(warmup_steps):
+        model.train_on_batch(x, y)
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        model.train_on_batch(x, y)
+    elapsed = time.perf_counter() - start
+
+    return batch_size * steps / elapsed
+
+
+def find_batch_size(
+    build_model: Callable[[bool], keras.Model],
+    images: np.ndarray,
+    labels: np.ndarray,
+    candidates: Sequence[int] = DEFAULT_CANDIDATES,
+    jit_options: Sequence[bool] = (False,),
+    steps: int = 10,
+    memory_fraction: float = 0.5,
+    patience: int = 2
+) -> Tuple[int, bool, List[Dict]]:
+    memory_budget = available_memory_bytes() * memory_fraction
+    sample_bytes = estimate_sample_bytes(build_model(False))
+    cpus = available_cpus()
+    max_batch = min(len(images), int(memory_budget // sample_bytes))
+    usable = [size for size in sorted(candidates) if size <= max_batch]
+    if not usable:
+        usable = [min(candidates)]
+
+    logger.info(
+        f"Searching batch sizes {usable} with jit_compile in "
+        f"{list(jit_options)} ({cpus} CPUs, "
+        f"{memory_budget / 1024 ** 2:.0f} MiB budget)"
+    )
+
+    results = []
+    for jit_compile in jit_options:
+        best = 0.0
+        worse_in_a_row = 0
+        for batch_size in usable:
+            try:
+                images_per_second = measure_throughput(
+                    build_model,
+                    images,
+                    labels,
+                    batch_size,
+                    jit_compile,
+                    steps=steps
+                )
+            except (MemoryError, RuntimeError) as error:
+                logger.warning(
+                    f"batch_size={batch_size} jit_compile={jit_compile} "
+                    f"failed: {error}"
+                )
+                break
+
+            results.append({
+                "batch_size": batch_size,
+                "jit_compile": jit_compile,
+                "images_per_second": images_per_second
+            })
+            logger.info(
+                f"batch_size={batch_size} jit_compile={jit_compile}: "
+                f"{images_per_second:.0f} images/s"
+            )
+
+            if mlflow.active_run() is not None:
+                with mlflow.start_run(
+                    run_name=f"bs{batch_size}_xla{int(jit_compile)}",
+                    nested=True
+                ):
+                    mlflow.log_param("batch_size", batch_size)
+                    mlflow.log_param("jit_compile", jit_compile)
+                    mlflow.log_param("cpus", cpus)
+                    mlflow.log_metric("images_per_second", images_per_second)
+
+            if images_per_second > best:
+                best = images_per_second
+                worse_in_a_row = 0
+            else:
+                worse_in_a_row += 1
+                if worse_in_a_row >= patience:
+                    break
+
+    if not results:
+        return usable[0], jit_options[0], results
+
+    winner = max(results, key=lambda result: result["images_per_second"])
+    logger.info(
+        f"Selected batch_size={winner['batch_size']} "
+        f"jit_compile={winner['jit_compile']} "
+        f"({winner['images_per_second']:.0f} images/s)"
+    )
+    return winner["batch_size"], winner["jit_compile"], results
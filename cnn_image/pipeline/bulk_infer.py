@@ -0,0 +1,477 @@
+# file: cnn_image/pipeline/bulk_infer.py
+import io
+import os
+import csv
+import json
+import time
+import logging
+import zipfile
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import get_settings
+from app.services.cnn_service import CNNService, preprocess_image
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff"}
+
+
+def _is_image(name: str) -> bool:
+    return Path(name).suffix.lower() in IMAGE_EXTENSIONS
+
+
+def iter_directory(source: Path) -> Iterator[Tuple[str, object]]:
+    paths = sorted(
+        path for path in source.rglob("*")
+        if path.is_file() and _is_image(path.name)
+    )
+    for path in paths:
+        yield str(path.relative_to(source)), str(path)
+
+
+def iter_zip(source: Path) -> Iterator[Tuple[str, object]]:
+    with zipfile.ZipFile(source) as archive:
+        names = sorted(
+            info.filename for info in archive.infolist()
+            if not info.is_dir() and _is_image(info.filename)
+        )
+        for name in names:
+            yield name, archive.read(name)
+
+
+def iter_npy(source: Path) -> Iterator[Tuple[str, object]]:
+    images = np.load(source, mmap_mode="r", allow_pickle=False)
+    for index in range(len(images)):
+        yield f"{source.stem}[{index}]", images[index]
+
+
+def iter_npz(
+    source: Path,
+    key: Optional[str] = None
+) -> Iterator[Tuple[str, object]]:
+    # np.load ignores mmap_mode for .npz and reads a whole member on first
+    # access, so the member is decompressed and parsed one image at a time.
+    with zipfile.ZipFile(source) as archive:
+        names = [
+            name[:-len(".npy")] for name in archive.namelist()
+            if name.endswith(".npy")
+        ]
+        key = key or names[0]
+        with archive.open(f"{key}.npy") as member:
+            version = np.lib.format.read_magic(member)
+            read_header = (
+                np.lib.format.read_array_header_1_0 if version == (1, 0)
+                else np.lib.format.read_array_header_2_0
+            )
+            shape, fortran_order, dtype = read_header(member)
+            if fortran_order:
+                raise ValueError(
+                    f"Array '{key}' in {source} is Fortran-ordered; "
+                    "save it in C order to stream it"
+                )
+            image_shape = shape[1:]
+            image_bytes = dtype.itemsize * int(np.prod(image_shape))
+            for index in range(shape[0]):
+                image = np.frombuffer(member.read(image_bytes), dtype=dtype)
+                yield f"{key}[{index}]", image.reshape(image_shape)
+
+
+def iter_source(
+    source: Path,
+    npz_key: Optional[str] = None
+) -> Iterator[Tuple[str, object]]:
+    if source.is_dir():
+        return iter_directory(source)
+    if source.suffix.lower() == ".zip":
+        return iter_zip(source)
+    if source.suffix.lower() == ".npz":
+        return iter_npz(source, npz_key)
+    if source.suffix.lower() == ".npy":
+        return iter_npy(source)
+    raise ValueError(
+        f"Unsupported source '{source}'. "
+        "Expected a directory, a .zip, a .npz or a .npy file"
+    )
+
+
+def _to_uint8_pixels(array: np.ndarray) -> np.ndarray:
+    if array.dtype == np.uint8:
+        return array
+    if array.size == 0:
+        raise ValueError("Empty image array")
+    if np.issubdtype(array.dtype, np.floating):
+        if not np.isfinite(array).all():
+            raise ValueError("Image array contains NaN or infinite values")
+        # Normalized [0, 1] images are common in .npz/.npy exports.
+        if array.max() <= 1.0:
+            array = array * 255.0
+        array = np.round(array)
+    elif not np.issubdtype(array.dtype, np.integer):
+        raise ValueError(
+            f"Unsupported image dtype {array.dtype}, expected uint8 "
+            "pixels or floats in [0, 1]"
+        )
+    low, high = array.min(), array.max()
+    if low < 0 or high > 255:
+        raise ValueError(
+            f"{array.dtype} image values span [{low:g}, {high:g}], "
+            "expected pixels in [0, 255] or floats in [0, 1]"
+        )
+    return array.astype(np.uint8)
+
+
+def decode_item(
+    item: Tuple[str, object],
+    image_size: int
+) -> Tuple[str, Optional[np.ndarray], Optional[str]]:
+    key, payload = item
+    try:
+        if isinstance(payload, np.ndarray):
+            image = Image.fromarray(_to_uint8_pixels(payload))
+        elif isinstance(payload, bytes):
+            image = Image.open(io.BytesIO(payload))
+        else:
+            image = Image.open(payload)
+        return key, preprocess_image(image, image_size)[0], None
+    except Exception as error:
+        return key, None, str(error)
+
+
+def _decode_chunk(
+    chunk: List[Tuple[str, object]],
+    image_size: int
+) -> List[Tuple[str, Optional[np.ndarray], Optional[str]]]:
+    return [decode_item(item, image_size) for item in chunk]
+
+
+class CSVResultWriter:
+    def __init__(
+        self,
+        output_path: Path,
+        columns: List[str],
+        position: Optional[int] = None
+    ):
+        self.output_path = output_path
+        self.columns = columns
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if position is None and output_path.exists():
+            output_path.unlink()
+        self._file = open(output_path, "a+", newline="")
+        if position is not None:
+            self._file.truncate(position)
+            self._file.seek(position)
+        self._writer = csv.writer(self._file)
+        if self._file.tell() == 0:
+            self._writer.writerow(columns)
+
+    def write(self, rows: List[list]) -> None:
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def position(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetResultWriter:
+    def __init__(
+        self,
+        output_path: Path,
+        columns: List[str],
+        position: Optional[int] = None
+    ):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise RuntimeError(
+                "Parquet output requires pyarrow to be installed"
+            ) from error
+
+        self._pa = pa
+        self._pq = pq
+        self.output_path = output_path
+        self.columns = columns
+        output_path.mkdir(parents=True, exist_ok=True)
+        self._part = position or 0
+        for part_path in output_path.glob("part-*.parquet"):
+            if int(part_path.stem.split("-")[1]) >= self._part:
+                part_path.unlink()
+
+    def write(self, rows: List[list]) -> None:
+        table = self._pa.table({
+            column: [row[index] for row in rows]
+            for index, column in enumerate(self.columns)
+        })
+        part_path = self.output_path / f"part-{self._part:05d}.parquet"
+        self._pq.write_table(table, part_path)
+        self._part += 1
+
+    def position(self) -> int:
+        return self._part
+
+    def close(self) -> None:
+        pass
+
+
+def _load_checkpoint(
+    checkpoint_path: Path,
+    source: Path
+) -> Tuple[int, Optional[int]]:
+    if not checkpoint_path.exists():
+        return 0, None
+    checkpoint = json.loads(checkpoint_path.read_text())
+    if checkpoint.get("source") != str(source.resolve()):
+        raise RuntimeError(
+            f"Checkpoint {checkpoint_path} belongs to "
+            f"{checkpoint.get('source')}, not {source}"
+        )
+    return int(checkpoint["processed"]), int(checkpoint["output_position"])
+
+
+def _save_checkpoint(
+    checkpoint_path: Path,
+    source: Path,
+    processed: int,
+    output_position: int
+) -> None:
+    temp_path = checkpoint_path.with_suffix(".tmp")
+    temp_path.write_text(json.dumps({
+        "source": str(source.resolve()),
+        "processed": processed,
+        "output_position": output_position,
+        "updated_at": time.time()
+    }))
+    os.replace(temp_path, checkpoint_path)
+
+
+def run_bulk_inference(
+    source: str,
+    output: str,
+    output_format: Optional[str] = None,
+    batch_size: int = 256,
+    workers: Optional[int] = None,
+    npz_key: Optional[str] = None,
+    resume: bool = True,
+    cnn_service: Optional[CNNService] = None
+) -> dict:
+    settings = get_settings()
+    source_path = Path(source)
+    output_path = Path(output)
+    output_format = output_format or (
+        "parquet" if output_path.suffix.lower() == ".parquet" else "csv"
+    )
+    checkpoint_path = Path(f"{output_path}.checkpoint.json")
+
+    if cnn_service is None:
+        cnn_service = CNNService(
+            cnn_model_path=settings.cnn_model_path,
+            image_size=settings.image_size,
+            num_classes=settings.num_classes,
+            backend=settings.inference_backend,
+            numpy_model_path=settings.numpy_model_path,
+            thread_profile=settings.tf_thread_profile,
+            intra_op_threads=settings.tf_intra_op_threads,
+            inter_op_threads=settings.tf_inter_op_threads,
+            model_variant=settings.model_variant,
+            student_model_path=settings.student_model_path,
+            student_numpy_model_path=settings.student_numpy_model_path
+        )
+    if not cnn_service.is_available():
+        raise RuntimeError("Model not available. Please train the model first.")
+
+    if not resume:
+        checkpoint_path.unlink(missing_ok=True)
+    skip, position = _load_checkpoint(checkpoint_path, source_path)
+    if skip:
+        logger.info(f"Resuming after {skip} already processed images")
+
+    columns = (
+        ["key", "predicted_class", "confidence"]
+        + [f"prob_{name}" for name in cnn_service.class_names]
+        + ["error"]
+    )
+    writer_class = (
+        ParquetResultWriter if output_format == "parquet"
+        else CSVResultWriter
+    )
+    writer = writer_class(output_path, columns, position)
+
+    items = islice(iter_source(source_path, npz_key), skip, None)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # The model may already have started TensorFlow's thread pools, and a
+    # forked child inherits their locks in whatever state they were in.
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn")
+    ) if workers > 0 else None
+
+    processed = skip
+    scored = 0
+    failed = 0
+    started = time.perf_counter()
+
+    def submit(chunk):
+        if executor is None:
+            return _decode_chunk(chunk, cnn_service.image_size)
+        sub_size = max(1, -(-len(chunk) // workers))
+        return [
+            executor.submit(
+                _decode_chunk,
+                chunk[start:start + sub_size],
+                cnn_service.image_size
+            )
+            for start in range(0, len(chunk), sub_size)
+        ]
+
+    def collect(pending):
+        if executor is None:
+            return pending
+        return [row for future in pending for row in future.result()]
+
+    try:
+        in_flight = deque()
+        while True:
+            while len(in_flight) < 2:
+                chunk = list(islice(items, batch_size))
+                if not chunk:
+                    break
+                in_flight.append(submit(chunk))
+            if not in_flight:
+                break
+
+            decoded = collect(in_flight.popleft())
+            valid = [
+                index for index, row in enumerate(decoded)
+                if row[1] is not None
+            ]
+
+            predictions = {}
+            if valid:
+                batch = np.stack([decoded[index][1] for index in valid])
+                predictions = dict(
+                    zip(valid, cnn_service.predict_batch(batch))
+                )
+
+            rows = []
+            for index, (key, _, error) in enumerate(decoded):
+                prediction = predictions.get(index)
+                if prediction is None:
+                    rows.append(
+                        [key, None, None]
+                        + [None] * cnn_service.num_classes
+                        + [error]
+                    )
+                    continue
+                predicted_class = int(np.argmax(prediction))
+                rows.append(
+                    [key, predicted_class, float(prediction[predicted_class])]
+                    + [float(value) for value in prediction]
+                    + [None]
+                )
+
+            writer.write(rows)
+            processed += len(decoded)
+            scored += len(valid)
+            failed += len(decoded) - len(valid)
+            _save_checkpoint(
+                checkpoint_path,
+                source_path,
+                processed,
+                writer.position()
+            )
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Processed {processed} images "
+                f"({(processed - skip) / elapsed:.1f} images/s)"
+            )
+    finally:
+        writer.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "source": str(source_path),
+        "output": str(output_path),
+        "format": output_format,
+        "processed": processed,
+        "resumed_from": skip,
+        "scored": scored,
+        "failed": failed,
+        "elapsed_seconds": elapsed,
+        "images_per_second": (processed - skip) / elapsed if elapsed else 0.0
+    }
+    logger.info(f"Bulk inference finished: {json.dumps(summary)}")
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Score a directory, zip, npz or npy of digit images offline"
+    )
+    parser.add_argument("source", help="Directory, .zip, .npz or .npy file")
+    parser.add_argument(
+        "--output",
+        required=True,
+        help="CSV file or Parquet directory for the results"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default=None,
+        help="Output format (inferred from --output by default)"
+    )
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Decoding processes (0 decodes in the main process)"
+    )
+    parser.add_argument(
+        "--npz-key",
+        default=None,
+        help="Array inside the .npz holding the images"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore any existing checkpoint and start from the beginning"
+    )
+    args = parser.parse_args()
+
+    summary = run_bulk_inference(
+        source=args.source,
+        output=args.output,
+        output_format=args.format,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        npz_key=args.npz_key,
+        resume=not args.restart
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import json
+import time
+import logging
+from pathlib import Path
+from typing import List, Union
+from tensorflow import keras
+
+
+logger = logging.getLogger(__name__)
+
+
+class EpochTimeCallback(keras.callbacks.Callback):
+    def __init__(self):
+        super().__init__()
+        self.epoch_times: List[float] = []
+        self._epoch_start = 0.0
+    
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+    
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._epoch_start
+        self.epoch_times.append(elapsed)
+        logger.info(f"Epoch {epoch + 1} took {elapsed:.2f}s")
+
+
+class ResumableModelCheckpoint(keras.callbacks.ModelCheckpoint):
+    """ModelCheckpoint whose best value survives a BackupAndRestore resume.
+
+    The best monitored value is written to ``state_path`` after every epoch
+    and read back when training starts; otherwise a resumed run would
+    start from ``inf`` and overwrite the best model with its first epoch.
+    """
+
+    def __init__(self, filepath: str, state_path: str, **kwargs):
+        super().__init__(filepath, **kwargs)
+        self.state_path = Path(state_path)
+
+    def on_train_begin(self, logs=None):
+        super().on_train_begin(logs)
+        if not self.state_path.exists():
+            return
+        best = json.loads(self.state_path.read_text())["best"]
+        if best is not None:
+            self.best = best
+            logger.info(f"Resuming with best {self.monitor} {best:.5f}")
+
+    def on_epoch_end(self, epoch, logs=None):
+        super().on_epoch_end(epoch, logs)
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps({"best": self.best}))
+
+
+def checkpoint_callbacks(
+    checkpoint_dir: str,
+    patience: int = 3,
+    save_freq: Union[str, int] = "epoch"
+) -> List[keras.callbacks.Callback]:
+    checkpoint_path = Path(checkpoint_dir)
+    checkpoint_path.mkdir(parents=True, exist_ok=True)
+    
+    backup_dir = checkpoint_path / "backup"
+    callbacks = [
+        # Holds the weights, optimizer state and epoch counter of the
+        # interrupted run; fit() resumes from it and deletes it once
+        # training finishes cleanly.
+        keras.callbacks.BackupAndRestore(
+            backup_dir=str(backup_dir),
+            save_freq=save_freq
+        ),
+        # Its best value lives in the backup too, so both are restored
+        # and removed together.
+        ResumableModelCheckpoint(
+            str(checkpoint_path / "best.keras"),
+            state_path=str(backup_dir / "best_checkpoint.json"),
+            monitor="val_loss",
+            save_best_only=True
+        )
+    ]
+    if patience > 0:
+        callbacks.append(keras.callbacks.EarlyStopping(
+            monitor="val_loss",
+            patience=patience,
+            restore_best_weights=True,
+            verbose=1
+        ))
+    return callbacks
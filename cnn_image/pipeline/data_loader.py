@@ -1,29 +1,32 @@
 import numpy as np
-from tensorflow import keras
 from typing import Tuple
 import logging
 
+from pipeline.dataset import load_normalized_mnist
+
 
 logger = logging.getLogger(__name__)
 
 
-def load_mnist_data() -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+def load_mnist_data(
+    lazy: bool = False
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Callers that can work from the memory-mapped cache (tf.data, slicing
+    # batches) opt in with lazy=True and get NormalizedView images.
     try:
-        (x_train, y_train), (x_test, y_test) = keras.datasets.mnist.load_data()
-        
-        x_train = x_train.astype('float32') / 255.0
-        x_test = x_test.astype('float32') / 255.0
+        x_train, y_train, x_test, y_test = load_normalized_mnist()
         
-        x_train = np.expand_dims(x_train, -1)
-        x_test = np.expand_dims(x_test, -1)
+        if not lazy:
+            x_train = np.asarray(x_train)
+            x_test = np.asarray(x_test)
         
         logger.info(
-            f"MNIST data loaded: {x_train.shape[0]} training samples, "
-            f"{x_test.shape[0]} test samples"
+            f"MNIST data loaded: {len(x_train)} training samples, "
+            f"{len(x_test)} test samples"
         )
         
         return x_train, y_train, x_test, y_test
     
     except Exception as error:
         logger.error(f"Error loading MNIST data: {error}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,150 @@
+import os
+import fcntl
+import logging
+from pathlib import Path
+from typing import NamedTuple, Optional
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_DIR = "data/mnist"
+SPLITS = ("x_train", "y_train", "x_test", "y_test")
+
+
+class MnistArrays(NamedTuple):
+    x_train: np.ndarray
+    y_train: np.ndarray
+    x_test: np.ndarray
+    y_test: np.ndarray
+
+
+class NormalizedView:
+    """Read-only float32 view over raw uint8 images.
+
+    Only the slices that are indexed get normalized, so the full float32
+    copy of the dataset never exists unless np.asarray() asks for it.
+    """
+
+    def __init__(self, raw: np.ndarray, add_channel: bool = True):
+        self.raw = raw
+        self.add_channel = add_channel
+
+    @property
+    def shape(self) -> tuple:
+        return self.raw.shape + ((1,) if self.add_channel else ())
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def _normalize(self, raw: np.ndarray) -> np.ndarray:
+        normalized = raw.astype(np.float32) / 255.0
+        if self.add_channel:
+            normalized = normalized[..., np.newaxis]
+        return normalized
+
+    def __getitem__(self, index) -> np.ndarray:
+        return self._normalize(np.asarray(self.raw[index]))
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        normalized = self._normalize(np.asarray(self.raw))
+        return normalized if dtype is None else normalized.astype(dtype)
+
+
+def _download_mnist():
+    from tensorflow import keras
+    return keras.datasets.mnist.load_data()
+
+
+def get_cache_dir(cache_dir: Optional[str] = None) -> Path:
+    return Path(cache_dir or os.getenv("MNIST_CACHE_DIR", DEFAULT_CACHE_DIR))
+
+
+def _is_materialized(cache_dir: Path) -> bool:
+    return all((cache_dir / f"{name}.npy").exists() for name in SPLITS)
+
+
+def materialize_mnist(cache_dir: Optional[str] = None) -> Path:
+    cache_path = get_cache_dir(cache_dir)
+    if _is_materialized(cache_path):
+        return cache_path
+
+    cache_path.mkdir(parents=True, exist_ok=True)
+    with open(cache_path / ".lock", "w") as lock_file:
+        # Several trainers may start together on one node; only the first
+        # downloads, the rest wait and then reuse its files.
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if _is_materialized(cache_path):
+                return cache_path
+
+            logger.info(f"Materializing MNIST into {cache_path}")
+            (x_train, y_train), (x_test, y_test) = _download_mnist()
+            arrays = dict(zip(SPLITS, (x_train, y_train, x_test, y_test)))
+            for name, array in arrays.items():
+                temp_path = cache_path / f"{name}.tmp.npy"
+                np.save(temp_path, np.ascontiguousarray(array, np.uint8))
+                os.replace(temp_path, cache_path / f"{name}.npy")
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    return cache_path
+
+
+def load_mnist(
+    cache_dir: Optional[str] = None,
+    mmap: bool = True
+) -> MnistArrays:
+    cache_path = materialize_mnist(cache_dir)
+    mmap_mode = "r" if mmap else None
+    arrays = MnistArrays(*(
+        np.load(cache_path / f"{name}.npy", mmap_mode=mmap_mode)
+        for name in SPLITS
+    ))
+    logger.info(
+        f"MNIST mapped from {cache_path} - Train: {arrays.x_train.shape}, "
+        f"Test: {arrays.x_test.shape}"
+    )
+    return arrays
+
+
+def load_normalized_mnist(cache_dir: Optional[str] = None) -> tuple:
+    arrays = load_mnist(cache_dir)
+    return (
+        NormalizedView(arrays.x_train),
+        arrays.y_train,
+        NormalizedView(arrays.x_test),
+        arrays.y_test
+    )
+
+
+def load_labeled_npz(path: str) -> tuple:
+    with np.load(path, allow_pickle=False) as archive:
+        missing = {"x", "y"} - set(archive.files)
+        if missing:
+            raise ValueError(
+                f"{path} must contain 'x' and 'y' arrays, "
+                f"missing {sorted(missing)}"
+            )
+        images = archive["x"]
+        labels = archive["y"]
+
+    if images.ndim == 4 and images.shape[-1] == 1:
+        images = images[..., 0]
+    if images.shape[1:] != (28, 28) or len(images) != len(labels):
+        raise ValueError(
+            f"{path} must hold N x 28 x 28 images with N labels, got "
+            f"{images.shape} and {labels.shape}"
+        )
+    if images.dtype != np.uint8:
+        # Accept already normalized [0, 1] images as well as raw pixels.
+        scale = 255.0 if images.max() <= 1.0 else 1.0
+        images = np.clip(images * scale, 0, 255).round().astype(np.uint8)
+
+    logger.info(f"Loaded {len(images)} labeled images from {path}")
+    return images, labels.astype(np.uint8)
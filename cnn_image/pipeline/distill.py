@@ -0,0 +1,305 @@
+# file: cnn_image/pipeline/distill.py
+import json
+import logging
+import tempfile
+import argparse
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import mlflow
+import mlflow.tensorflow
+from tensorflow import keras
+from tensorflow.keras import ops
+
+from pipeline.dataset import NormalizedView, load_mnist
+from pipeline.export_numpy import export_numpy_weights
+from pipeline.input_pipeline import make_dataset, split_validation
+from pipeline.latency import serving_latencies
+from pipeline.mlflow_batch import BatchedMlflowLogger
+from pipeline.model_builder import build_mnist_cnn
+from pipeline.train import setup_experiment
+from app.services.numpy_backend import NumpyCNN
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+NUM_CLASSES = 10
+DEFAULT_STUDENT = {
+    "filters": (8, 16),
+    "dropout": 0.25
+}
+
+
+def soften(probabilities: np.ndarray, temperature: float) -> np.ndarray:
+    # softmax(logits / T) computed from softmax outputs: p ** (1 / T)
+    # renormalized is the same distribution, so neither model needs a
+    # separate logits head.
+    log_p = np.log(np.clip(probabilities, 1e-7, 1.0)) / temperature
+    log_p -= log_p.max(axis=-1, keepdims=True)
+    soft = np.exp(log_p)
+    return (soft / soft.sum(axis=-1, keepdims=True)).astype(np.float32)
+
+
+def teacher_targets(
+    teacher: keras.Model,
+    images: np.ndarray,
+    labels: np.ndarray,
+    temperature: float,
+    batch_size: int = 1024
+) -> np.ndarray:
+    probabilities = teacher.predict(
+        NormalizedView(images)[:],
+        batch_size=batch_size,
+        verbose=0
+    )
+    one_hot = np.eye(NUM_CLASSES, dtype=np.float32)[labels]
+    # Hard labels and softened teacher outputs travel together as y_true.
+    return np.concatenate([one_hot, soften(probabilities, temperature)], 1)
+
+
+def distillation_loss(temperature: float, alpha: float):
+    def loss(y_true, y_pred):
+        labels = y_true[:, :NUM_CLASSES]
+        teacher_soft = y_true[:, NUM_CLASSES:]
+        log_student = ops.log(ops.clip(y_pred, 1e-7, 1.0))
+        student_soft = ops.softmax(log_student / temperature, axis=-1)
+        kl_divergence = ops.sum(
+            teacher_soft * (
+                ops.log(ops.clip(teacher_soft, 1e-7, 1.0))
+                - ops.log(ops.clip(student_soft, 1e-7, 1.0))
+            ),
+            axis=-1
+        )
+        hard_loss = -ops.sum(labels * log_student, axis=-1)
+        # T^2 keeps the soft-target gradients on the same scale as the
+        # hard-label ones when the temperature changes.
+        return (
+            alpha * temperature ** 2 * kl_divergence
+            + (1 - alpha) * hard_loss
+        )
+
+    return loss
+
+
+def label_accuracy(y_true, y_pred):
+    return ops.cast(
+        ops.equal(
+            ops.argmax(y_true[:, :NUM_CLASSES], axis=-1),
+            ops.argmax(y_pred, axis=-1)
+        ),
+        "float32"
+    )
+
+
+def distill(
+    teacher_path: str = "models/mnist_cnn_model.keras",
+    student_path: str = "models/mnist_cnn_student.keras",
+    student_numpy_path: str = "models/mnist_cnn_student_weights.npz",
+    student_options: Dict = DEFAULT_STUDENT,
+    temperature: float = 4.0,
+    alpha: float = 0.9,
+    epochs: int = 5,
+    batch_size: int = 128,
+    repeats: int = 50,
+    registered_model_name: str = "mnist_cnn_student"
+) -> Dict:
+    if not Path(teacher_path).exists():
+        raise FileNotFoundError(
+            f"Teacher model not found at {teacher_path}. "
+            "Run pipeline.train first."
+        )
+
+    setup_experiment()
+    teacher = keras.models.load_model(teacher_path)
+    arrays = load_mnist()
+
+    logger.info(f"Computing teacher soft targets at T={temperature}")
+    targets = teacher_targets(
+        teacher,
+        arrays.x_train,
+        arrays.y_train,
+        temperature
+    )
+    (x_fit, t_fit), (x_val, t_val) = split_validation(
+        np.asarray(arrays.x_train),
+        targets,
+        0.1
+    )
+
+    student = build_mnist_cnn(
+        input_shape=(28, 28, 1),
+        num_classes=NUM_CLASSES,
+        **student_options
+    )
+    student.compile(
+        loss=distillation_loss(temperature, alpha),
+        optimizer='adam',
+        metrics=[label_accuracy]
+    )
+
+    with mlflow.start_run(run_name="distillation"), \
+            BatchedMlflowLogger() as tracker:
+        tracker.log_params({
+            "teacher_path": teacher_path,
+            "temperature": temperature,
+            "alpha": alpha,
+            "epochs": epochs,
+            "batch_size": batch_size,
+            **{f"student_{key}": value
+               for key, value in student_options.items()}
+        })
+
+        history = student.fit(
+            make_dataset(x_fit, t_fit, batch_size=batch_size, training=True),
+            validation_data=make_dataset(
+                x_val,
+                t_val,
+                batch_size=batch_size,
+                training=False
+            ),
+            epochs=epochs,
+            verbose=1
+        )
+        for index, epoch in enumerate(history.epoch):
+            tracker.log_metrics({
+                "distillation_loss": history.history['loss'][index],
+                "val_distillation_loss": history.history['val_loss'][index],
+                "val_accuracy": history.history['val_label_accuracy'][index]
+            }, step=epoch)
+
+        # The served student is a plain softmax classifier; swap the
+        # training-only loss out so it loads without custom objects.
+        student.compile(
+            loss='sparse_categorical_crossentropy',
+            optimizer='adam',
+            metrics=['accuracy']
+        )
+        test_dataset = make_dataset(
+            arrays.x_test,
+            arrays.y_test,
+            batch_size=batch_size,
+            training=False
+        )
+        _, student_accuracy = student.evaluate(test_dataset, verbose=0)
+        _, teacher_accuracy = teacher.evaluate(test_dataset, verbose=0)
+
+        save_path = Path(student_path)
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+        student.save(str(save_path))
+        numpy_path = export_numpy_weights(student, student_numpy_path)
+
+        latency_images = NormalizedView(arrays.x_test)[:64]
+        with tempfile.TemporaryDirectory() as probe_dir:
+            teacher_numpy = NumpyCNN.load(str(export_numpy_weights(
+                teacher,
+                str(Path(probe_dir) / "teacher.npz")
+            )))
+        student_numpy = NumpyCNN.load(str(numpy_path))
+        latencies = {}
+        for role, model, numpy_model in (
+            ("teacher", teacher, teacher_numpy),
+            ("student", student, student_numpy)
+        ):
+            role_latencies = serving_latencies(
+                {
+                    "tensorflow": lambda x, m=model: m.predict(x, verbose=0),
+                    "numpy": numpy_model.forward
+                },
+                latency_images,
+                repeats=repeats
+            )
+            latencies.update({
+                f"{role}_{key}": value
+                for key, value in role_latencies.items()
+            })
+
+        metrics = {
+            "student_test_accuracy": float(student_accuracy),
+            "teacher_test_accuracy": float(teacher_accuracy),
+            "accuracy_drop": float(teacher_accuracy - student_accuracy),
+            "student_parameters": int(student.count_params()),
+            "teacher_parameters": int(teacher.count_params()),
+            **latencies
+        }
+        for backend in ("tensorflow", "numpy"):
+            key = f"latency_single_p50_ms_{backend}"
+            metrics[f"speedup_single_{backend}"] = (
+                latencies[f"teacher_{key}"] / latencies[f"student_{key}"]
+            )
+        tracker.log_metrics(metrics)
+
+        mlflow.tensorflow.log_model(
+            student,
+            "model",
+            registered_model_name=registered_model_name
+        )
+        mlflow.log_artifact(str(save_path))
+        mlflow.log_artifact(str(numpy_path))
+
+    logger.info(
+        f"Student accuracy {student_accuracy:.4f} "
+        f"(teacher {teacher_accuracy:.4f}), "
+        f"{metrics['student_parameters']} vs "
+        f"{metrics['teacher_parameters']} parameters"
+    )
+    return metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Distill the trained MNIST CNN into a smaller student"
+    )
+    parser.add_argument(
+        "--teacher-path",
+        default="models/mnist_cnn_model.keras"
+    )
+    parser.add_argument(
+        "--student-path",
+        default="models/mnist_cnn_student.keras"
+    )
+    parser.add_argument(
+        "--student-numpy-path",
+        default="models/mnist_cnn_student_weights.npz"
+    )
+    parser.add_argument(
+        "--student-options",
+        default=None,
+        help="JSON object of build_mnist_cnn options for the student"
+    )
+    parser.add_argument("--temperature", type=float, default=4.0)
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.9,
+        help="Weight of the soft-target loss against the hard-label loss"
+    )
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    metrics = distill(
+        teacher_path=args.teacher_path,
+        student_path=args.student_path,
+        student_numpy_path=args.student_numpy_path,
+        student_options=(
+            json.loads(args.student_options)
+            if args.student_options else DEFAULT_STUDENT
+        ),
+        temperature=args.temperature,
+        alpha=args.alpha,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        repeats=args.repeats
+    )
+    print(json.dumps(metrics, indent=2))
+
+
+if __name__ == "__main__":
+    main()
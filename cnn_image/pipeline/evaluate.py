@@ -0,0 +1,316 @@
+# file: cnn_image/pipeline/evaluate.py
+import json
+import time
+import logging
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from app.core.config import get_settings
+from app.services.cnn_service import CNNService
+from pipeline.dataset import NormalizedView, load_mnist
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def predict_in_batches(
+    predict: Callable[[np.ndarray], np.ndarray],
+    images: np.ndarray,
+    batch_size: int = 2048
+) -> np.ndarray:
+    view = NormalizedView(images)
+    return np.concatenate([
+        np.asarray(predict(view[start:start + batch_size]))
+        for start in range(0, len(view), batch_size)
+    ])
+
+
+def confusion_matrix(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    num_classes: int
+) -> np.ndarray:
+    # Each (true, predicted) pair maps to one cell of a flattened K x K
+    # grid, so a single bincount fills the whole matrix.
+    cells = y_true.astype(np.int64) * num_classes + y_pred
+    return np.bincount(cells, minlength=num_classes ** 2).reshape(
+        num_classes,
+        num_classes
+    )
+
+
+def per_class_stats(
+    probabilities: np.ndarray,
+    y_true: np.ndarray,
+    matrix: np.ndarray
+) -> List[Dict]:
+    num_classes = matrix.shape[0]
+    y_pred = probabilities.argmax(axis=1)
+    confidence = probabilities.max(axis=1)
+    true_class_probability = probabilities[np.arange(len(y_true)), y_true]
+    correct = y_pred == y_true
+
+    def mean_by_class(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        sums = np.bincount(y_true[mask], values[mask], minlength=num_classes)
+        counts = np.bincount(y_true[mask], minlength=num_classes)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts
+
+    true_positives = np.diag(matrix).astype(np.float64)
+    support = matrix.sum(axis=1)
+    predicted = matrix.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        recall = true_positives / support
+        precision = true_positives / predicted
+        f1 = 2 * precision * recall / (precision + recall)
+
+    everything = np.ones_like(correct)
+    columns = {
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "mean_confidence": mean_by_class(confidence, everything),
+        "mean_confidence_correct": mean_by_class(confidence, correct),
+        "mean_confidence_wrong": mean_by_class(confidence, ~correct),
+        "mean_true_class_probability": mean_by_class(
+            true_class_probability,
+            everything
+        )
+    }
+
+    return [
+        {
+            "class": index,
+            "support": int(support[index]),
+            **{
+                name: None if np.isnan(values[index]) else float(values[index])
+                for name, values in columns.items()
+            }
+        }
+        for index in range(num_classes)
+    ]
+
+
+def most_confused_pairs(matrix: np.ndarray, top_k: int = 10) -> List[Dict]:
+    off_diagonal = matrix.copy()
+    np.fill_diagonal(off_diagonal, 0)
+    order = np.argsort(off_diagonal, axis=None)[::-1][:top_k]
+    true_classes, predicted_classes = np.unravel_index(order, matrix.shape)
+    return [
+        {
+            "true": int(true_class),
+            "predicted": int(predicted_class),
+            "count": int(off_diagonal[true_class, predicted_class])
+        }
+        for true_class, predicted_class in zip(true_classes, predicted_classes)
+        if off_diagonal[true_class, predicted_class] > 0
+    ]
+
+
+def confident_mistakes(
+    probabilities: np.ndarray,
+    y_true: np.ndarray,
+    count: int = 64
+) -> np.ndarray:
+    y_pred = probabilities.argmax(axis=1)
+    wrong = np.flatnonzero(y_pred != y_true)
+    confidence = probabilities[wrong, y_pred[wrong]]
+    return wrong[np.argsort(confidence)[::-1][:count]]
+
+
+def render_grid(
+    images: np.ndarray,
+    captions: List[str],
+    columns: int = 8,
+    scale: int = 3,
+    caption_height: int = 12
+) -> Image.Image:
+    tile_size = images.shape[1] * scale
+    rows = max(1, -(-len(images) // columns))
+    grid = Image.new(
+        "L",
+        (columns * tile_size, rows * (tile_size + caption_height)),
+        color=255
+    )
+    draw = ImageDraw.Draw(grid)
+    for index, (image, caption) in enumerate(zip(images, captions)):
+        row, column = divmod(index, columns)
+        left = column * tile_size
+        top = row * (tile_size + caption_height)
+        tile = Image.fromarray(np.asarray(image, dtype=np.uint8))
+        grid.paste(
+            tile.resize((tile_size, tile_size), Image.NEAREST),
+            (left, top)
+        )
+        draw.text((left + 2, top + tile_size), caption, fill=0)
+    return grid
+
+
+def evaluate(
+    cnn_service: Optional[CNNService] = None,
+    batch_size: int = 2048,
+    output_dir: str = "reports/cnn_evaluation",
+    grid_size: int = 64,
+    log_to_mlflow: bool = False
+) -> Dict:
+    started = time.perf_counter()
+    if cnn_service is None:
+        settings = get_settings()
+        cnn_service = CNNService(
+            cnn_model_path=settings.cnn_model_path,
+            image_size=settings.image_size,
+            num_classes=settings.num_classes,
+            backend=settings.inference_backend,
+            numpy_model_path=settings.numpy_model_path,
+            thread_profile=settings.tf_thread_profile,
+            intra_op_threads=settings.tf_intra_op_threads,
+            inter_op_threads=settings.tf_inter_op_threads,
+            model_variant=settings.model_variant,
+            student_model_path=settings.student_model_path,
+            student_numpy_model_path=settings.student_numpy_model_path
+        )
+    if not cnn_service.is_available():
+        raise RuntimeError(
+            "Model not available. Please train the model first."
+        )
+
+    arrays = load_mnist()
+    images = arrays.x_test
+    y_true = np.asarray(arrays.y_test, dtype=np.int64)
+
+    predict_started = time.perf_counter()
+    probabilities = predict_in_batches(
+        cnn_service.predict_batch,
+        images,
+        batch_size
+    )
+    predict_seconds = time.perf_counter() - predict_started
+
+    y_pred = probabilities.argmax(axis=1)
+    matrix = confusion_matrix(y_true, y_pred, cnn_service.num_classes)
+    mistakes = confident_mistakes(probabilities, y_true, grid_size)
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    grid_path = output_path / "confident_mistakes.png"
+    render_grid(
+        np.asarray(images[mistakes]),
+        [
+            f"{y_true[index]}>{y_pred[index]} "
+            f"{probabilities[index, y_pred[index]]:.2f}"
+            for index in mistakes
+        ]
+    ).save(grid_path)
+
+    report = {
+        "model": {
+            "variant": cnn_service.model_variant,
+            "backend": cnn_service.backend,
+            "path": (
+                cnn_service.numpy_model_path
+                if cnn_service.backend == "numpy"
+                else cnn_service.cnn_model_path
+            )
+        },
+        "samples": int(len(y_true)),
+        "accuracy": float((y_pred == y_true).mean()),
+        "errors": int((y_pred != y_true).sum()),
+        "confusion_matrix": matrix.tolist(),
+        "per_class": per_class_stats(probabilities, y_true, matrix),
+        "most_confused_pairs": most_confused_pairs(matrix),
+        "confident_mistakes": [
+            {
+                "index": int(index),
+                "true": int(y_true[index]),
+                "predicted": int(y_pred[index]),
+                "confidence": float(probabilities[index, y_pred[index]])
+            }
+            for index in mistakes
+        ],
+        "grid_path": str(grid_path),
+        "timing": {
+            "predict_seconds": predict_seconds,
+            "images_per_second": len(y_true) / predict_seconds,
+            "total_seconds": time.perf_counter() - started
+        }
+    }
+
+    report_path = output_path / "evaluation.json"
+    report_path.write_text(json.dumps(report, indent=2))
+    logger.info(
+        f"Accuracy {report['accuracy']:.4f} on {report['samples']} images, "
+        f"{report['errors']} errors, report written to {report_path}"
+    )
+
+    if log_to_mlflow:
+        import mlflow
+        from pipeline.train import setup_experiment
+
+        setup_experiment()
+        with mlflow.start_run(run_name="cnn_evaluation"):
+            mlflow.log_params({
+                "model_variant": cnn_service.model_variant,
+                "backend": cnn_service.backend,
+                "batch_size": batch_size
+            })
+            mlflow.log_metrics({
+                "test_accuracy": report["accuracy"],
+                "test_errors": report["errors"],
+                "eval_images_per_second": (
+                    report["timing"]["images_per_second"]
+                ),
+                **{
+                    f"recall_class_{stats['class']}": stats["recall"] or 0.0
+                    for stats in report["per_class"]
+                }
+            })
+            mlflow.log_artifact(str(report_path))
+            mlflow.log_artifact(str(grid_path))
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Score the MNIST test set and write a confusion matrix, "
+            "per-class confidence stats and a grid of confident mistakes"
+        )
+    )
+    parser.add_argument("--batch-size", type=int, default=2048)
+    parser.add_argument("--output-dir", default="reports/cnn_evaluation")
+    parser.add_argument(
+        "--grid-size",
+        type=int,
+        default=64,
+        help="Number of misclassified images in the grid"
+    )
+    parser.add_argument(
+        "--mlflow",
+        action="store_true",
+        help="Also log the metrics and artifacts to MLflow"
+    )
+    args = parser.parse_args()
+
+    report = evaluate(
+        batch_size=args.batch_size,
+        output_dir=args.output_dir,
+        grid_size=args.grid_size,
+        log_to_mlflow=args.mlflow
+    )
+    print(json.dumps(
+        {key: report[key] for key in ("accuracy", "errors", "timing")},
+        indent=2
+    ))
+
+
+if __name__ == "__main__":
+    main()
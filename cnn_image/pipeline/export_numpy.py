@@ -0,0 +1,91 @@
+import json
+import logging
+import argparse
+from pathlib import Path
+import numpy as np
+from tensorflow import keras
+
+from app.services.numpy_backend import ARCHITECTURE_KEY
+
+
+logger = logging.getLogger(__name__)
+
+
+LAYER_TYPES = {
+    "Conv2D": "conv2d",
+    "SeparableConv2D": "separable_conv2d",
+    "DepthwiseConv2D": "depthwise_conv2d",
+    "MaxPooling2D": "max_pooling2d",
+    "GlobalAveragePooling2D": "global_average_pooling2d",
+    "Flatten": "flatten",
+    "Dropout": "dropout",
+    "Dense": "dense",
+}
+
+
+def _layer_spec(layer: keras.layers.Layer) -> dict:
+    class_name = type(layer).__name__
+    if class_name not in LAYER_TYPES:
+        raise ValueError(
+            f"Layer '{layer.name}' ({class_name}) is not supported "
+            "by the NumPy backend"
+        )
+
+    config = layer.get_config()
+    spec = {"type": LAYER_TYPES[class_name]}
+    for key in ("activation", "padding", "strides", "pool_size", "use_bias"):
+        if key in config and config[key] is not None:
+            value = config[key]
+            spec[key] = list(value) if isinstance(value, tuple) else value
+    return spec
+
+
+def export_numpy_weights(model: keras.Model, output_path: str) -> Path:
+    layers = []
+    arrays = {}
+
+    for index, layer in enumerate(model.layers):
+        layers.append(_layer_spec(layer))
+        for weight in layer.weights:
+            name = weight.name.split("/")[-1].split(":")[0]
+            arrays[f"layer{index}_{name}"] = np.asarray(
+                weight.numpy(),
+                dtype=np.float32
+            )
+
+    save_path = Path(output_path)
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(
+        save_path,
+        **{ARCHITECTURE_KEY: np.array(json.dumps(layers))},
+        **arrays
+    )
+
+    logger.info(f"NumPy weights exported to {save_path}")
+    return save_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export a Keras CNN to the NumPy serving format"
+    )
+    parser.add_argument(
+        "--model-path",
+        default="models/mnist_cnn_model.keras"
+    )
+    parser.add_argument(
+        "--output-path",
+        default="models/mnist_cnn_weights.npz"
+    )
+    args = parser.parse_args()
+
+    model = keras.models.load_model(args.model_path)
+    export_numpy_weights(model, args.output_path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    main()
@@ -0,0 +1,385 @@
+# file: cnn_image/pipeline/hyperparameter_search.py
+import os
+import json
+import math
+import shutil
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import mlflow
+from mlflow.tracking import MlflowClient
+from tensorflow import keras
+
+from app.core.tf_runtime import available_cpus, configure_tensorflow_threads
+from pipeline.dataset import load_mnist, materialize_mnist
+from pipeline.input_pipeline import make_dataset, split_validation
+from pipeline.mlflow_batch import BatchedMlflowLogger
+from pipeline.model_builder import build_mnist_cnn
+from pipeline.train import setup_experiment
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+FILTER_CHOICES = ((16, 32), (32, 64), (64, 128))
+DENSE_CHOICES = (0, 64, 128, 256)
+DROPOUT_RANGE = (0.1, 0.6)
+LEARNING_RATE_RANGE = (1e-4, 3e-3)
+
+
+def sample_config(rng: np.random.Generator) -> Dict:
+    low, high = np.log10(LEARNING_RATE_RANGE)
+    return {
+        "filters": list(FILTER_CHOICES[rng.integers(len(FILTER_CHOICES))]),
+        "dense_units": int(rng.choice(DENSE_CHOICES)),
+        "dropout": round(float(rng.uniform(*DROPOUT_RANGE)), 3),
+        "learning_rate": float(10 ** rng.uniform(low, high))
+    }
+
+
+def hyperband_brackets(
+    max_epochs: int,
+    eta: int = 3
+) -> List[List[Tuple[int, int]]]:
+    # Each bracket is a list of (trials, epochs) rungs: many configurations
+    # get a small budget and only the best 1/eta move on to eta times more.
+    s_max = int(math.log(max_epochs, eta) + 1e-9)
+    budget = (s_max + 1) * max_epochs
+    brackets = []
+    for s in range(s_max, -1, -1):
+        trials = int(math.ceil(budget / max_epochs * eta ** s / (s + 1)))
+        epochs = max_epochs * eta ** -s
+        brackets.append([
+            (
+                max(1, int(trials * eta ** -i)),
+                max(1, int(round(epochs * eta ** i)))
+            )
+            for i in range(s + 1)
+        ])
+    return brackets
+
+
+def select_survivors(trials: List[Dict], count: int) -> List[Dict]:
+    ranked = sorted(
+        trials,
+        key=lambda trial: (trial["val_loss"], -trial["val_accuracy"])
+    )
+    return ranked[:max(1, count)]
+
+
+def _init_worker(threads_per_worker: int, tracking_uri: str) -> None:
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+    configure_tensorflow_threads(None, threads_per_worker, 1)
+    mlflow.set_tracking_uri(tracking_uri)
+
+
+def _train_trial(
+    trial: Dict,
+    target_epochs: int,
+    batch_size: int,
+    max_train_samples: Optional[int]
+) -> Dict:
+    arrays = load_mnist()
+    (x_fit, y_fit), (x_val, y_val) = split_validation(
+        arrays.x_train,
+        arrays.y_train,
+        0.1
+    )
+    if max_train_samples:
+        x_fit, y_fit = x_fit[:max_train_samples], y_fit[:max_train_samples]
+
+    checkpoint = Path(trial["checkpoint"])
+    if checkpoint.exists():
+        model = keras.models.load_model(str(checkpoint))
+    else:
+        config = trial["config"]
+        model = build_mnist_cnn(
+            input_shape=(28, 28, 1),
+            num_classes=10,
+            filters=config["filters"],
+            dropout=config["dropout"],
+            dense_units=config["dense_units"]
+        )
+        model.compile(
+            loss='sparse_categorical_crossentropy',
+            optimizer=keras.optimizers.Adam(config["learning_rate"]),
+            metrics=['accuracy']
+        )
+
+    history = model.fit(
+        make_dataset(x_fit, y_fit, batch_size=batch_size, training=True),
+        validation_data=make_dataset(
+            x_val,
+            y_val,
+            batch_size=batch_size,
+            training=False
+        ),
+        initial_epoch=trial["epochs"],
+        epochs=target_epochs,
+        verbose=0
+    )
+    model.save(str(checkpoint))
+
+    with BatchedMlflowLogger(run_id=trial["run_id"]) as tracker:
+        for index, epoch in enumerate(history.epoch):
+            tracker.log_metrics({
+                "train_loss": history.history['loss'][index],
+                "train_accuracy": history.history['accuracy'][index],
+                "val_loss": history.history['val_loss'][index],
+                "val_accuracy": history.history['val_accuracy'][index]
+            }, step=epoch)
+
+    return {
+        **trial,
+        "epochs": target_epochs,
+        "val_loss": float(history.history['val_loss'][-1]),
+        "val_accuracy": float(history.history['val_accuracy'][-1])
+    }
+
+
+def _start_trial_run(
+    client: MlflowClient,
+    parent_run,
+    trial_id: int,
+    bracket: int,
+    config: Dict
+) -> str:
+    run = client.create_run(
+        parent_run.info.experiment_id,
+        run_name=f"trial_{trial_id:03d}",
+        tags={"mlflow.parentRunId": parent_run.info.run_id}
+    )
+    with BatchedMlflowLogger(run_id=run.info.run_id, client=client) as tracker:
+        tracker.log_params({
+            **config,
+            "bracket": bracket,
+            "trial_id": trial_id
+        })
+    return run.info.run_id
+
+
+def _finish_trial(
+    client: MlflowClient,
+    trial: Dict,
+    outcome: str
+) -> None:
+    client.set_tag(trial["run_id"], "search_outcome", outcome)
+    client.log_metric(trial["run_id"], "epochs_trained", trial["epochs"])
+    client.set_terminated(trial["run_id"])
+
+
+def run_search(
+    max_epochs: int = 9,
+    eta: int = 3,
+    mode: str = "hyperband",
+    workers: Optional[int] = None,
+    threads_per_worker: int = 1,
+    batch_size: int = 128,
+    max_train_samples: Optional[int] = None,
+    seed: int = 42,
+    output_dir: str = "models/hyperparameter_search"
+) -> Dict:
+    if mode not in ("hyperband", "successive_halving"):
+        raise ValueError(f"Unknown search mode: {mode}")
+
+    workers = workers or max(1, available_cpus() // threads_per_worker)
+    brackets = hyperband_brackets(max_epochs, eta)
+    if mode == "successive_halving":
+        brackets = brackets[:1]
+
+    setup_experiment()
+    # Download once up front instead of racing in every worker.
+    materialize_mnist()
+
+    rng = np.random.default_rng(seed)
+    client = MlflowClient()
+    results = []
+
+    context = multiprocessing.get_context("spawn")
+    with mlflow.start_run(run_name=f"{mode}_search") as parent_run, \
+            ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(threads_per_worker, mlflow.get_tracking_uri())
+            ) as executor:
+        search_dir = Path(output_dir) / parent_run.info.run_id
+        search_dir.mkdir(parents=True, exist_ok=True)
+
+        with BatchedMlflowLogger() as tracker:
+            tracker.log_params({
+                "mode": mode,
+                "max_epochs": max_epochs,
+                "eta": eta,
+                "workers": workers,
+                "threads_per_worker": threads_per_worker,
+                "batch_size": batch_size,
+                "max_train_samples": max_train_samples or "all",
+                "seed": seed
+            })
+
+        for bracket, rungs in enumerate(brackets):
+            trials = []
+            for _ in range(rungs[0][0]):
+                trial_id = len(results) + len(trials)
+                config = sample_config(rng)
+                trials.append({
+                    "trial_id": trial_id,
+                    "bracket": bracket,
+                    "config": config,
+                    "epochs": 0,
+                    "checkpoint": str(
+                        search_dir / f"trial_{trial_id:03d}.keras"
+                    ),
+                    "run_id": _start_trial_run(
+                        client,
+                        parent_run,
+                        trial_id,
+                        bracket,
+                        config
+                    )
+                })
+
+            for rung, (_, epochs) in enumerate(rungs):
+                logger.info(
+                    f"Bracket {bracket} rung {rung}: training "
+                    f"{len(trials)} trials to {epochs} epochs "
+                    f"on {workers} workers"
+                )
+                trials = list(executor.map(
+                    _train_trial,
+                    trials,
+                    [epochs] * len(trials),
+                    [batch_size] * len(trials),
+                    [max_train_samples] * len(trials)
+                ))
+
+                if rung == len(rungs) - 1:
+                    survivors = trials
+                else:
+                    survivors = select_survivors(trials, rungs[rung + 1][0])
+                survivor_ids = {trial["trial_id"] for trial in survivors}
+                for trial in trials:
+                    if trial["trial_id"] in survivor_ids:
+                        continue
+                    # Losers stop here; their budget goes to the survivors.
+                    _finish_trial(client, trial, f"stopped_at_rung_{rung}")
+                    Path(trial["checkpoint"]).unlink(missing_ok=True)
+                    results.append(trial)
+                trials = survivors
+
+            for trial in trials:
+                _finish_trial(client, trial, "completed")
+                results.append(trial)
+
+        # Only trials that got the full budget compete for the final pick.
+        full_budget = max(trial["epochs"] for trial in results)
+        best = select_survivors(
+            [trial for trial in results if trial["epochs"] == full_budget],
+            1
+        )[0]
+
+        best_path = search_dir / "best.keras"
+        shutil.copyfile(best["checkpoint"], best_path)
+        summary = {
+            "mode": mode,
+            "trials": len(results),
+            "best": {
+                key: best[key] for key in (
+                    "trial_id",
+                    "config",
+                    "epochs",
+                    "val_loss",
+                    "val_accuracy"
+                )
+            },
+            "best_model_path": str(best_path),
+            "results": [
+                {key: trial[key] for key in (
+                    "trial_id",
+                    "bracket",
+                    "config",
+                    "epochs",
+                    "val_loss",
+                    "val_accuracy"
+                )}
+                for trial in results
+            ]
+        }
+
+        summary_path = search_dir / "summary.json"
+        summary_path.write_text(json.dumps(summary, indent=2))
+
+        with BatchedMlflowLogger() as tracker:
+            tracker.log_params({
+                f"best_{key}": value
+                for key, value in best["config"].items()
+            })
+            tracker.log_metrics({
+                "best_val_loss": best["val_loss"],
+                "best_val_accuracy": best["val_accuracy"],
+                "trials": len(results)
+            })
+        mlflow.log_artifact(str(summary_path))
+
+    logger.info(
+        f"Best trial {best['trial_id']}: {best['config']} "
+        f"val_accuracy={best['val_accuracy']:.4f}"
+    )
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Hyperband / successive-halving search for the MNIST CNN"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["hyperband", "successive_halving"],
+        default="hyperband"
+    )
+    parser.add_argument("--max-epochs", type=int, default=9)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parallel trial processes (default: CPUs / threads per worker)"
+    )
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument(
+        "--max-train-samples",
+        type=int,
+        default=None,
+        help="Train each trial on a subset to cut search time"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default="models/hyperparameter_search")
+    args = parser.parse_args()
+
+    summary = run_search(
+        max_epochs=args.max_epochs,
+        eta=args.eta,
+        mode=args.mode,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        batch_size=args.batch_size,
+        max_train_samples=args.max_train_samples,
+        seed=args.seed,
+        output_dir=args.output_dir
+    )
+    print(json.dumps(summary["best"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
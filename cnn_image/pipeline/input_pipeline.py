@@ -0,0 +1,123 @@
+import logging
+from typing import Optional, Tuple
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras import layers
+
+
+logger = logging.getLogger(__name__)
+
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+def split_validation(
+    x: np.ndarray,
+    y: np.ndarray,
+    validation_split: float = 0.1
+) -> Tuple[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+    # Same split as model.fit(validation_split=...): the last fraction
+    # of the arrays, taken before any shuffling.
+    split_at = int(len(x) * (1 - validation_split))
+    return (x[:split_at], y[:split_at]), (x[split_at:], y[split_at:])
+
+
+def build_augmenter() -> keras.Sequential:
+    return keras.Sequential([
+        layers.RandomRotation(0.05, fill_mode="constant"),
+        layers.RandomTranslation(0.1, 0.1, fill_mode="constant"),
+        layers.RandomZoom(0.1, fill_mode="constant"),
+    ], name="augmentation")
+
+
+def _normalize(images: tf.Tensor, labels: tf.Tensor):
+    images = tf.cast(images, tf.float32) / 255.0
+    return tf.expand_dims(images, -1), labels
+
+
+def _memmap_batches(
+    images: np.memmap,
+    labels: np.ndarray,
+    batch_size: int,
+    training: bool,
+    shuffle_buffer: int,
+    seed: Optional[int]
+) -> tf.data.Dataset:
+    # Shuffle and batch indices, then gather each batch straight from the
+    # memory-mapped file: the raw pixels stay in the shared page cache
+    # instead of being copied into a private tensor.
+    indices = tf.data.Dataset.range(len(images))
+    if training:
+        indices = indices.shuffle(
+            min(shuffle_buffer, len(images)),
+            seed=seed,
+            reshuffle_each_iteration=True
+        )
+    indices = indices.batch(batch_size, drop_remainder=False)
+
+    def gather(batch_indices: np.ndarray):
+        order = np.sort(batch_indices)
+        return np.asarray(images[order]), np.asarray(labels[order])
+
+    def gather_batch(batch_indices: tf.Tensor):
+        batch_images, batch_labels = tf.numpy_function(
+            gather,
+            [batch_indices],
+            (tf.as_dtype(images.dtype), tf.as_dtype(labels.dtype))
+        )
+        batch_images.set_shape((None,) + images.shape[1:])
+        batch_labels.set_shape((None,))
+        return batch_images, batch_labels
+
+    return indices.map(gather_batch, num_parallel_calls=AUTOTUNE)
+
+
+def make_dataset(
+    images: np.ndarray,
+    labels: np.ndarray,
+    batch_size: int = 128,
+    training: bool = True,
+    augment: bool = False,
+    shuffle_buffer: int = 10000,
+    cache: bool = True,
+    seed: Optional[int] = None
+) -> tf.data.Dataset:
+    if images.dtype != np.uint8:
+        raise ValueError(
+            f"make_dataset expects raw uint8 images, got {images.dtype}"
+        )
+
+    if isinstance(images, np.memmap):
+        dataset = _memmap_batches(
+            images,
+            labels,
+            batch_size,
+            training,
+            shuffle_buffer,
+            seed
+        )
+    else:
+        dataset = tf.data.Dataset.from_tensor_slices((images, labels))
+        if cache:
+            dataset = dataset.cache()
+        if training:
+            dataset = dataset.shuffle(
+                min(shuffle_buffer, len(images)),
+                seed=seed,
+                reshuffle_each_iteration=True
+            )
+        dataset = dataset.batch(batch_size, drop_remainder=False)
+
+    # Normalization runs once per batch as a vectorized op instead of
+    # once per image.
+    dataset = dataset.map(_normalize, num_parallel_calls=AUTOTUNE)
+
+    if training and augment:
+        augmenter = build_augmenter()
+        dataset = dataset.map(
+            lambda x, y: (augmenter(x, training=True), y),
+            num_parallel_calls=AUTOTUNE
+        )
+
+    return dataset.prefetch(AUTOTUNE)
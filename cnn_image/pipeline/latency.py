@@ -0,0 +1,45 @@
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+
+def measure_latency(
+    predict: Callable[[np.ndarray], np.ndarray],
+    inputs: np.ndarray,
+    repeats: int = 50,
+    warmup: int = 5
+) -> Dict[str, float]:
+    for _ in range(warmup):
+        predict(inputs)
+
+    timings = np.empty(repeats)
+    for index in range(repeats):
+        start = time.perf_counter()
+        predict(inputs)
+        timings[index] = time.perf_counter() - start
+
+    timings *= 1000
+    return {
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "mean_ms": float(timings.mean())
+    }
+
+
+def serving_latencies(
+    backends: Dict[str, Callable[[np.ndarray], np.ndarray]],
+    images: np.ndarray,
+    batch_size: int = 64,
+    repeats: int = 50
+) -> Dict[str, float]:
+    # One image is what a /classify request runs; the batch is the
+    # throughput-oriented case.
+    shapes = {"single": images[:1], f"batch{batch_size}": images[:batch_size]}
+    metrics = {}
+    for backend, predict in backends.items():
+        for shape, inputs in shapes.items():
+            latency = measure_latency(predict, inputs, repeats=repeats)
+            for stat, value in latency.items():
+                metrics[f"latency_{shape}_{stat}_{backend}"] = value
+    return metrics
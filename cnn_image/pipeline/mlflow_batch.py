@@ -0,0 +1,215 @@
+# Kept identical in cnn_image/pipeline and sklearn_model/pipeline: each
+# service is built from its own Docker context, so neither can import the
+# other's copy.
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import mlflow
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+
+logger = logging.getLogger(__name__)
+
+
+# Per-request limits of the MLflow log-batch REST endpoint.
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+MAX_ENTITIES_PER_BATCH = 1000
+
+
+class BatchedMlflowLogger:
+    """Buffers params, metrics and tags and sends them with log_batch.
+
+    Calls only append to an in-memory buffer; a background thread flushes
+    it every ``flush_interval`` seconds, or sooner once ``max_pending``
+    entries are waiting, so a slow tracking server never stalls training.
+    Use it as a context manager inside ``mlflow.start_run()`` so that
+    everything is flushed before the run is closed.
+    """
+
+    def __init__(
+        self,
+        run_id: Optional[str] = None,
+        flush_interval: float = 2.0,
+        max_pending: int = 1000,
+        max_retries: int = 3,
+        client: Optional[MlflowClient] = None
+    ):
+        if run_id is None:
+            active_run = mlflow.active_run()
+            if active_run is None:
+                raise RuntimeError(
+                    "BatchedMlflowLogger needs a run_id or an active run"
+                )
+            run_id = active_run.info.run_id
+
+        self.run_id = run_id
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self._client = client or MlflowClient()
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._drained = threading.Condition(self._lock)
+        self._metrics: List[Metric] = []
+        self._params: Dict[str, Param] = {}
+        self._tags: Dict[str, RunTag] = {}
+        self._in_flight = False
+        self._closed = False
+        self._failures = 0
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="mlflow-batch-logger",
+            daemon=True
+        )
+        self._thread.start()
+
+    def log_param(self, key: str, value) -> None:
+        self.log_params({key: value})
+
+    def log_params(self, params: Dict) -> None:
+        with self._lock:
+            for key, value in params.items():
+                self._params[key] = Param(key, str(value))
+        self._maybe_wake()
+
+    def set_tag(self, key: str, value) -> None:
+        self.set_tags({key: value})
+
+    def set_tags(self, tags: Dict) -> None:
+        with self._lock:
+            for key, value in tags.items():
+                self._tags[key] = RunTag(key, str(value))
+        self._maybe_wake()
+
+    def log_metric(self, key: str, value: float, step: int = 0) -> None:
+        self.log_metrics({key: value}, step=step)
+
+    def log_metrics(self, metrics: Dict[str, float], step: int = 0) -> None:
+        timestamp = int(time.time() * 1000)
+        with self._lock:
+            self._metrics.extend(
+                Metric(key, float(value), timestamp, step)
+                for key, value in metrics.items()
+            )
+        self._maybe_wake()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._metrics) + len(self._params) + len(self._tags)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        self._wake.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._drained:
+            while self._has_pending() or self._in_flight:
+                if not self._thread.is_alive():
+                    break
+                remaining = (
+                    None if deadline is None
+                    else deadline - time.monotonic()
+                )
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._drained.wait(remaining)
+            return not self._has_pending()
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        flushed = self.flush(timeout)
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout)
+        if not flushed:
+            logger.warning(
+                f"Dropped {self.pending()} MLflow entries for run "
+                f"{self.run_id} that could not be flushed"
+            )
+
+    def __enter__(self) -> "BatchedMlflowLogger":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def _has_pending(self) -> bool:
+        return bool(self._metrics or self._params or self._tags)
+
+    def _maybe_wake(self) -> None:
+        if self.pending() >= self.max_pending:
+            self._wake.set()
+
+    def _take_batch(self):
+        with self._lock:
+            param_keys = list(self._params)[:MAX_PARAMS_PER_BATCH]
+            params = [self._params.pop(key) for key in param_keys]
+            tag_keys = list(self._tags)[:MAX_TAGS_PER_BATCH]
+            tags = [self._tags.pop(key) for key in tag_keys]
+            # The endpoint also caps metrics, params and tags together.
+            max_metrics = min(
+                MAX_METRICS_PER_BATCH,
+                MAX_ENTITIES_PER_BATCH - len(params) - len(tags)
+            )
+            metrics = self._metrics[:max_metrics]
+            del self._metrics[:max_metrics]
+            self._in_flight = bool(metrics or params or tags)
+            return metrics, params, tags
+
+    def _requeue(self, metrics, params, tags) -> None:
+        with self._lock:
+            self._metrics[:0] = metrics
+            for param in params:
+                self._params.setdefault(param.key, param)
+            for tag in tags:
+                self._tags.setdefault(tag.key, tag)
+
+    def _send_pending(self) -> None:
+        while True:
+            metrics, params, tags = self._take_batch()
+            if not (metrics or params or tags):
+                return
+            try:
+                self._client.log_batch(
+                    self.run_id,
+                    metrics=metrics,
+                    params=params,
+                    tags=tags,
+                    synchronous=True
+                )
+                self._failures = 0
+            except Exception as error:
+                self._failures += 1
+                if self._failures > self.max_retries:
+                    logger.error(
+                        f"Giving up on {len(metrics) + len(params) + len(tags)}"
+                        f" MLflow entries after {self.max_retries} retries: "
+                        f"{error}"
+                    )
+                    self._failures = 0
+                else:
+                    logger.warning(
+                        f"MLflow log_batch failed "
+                        f"(attempt {self._failures}): {error}"
+                    )
+                    self._requeue(metrics, params, tags)
+                    return
+            finally:
+                with self._drained:
+                    self._in_flight = False
+                    self._drained.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closed
+            self._send_pending()
+            with self._drained:
+                self._drained.notify_all()
+            if closing:
+                return
@@ -1,14 +1,26 @@
 # file: cnn_image/pipeline/train.py
 import os
 import logging
+import argparse
 from pathlib import Path
+from typing import Optional, Tuple, Union
 import numpy as np
 import mlflow
 import mlflow.tensorflow
 from tensorflow import keras
-from tensorflow.keras.datasets import mnist
 
 from pipeline.model_builder import build_mnist_cnn
+from pipeline.export_numpy import export_numpy_weights
+from pipeline.mlflow_batch import BatchedMlflowLogger
+from pipeline.callbacks import EpochTimeCallback, checkpoint_callbacks
+from pipeline.dataset import (
+    NormalizedView,
+    load_labeled_npz,
+    load_mnist,
+    load_normalized_mnist
+)
+from pipeline.batch_tuning import DEFAULT_CANDIDATES, find_batch_size
+from pipeline.input_pipeline import make_dataset, split_validation
 
 
 logging.basicConfig(
@@ -20,13 +32,10 @@ logger = logging.getLogger(__name__)
 
 def load_and_preprocess_data():
     logger.info("Loading MNIST dataset")
-    (x_train, y_train), (x_test, y_test) = mnist.load_data()
-    
-    x_train = x_train.astype('float32') / 255.0
-    x_test = x_test.astype('float32') / 255.0
+    x_train, y_train, x_test, y_test = load_normalized_mnist()
     
-    x_train = np.expand_dims(x_train, -1)
-    x_test = np.expand_dims(x_test, -1)
+    x_train = np.asarray(x_train)
+    x_test = np.asarray(x_test)
     
     logger.info(
         f"Data loaded - Train: {x_train.shape}, Test: {x_test.shape}"
@@ -35,15 +44,118 @@ def load_and_preprocess_data():
     return (x_train, y_train), (x_test, y_test)
 
 
-def train_model(
-    epochs: int = 5,
-    batch_size: int = 128,
-    cnn_model_path: str = "models/mnist_cnn_model.keras"
+def _prepare_inputs(
+    input_pipeline: str,
+    batch_size: int,
+    augment: bool = False,
+    shuffle_buffer: int = 10000,
+    train_data: Optional[Tuple[np.ndarray, np.ndarray]] = None
 ):
+    if input_pipeline == "numpy":
+        (x_train, y_train), (x_test, y_test) = load_and_preprocess_data()
+        if train_data is not None:
+            x_train = np.asarray(NormalizedView(train_data[0]))
+            y_train = train_data[1]
+        fit_kwargs = {
+            "x": x_train,
+            "y": y_train,
+            "batch_size": batch_size,
+            "validation_split": 0.1
+        }
+        return fit_kwargs, (x_test, y_test)
+    
+    if input_pipeline != "tf_data":
+        raise ValueError(f"Unknown input pipeline: {input_pipeline}")
+    
+    x_train, y_train, x_test, y_test = load_mnist()
+    if train_data is not None:
+        x_train, y_train = train_data
+    (x_fit, y_fit), (x_val, y_val) = split_validation(x_train, y_train, 0.1)
+    
+    fit_kwargs = {
+        "x": make_dataset(
+            x_fit,
+            y_fit,
+            batch_size=batch_size,
+            training=True,
+            augment=augment,
+            shuffle_buffer=shuffle_buffer
+        ),
+        "validation_data": make_dataset(
+            x_val,
+            y_val,
+            batch_size=batch_size,
+            training=False
+        )
+    }
+    test_dataset = make_dataset(
+        x_test,
+        y_test,
+        batch_size=batch_size,
+        training=False
+    )
+    return fit_kwargs, (test_dataset,)
+
+
+def _compiled_model(
+    jit_compile: bool = False,
+    warm_start_path: Optional[str] = None,
+    learning_rate: Optional[float] = None
+) -> keras.Model:
+    if warm_start_path is not None:
+        if not Path(warm_start_path).exists():
+            raise FileNotFoundError(
+                f"Cannot warm start: no model at {warm_start_path}"
+            )
+        logger.info(f"Warm starting from {warm_start_path}")
+        model = keras.models.load_model(warm_start_path, compile=False)
+    else:
+        model = build_mnist_cnn(input_shape=(28, 28, 1), num_classes=10)
+    
+    optimizer = (
+        keras.optimizers.Adam(learning_rate=learning_rate)
+        if learning_rate is not None else 'adam'
+    )
+    model.compile(
+        loss='sparse_categorical_crossentropy',
+        optimizer=optimizer,
+        metrics=['accuracy'],
+        jit_compile=jit_compile
+    )
+    return model
+
+
+def resolve_training_config(
+    batch_size: Union[int, str],
+    jit_compile: Union[bool, str]
+) -> Tuple[int, bool]:
+    jit_options = [False, True] if jit_compile == "auto" else [jit_compile]
+    if batch_size != "auto":
+        if len(jit_options) == 1:
+            return int(batch_size), jit_options[0]
+        candidates = [int(batch_size)]
+    else:
+        candidates = DEFAULT_CANDIDATES
+    
+    arrays = load_mnist()
+    sample_count = max(candidates)
+    images = np.asarray(NormalizedView(arrays.x_train)[:sample_count])
+    labels = np.asarray(arrays.y_train[:sample_count])
+    
+    best_batch_size, best_jit, _ = find_batch_size(
+        _compiled_model,
+        images,
+        labels,
+        candidates=candidates,
+        jit_options=jit_options
+    )
+    return best_batch_size, best_jit
+
+
+def setup_experiment(experiment_name: str = "cnn_mnist_classification"):
     mlflow_uri = os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
     mlflow.set_tracking_uri(mlflow_uri)
     
-    experiment_name = "cnn_mnist_classification"
     try:
         experiment_id = mlflow.create_experiment(experiment_name)
     except:
@@ -51,63 +163,119 @@ def train_model(
         experiment_id = experiment.experiment_id
     
     mlflow.set_experiment(experiment_name)
+    return experiment_id
+
+
+def train_model(
+    epochs: int = 5,
+    batch_size: Union[int, str] = 128,
+    cnn_model_path: str = "models/mnist_cnn_model.keras",
+    numpy_model_path: str = "models/mnist_cnn_weights.npz",
+    input_pipeline: str = "tf_data",
+    augment: bool = False,
+    shuffle_buffer: int = 10000,
+    jit_compile: Union[bool, str] = False,
+    checkpoint_dir: str = "models/checkpoints",
+    early_stopping_patience: int = 3,
+    warm_start: bool = False,
+    train_data_path: Optional[str] = None,
+    fine_tune_learning_rate: float = 1e-4
+):
+    setup_experiment()
     
-    (x_train, y_train), (x_test, y_test) = load_and_preprocess_data()
+    train_data = (
+        load_labeled_npz(train_data_path) if train_data_path else None
+    )
+    mode = "warm_start" if warm_start else "scratch"
+    # Separate directories so a leftover backup from one mode is never
+    # restored into the other.
+    checkpoint_dir = str(Path(checkpoint_dir) / mode)
     
-    with mlflow.start_run():
-        mlflow.log_param("epochs", epochs)
-        mlflow.log_param("batch_size", batch_size)
-        mlflow.log_param("input_shape", (28, 28, 1))
-        mlflow.log_param("num_classes", 10)
-        mlflow.log_param("optimizer", "adam")
-        mlflow.log_param("loss", "sparse_categorical_crossentropy")
+    with mlflow.start_run(), BatchedMlflowLogger() as tracker:
+        tracker.log_param("batch_size_mode", batch_size)
+        tracker.log_param("jit_compile_mode", jit_compile)
+        batch_size, jit_compile = resolve_training_config(
+            batch_size,
+            jit_compile
+        )
         
-        model = build_mnist_cnn(input_shape=(28, 28, 1), num_classes=10)
+        fit_kwargs, test_inputs = _prepare_inputs(
+            input_pipeline,
+            batch_size,
+            augment=augment,
+            shuffle_buffer=shuffle_buffer,
+            train_data=train_data
+        )
+        
+        tracker.log_params({
+            "epochs": epochs,
+            "batch_size": batch_size,
+            "jit_compile": jit_compile,
+            "input_shape": (28, 28, 1),
+            "num_classes": 10,
+            "optimizer": "adam",
+            "loss": "sparse_categorical_crossentropy",
+            "input_pipeline": input_pipeline,
+            "augment": augment,
+            "training_mode": mode,
+            "early_stopping_patience": early_stopping_patience,
+            "train_data": train_data_path or "mnist"
+        })
         
-        model.compile(
-            loss='sparse_categorical_crossentropy',
-            optimizer='adam',
-            metrics=['accuracy']
+        model = _compiled_model(
+            jit_compile,
+            warm_start_path=cnn_model_path if warm_start else None,
+            learning_rate=fine_tune_learning_rate if warm_start else None
         )
+        if warm_start:
+            tracker.log_param("learning_rate", fine_tune_learning_rate)
+        epoch_timer = EpochTimeCallback()
         
         logger.info("Starting model training")
         
         history = model.fit(
-            x_train,
-            y_train,
-            batch_size=batch_size,
             epochs=epochs,
-            validation_split=0.1,
-            verbose=1
+            callbacks=[
+                epoch_timer,
+                *checkpoint_callbacks(checkpoint_dir, early_stopping_patience)
+            ],
+            verbose=1,
+            **fit_kwargs
         )
         
-        for epoch in range(epochs):
-            mlflow.log_metric(
-                "train_loss",
-                history.history['loss'][epoch],
-                step=epoch
-            )
-            mlflow.log_metric(
-                "train_accuracy",
-                history.history['accuracy'][epoch],
-                step=epoch
-            )
-            mlflow.log_metric(
-                "val_loss",
-                history.history['val_loss'][epoch],
-                step=epoch
-            )
-            mlflow.log_metric(
-                "val_accuracy",
-                history.history['val_accuracy'][epoch],
-                step=epoch
+        # history only covers the epochs run by this process: a resumed
+        # run starts past epoch 0 and early stopping may end it before
+        # the last one.
+        completed = history.epoch
+        if completed and completed[0] > 0:
+            logger.info(f"Resumed from checkpoint at epoch {completed[0]}")
+        tracker.log_param("initial_epoch", completed[0] if completed else 0)
+        tracker.log_metric("epochs_completed", len(completed))
+        
+        source_images = (
+            train_data[0] if train_data is not None else load_mnist().x_train
+        )
+        train_samples = int(len(source_images) * 0.9)
+        if epoch_timer.epoch_times:
+            tracker.log_metric(
+                "train_images_per_second",
+                train_samples * len(completed) / sum(epoch_timer.epoch_times)
             )
         
+        for index, epoch in enumerate(completed):
+            tracker.log_metrics({
+                "train_loss": history.history['loss'][index],
+                "train_accuracy": history.history['accuracy'][index],
+                "val_loss": history.history['val_loss'][index],
+                "val_accuracy": history.history['val_accuracy'][index],
+                "epoch_time_seconds": epoch_timer.epoch_times[index]
+            }, step=epoch)
+        
         logger.info("Evaluating model on test set")
-        test_loss, test_accuracy = model.evaluate(x_test, y_test, verbose=0)
+        test_loss, test_accuracy = model.evaluate(*test_inputs, verbose=0)
         
-        mlflow.log_metric("test_loss", test_loss)
-        mlflow.log_metric("test_accuracy", test_accuracy)
+        tracker.log_metric("test_loss", test_loss)
+        tracker.log_metric("test_accuracy", test_accuracy)
         
         logger.info(f"Test accuracy: {test_accuracy:.4f}")
         
@@ -117,13 +285,152 @@ def train_model(
         model.save(str(save_path))
         logger.info(f"Model saved to {save_path}")
         
+        numpy_path = export_numpy_weights(model, numpy_model_path)
+        
         mlflow.tensorflow.log_model(model, "model")
         mlflow.log_artifact(str(save_path))
+        mlflow.log_artifact(str(numpy_path))
         
         logger.info("Training completed successfully")
         
         return model, history
 
 
+def compare_input_pipelines(epochs: int = 2, batch_size: int = 128) -> dict:
+    setup_experiment()
+    
+    results = {}
+    with mlflow.start_run(run_name="input_pipeline_comparison"):
+        mlflow.log_param("epochs", epochs)
+        mlflow.log_param("batch_size", batch_size)
+        
+        for input_pipeline in ("numpy", "tf_data"):
+            fit_kwargs, _ = _prepare_inputs(input_pipeline, batch_size)
+            
+            with mlflow.start_run(run_name=input_pipeline, nested=True), \
+                    BatchedMlflowLogger() as tracker:
+                tracker.log_param("input_pipeline", input_pipeline)
+                
+                model = _compiled_model()
+                epoch_timer = EpochTimeCallback()
+                model.fit(
+                    epochs=epochs,
+                    callbacks=[epoch_timer],
+                    verbose=0,
+                    **fit_kwargs
+                )
+                
+                for epoch, seconds in enumerate(epoch_timer.epoch_times):
+                    tracker.log_metric(
+                        "epoch_time_seconds",
+                        seconds,
+                        step=epoch
+                    )
+                
+                # The first epoch also pays for graph tracing, so report
+                # the steady-state epochs separately when there are any.
+                steady = epoch_timer.epoch_times[1:] or epoch_timer.epoch_times
+                results[input_pipeline] = float(np.mean(steady))
+            
+            mlflow.log_metric(
+                f"epoch_time_{input_pipeline}",
+                results[input_pipeline]
+            )
+        
+        speedup = results["numpy"] / results["tf_data"]
+        mlflow.log_metric("tf_data_speedup", speedup)
+        logger.info(
+            f"Mean epoch time - numpy: {results['numpy']:.2f}s, "
+            f"tf.data: {results['tf_data']:.2f}s ({speedup:.2f}x)"
+        )
+    
+    return results
+
+
+def _batch_size_arg(value: str) -> Union[int, str]:
+    return value if value == "auto" else int(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the MNIST CNN")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument(
+        "--batch-size",
+        type=_batch_size_arg,
+        default=128,
+        help="Batch size, or 'auto' to pick the fastest for this host"
+    )
+    parser.add_argument(
+        "--jit-compile",
+        choices=["off", "on", "auto"],
+        default="off",
+        help="XLA compilation; 'auto' measures both and keeps the faster"
+    )
+    parser.add_argument(
+        "--input-pipeline",
+        choices=["tf_data", "numpy"],
+        default="tf_data"
+    )
+    parser.add_argument(
+        "--augment",
+        action="store_true",
+        help="Apply random rotation, translation and zoom while training"
+    )
+    parser.add_argument("--shuffle-buffer", type=int, default=10000)
+    parser.add_argument(
+        "--early-stopping-patience",
+        type=int,
+        default=3,
+        help="Epochs without val_loss improvement before stopping, 0 disables"
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default="models/checkpoints",
+        help="Where interrupted runs are backed up and resumed from"
+    )
+    parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="Fine-tune the existing model instead of training from scratch"
+    )
+    parser.add_argument(
+        "--train-data",
+        default=None,
+        help="npz with uint8 'x' images and 'y' labels to train on"
+    )
+    parser.add_argument(
+        "--fine-tune-learning-rate",
+        type=float,
+        default=1e-4
+    )
+    parser.add_argument(
+        "--compare-input-pipelines",
+        action="store_true",
+        help="Log epoch times of the NumPy and tf.data inputs to MLflow"
+    )
+    args = parser.parse_args()
+    
+    jit_compile = {"off": False, "on": True, "auto": "auto"}[args.jit_compile]
+    
+    if args.compare_input_pipelines:
+        batch_size = 128 if args.batch_size == "auto" else args.batch_size
+        compare_input_pipelines(epochs=args.epochs, batch_size=batch_size)
+        return
+    
+    train_model(
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        input_pipeline=args.input_pipeline,
+        augment=args.augment,
+        shuffle_buffer=args.shuffle_buffer,
+        jit_compile=jit_compile,
+        checkpoint_dir=args.checkpoint_dir,
+        early_stopping_patience=args.early_stopping_patience,
+        warm_start=args.warm_start,
+        train_data_path=args.train_data,
+        fine_tune_learning_rate=args.fine_tune_learning_rate
+    )
+
+
 if __name__ == "__main__":
-    train_model(epochs=5, batch_size=128)
\ No newline at end of file
+    main()
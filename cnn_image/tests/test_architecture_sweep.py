@@ -0,0 +1,27 @@
+# file: cnn_image/tests/test_architecture_sweep.py
+import pytest
+
+pytest.importorskip("tensorflow")
+
+from pipeline.architecture_sweep import pareto_frontier, smallest_meeting_bar
+
+
+RESULTS = [
+    {"name": "large", "latency": 9.0, "test_accuracy": 0.992,
+     "parameters": 90000},
+    {"name": "medium", "latency": 4.0, "test_accuracy": 0.988,
+     "parameters": 20000},
+    {"name": "slow_medium", "latency": 6.0, "test_accuracy": 0.985,
+     "parameters": 25000},
+    {"name": "tiny", "latency": 1.5, "test_accuracy": 0.95,
+     "parameters": 900},
+]
+
+
+def test_pareto_frontier_drops_dominated_variants():
+    assert pareto_frontier(RESULTS, "latency") == ["tiny", "medium", "large"]
+
+
+def test_smallest_meeting_bar():
+    assert smallest_meeting_bar(RESULTS, 0.985)["name"] == "medium"
+    assert smallest_meeting_bar(RESULTS, 0.999) is None
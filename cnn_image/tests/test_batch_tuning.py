@@ -0,0 +1,65 @@
+# file: cnn_image/tests/test_batch_tuning.py
+import pytest
+import numpy as np
+from unittest.mock import patch
+
+pytest.importorskip("tensorflow")
+
+from pipeline import batch_tuning
+from pipeline.model_builder import build_mnist_cnn
+
+
+def build_model(jit_compile):
+    return build_mnist_cnn(input_shape=(28, 28, 1), num_classes=10)
+
+
+@pytest.fixture
+def data():
+    images = np.zeros((1024, 28, 28, 1), dtype=np.float32)
+    labels = np.zeros(1024, dtype=np.uint8)
+    return images, labels
+
+
+def test_find_batch_size_picks_fastest_configuration(data):
+    throughput = {
+        (64, False): 100.0, (128, False): 300.0, (256, False): 250.0,
+        (64, True): 150.0, (128, True): 350.0, (256, True): 200.0,
+    }
+    
+    with patch.object(
+        batch_tuning,
+        "measure_throughput",
+        side_effect=lambda build, x, y, size, jit, steps: throughput[(size, jit)]
+    ):
+        batch_size, jit_compile, results = batch_tuning.find_batch_size(
+            build_model,
+            *data,
+            candidates=[64, 128, 256],
+            jit_options=[False, True]
+        )
+    
+    assert (batch_size, jit_compile) == (128, True)
+    assert len(results) == 6
+
+
+def test_find_batch_size_respects_memory_budget(data):
+    sample_bytes = batch_tuning.estimate_sample_bytes(build_model(False))
+    
+    with patch.object(
+        batch_tuning,
+        "available_memory_bytes",
+        return_value=sample_bytes * 200
+    ), patch.object(
+        batch_tuning,
+        "measure_throughput",
+        return_value=1.0
+    ) as measure:
+        batch_tuning.find_batch_size(
+            build_model,
+            *data,
+            candidates=[64, 128, 256],
+            memory_fraction=1.0
+        )
+    
+    measured = [call.args[3] for call in measure.call_args_list]
+    assert measured == [64, 128]
@@ -0,0 +1,172 @@
+# file: cnn_image/tests/test_bulk_infer.py
+import csv
+import zipfile
+import pytest
+import numpy as np
+from pathlib import Path
+from PIL import Image
+
+from app.services.cnn_service import CNNService
+from pipeline.bulk_infer import decode_item, iter_source, run_bulk_inference
+
+
+MODEL_DIR = Path(__file__).parent.parent / "models"
+
+
+@pytest.fixture
+def cnn_service():
+    return CNNService(
+        cnn_model_path="unused.keras",
+        image_size=28,
+        num_classes=10,
+        backend="numpy",
+        numpy_model_path=str(MODEL_DIR / "mnist_cnn_weights.npz")
+    )
+
+
+@pytest.fixture
+def image_directory(tmp_path):
+    source = tmp_path / "digits"
+    source.mkdir()
+    for index in range(5):
+        pixels = np.random.randint(0, 255, (28, 28), dtype=np.uint8)
+        Image.fromarray(pixels).save(source / f"digit_{index}.png")
+    (source / "notes.txt").write_text("not an image")
+    return source
+
+
+def read_rows(output_path):
+    with open(output_path, newline="") as output:
+        return list(csv.DictReader(output))
+
+
+def test_bulk_infer_directory_to_csv(tmp_path, image_directory, cnn_service):
+    output_path = tmp_path / "results.csv"
+    
+    summary = run_bulk_inference(
+        str(image_directory),
+        str(output_path),
+        batch_size=2,
+        workers=0,
+        cnn_service=cnn_service
+    )
+    
+    rows = read_rows(output_path)
+    assert summary["processed"] == 5
+    assert [row["key"] for row in rows] == [
+        f"digit_{index}.png" for index in range(5)
+    ]
+    assert all(0 <= int(row["predicted_class"]) < 10 for row in rows)
+
+
+def test_bulk_infer_zip_records_decode_errors(tmp_path, cnn_service):
+    archive_path = tmp_path / "digits.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("broken.png", b"not really a png")
+    output_path = tmp_path / "results.csv"
+    
+    summary = run_bulk_inference(
+        str(archive_path),
+        str(output_path),
+        workers=0,
+        cnn_service=cnn_service
+    )
+    
+    rows = read_rows(output_path)
+    assert summary["failed"] == 1
+    assert rows[0]["predicted_class"] == ""
+    assert rows[0]["error"]
+
+
+def test_bulk_infer_resumes_from_checkpoint(tmp_path, cnn_service):
+    source = tmp_path / "digits.npz"
+    np.savez(source, x=np.random.randint(0, 255, (7, 28, 28), dtype=np.uint8))
+    output_path = tmp_path / "results.csv"
+    
+    original_predict = cnn_service.predict_batch
+    calls = []
+    
+    def interrupted_predict(batch):
+        calls.append(len(batch))
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return original_predict(batch)
+    
+    cnn_service.predict_batch = interrupted_predict
+    with pytest.raises(KeyboardInterrupt):
+        run_bulk_inference(
+            str(source),
+            str(output_path),
+            batch_size=2,
+            workers=0,
+            cnn_service=cnn_service
+        )
+    assert len(read_rows(output_path)) == 4
+    
+    cnn_service.predict_batch = original_predict
+    summary = run_bulk_inference(
+        str(source),
+        str(output_path),
+        batch_size=2,
+        workers=0,
+        cnn_service=cnn_service
+    )
+    
+    rows = read_rows(output_path)
+    assert summary["resumed_from"] == 4
+    assert [row["key"] for row in rows] == [f"x[{i}]" for i in range(7)]
+
+
+def test_iter_source_streams_npz_and_npy(tmp_path):
+    images = np.random.randint(0, 255, (5, 28, 28), dtype=np.uint8)
+    np.savez_compressed(tmp_path / "digits.npz", labels=np.arange(5), x=images)
+    np.save(tmp_path / "digits.npy", images)
+    
+    from_npz = list(iter_source(tmp_path / "digits.npz", npz_key="x"))
+    from_npy = list(iter_source(tmp_path / "digits.npy"))
+    
+    assert [key for key, _ in from_npz] == [f"x[{i}]" for i in range(5)]
+    assert [key for key, _ in from_npy] == [f"digits[{i}]" for i in range(5)]
+    for index in range(5):
+        assert np.array_equal(from_npz[index][1], images[index])
+        assert np.array_equal(from_npy[index][1], images[index])
+
+
+def test_decode_item_scales_float_images_and_rejects_other_dtypes():
+    pixels = np.random.default_rng(0).integers(0, 256, (28, 28))
+    
+    _, expected, _ = decode_item(("u8", pixels.astype(np.uint8)), 28)
+    _, normalized, _ = decode_item(("normalized", pixels / 255.0), 28)
+    _, raw_floats, _ = decode_item(("raw", pixels.astype(np.float64)), 28)
+    
+    assert expected.max() > 0
+    np.testing.assert_array_equal(normalized, expected)
+    np.testing.assert_array_equal(raw_floats, expected)
+    for payload in (
+        pixels.astype(bool),
+        pixels * 2.0,
+        np.full((28, 28), np.nan),
+        pixels - 300
+    ):
+        key, image, error = decode_item(("bad", payload), 28)
+        assert image is None
+        assert "expected" in error or "NaN" in error
+
+
+def test_bulk_infer_decodes_in_spawned_workers(
+    tmp_path,
+    image_directory,
+    cnn_service
+):
+    output_path = tmp_path / "results.csv"
+    
+    summary = run_bulk_inference(
+        str(image_directory),
+        str(output_path),
+        batch_size=4,
+        workers=2,
+        cnn_service=cnn_service
+    )
+    
+    assert summary["scored"] == 5
+    assert len(read_rows(output_path)) == 5
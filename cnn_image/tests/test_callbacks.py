@@ -0,0 +1,108 @@
+# file: cnn_image/tests/test_callbacks.py
+import pytest
+import numpy as np
+
+pytest.importorskip("tensorflow")
+
+from tensorflow import keras
+
+from pipeline.callbacks import checkpoint_callbacks
+
+
+class InterruptAt(keras.callbacks.Callback):
+    def __init__(self, epoch):
+        super().__init__()
+        self.epoch = epoch
+    
+    def on_epoch_begin(self, epoch, logs=None):
+        if epoch == self.epoch:
+            raise KeyboardInterrupt
+
+
+def build_model():
+    model = keras.Sequential([
+        keras.layers.Input((4,)),
+        keras.layers.Dense(2, activation="softmax")
+    ])
+    model.compile(loss="sparse_categorical_crossentropy", optimizer="adam")
+    return model
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return rng.random((32, 4), dtype=np.float32), rng.integers(0, 2, 32)
+
+
+def test_interrupted_training_resumes_from_backup(tmp_path, data):
+    x, y = data
+    
+    with pytest.raises(KeyboardInterrupt):
+        build_model().fit(
+            x, y,
+            epochs=4,
+            validation_split=0.25,
+            callbacks=[InterruptAt(2), *checkpoint_callbacks(str(tmp_path))],
+            verbose=0
+        )
+    assert (tmp_path / "backup").exists()
+    
+    history = build_model().fit(
+        x, y,
+        epochs=4,
+        validation_split=0.25,
+        callbacks=checkpoint_callbacks(str(tmp_path)),
+        verbose=0
+    )
+    
+    assert history.epoch == [2, 3]
+    assert (tmp_path / "best.keras").exists()
+    assert not (tmp_path / "backup").exists()
+
+
+class RecordBestOnTrainBegin(keras.callbacks.Callback):
+    def __init__(self, checkpoint):
+        super().__init__()
+        self.checkpoint = checkpoint
+        self.best = None
+    
+    def on_train_begin(self, logs=None):
+        self.best = self.checkpoint.best
+
+
+def test_resumed_checkpoint_keeps_best_value(tmp_path, data):
+    x, y = data
+    interrupted = checkpoint_callbacks(str(tmp_path))
+    
+    with pytest.raises(KeyboardInterrupt):
+        build_model().fit(
+            x, y,
+            epochs=4,
+            validation_split=0.25,
+            callbacks=[InterruptAt(2), *interrupted],
+            verbose=0
+        )
+    
+    resumed = checkpoint_callbacks(str(tmp_path))
+    recorder = RecordBestOnTrainBegin(resumed[1])
+    build_model().fit(
+        x, y,
+        epochs=4,
+        validation_split=0.25,
+        callbacks=[*resumed, recorder],
+        verbose=0
+    )
+    
+    assert np.isfinite(interrupted[1].best)
+    assert recorder.best == interrupted[1].best
+
+
+def test_early_stopping_restores_best_weights(tmp_path, data):
+    x, y = data
+    callbacks = checkpoint_callbacks(str(tmp_path), patience=1)
+    early_stopping = callbacks[-1]
+    
+    assert isinstance(early_stopping, keras.callbacks.EarlyStopping)
+    assert early_stopping.monitor == "val_loss"
+    assert early_stopping.restore_best_weights
+    assert len(checkpoint_callbacks(str(tmp_path), patience=0)) == 2
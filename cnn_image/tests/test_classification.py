@@ -68,4 +68,48 @@ def test_classify_with_filter(client, mock_dependencies):
     
     assert response.status_code == 200
     data = response.json()
-    assert data["filter_applied"] == "blur"
\ No newline at end of file
+    assert data["filter_applied"] == "blur"
+
+def test_classify_returns_server_timing(client, mock_dependencies):
+    test_image = create_test_image()
+    
+    response = client.post(
+        "/classify",
+        files={"file": ("test.png", test_image, "image/png")},
+        data={"filter_name": "blur"}
+    )
+    
+    assert response.status_code == 200
+    stages = {
+        entry.split(";")[0].strip()
+        for entry in response.headers["Server-Timing"].split(",")
+    }
+    assert {"read", "decode", "filter", "serialize", "total"} <= stages
+
+
+def test_classify_without_stage_timing(client, mock_dependencies):
+    test_image = create_test_image()
+    
+    with patch('app.api.dependencies._stage_timing_enabled', new=False):
+        response = client.post(
+            "/classify",
+            files={"file": ("test.png", test_image, "image/png")},
+            data={"filter_name": "none"}
+        )
+    
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+def test_metrics_endpoint(client, mock_dependencies):
+    client.post(
+        "/classify",
+        files={"file": ("test.png", create_test_image(), "image/png")},
+        data={"filter_name": "none"}
+    )
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert "cnn_classify_stage_seconds_bucket" in response.text
+    assert 'stage="decode"' in response.text
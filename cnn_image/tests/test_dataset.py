@@ -0,0 +1,105 @@
+# file: cnn_image/tests/test_dataset.py
+import pytest
+import numpy as np
+from unittest.mock import patch
+
+from pipeline.data_loader import load_mnist_data
+from pipeline.dataset import (
+    NormalizedView,
+    load_labeled_npz,
+    load_mnist,
+    materialize_mnist
+)
+
+
+@pytest.fixture
+def fake_mnist():
+    rng = np.random.default_rng(0)
+    data = (
+        (rng.integers(0, 256, (20, 28, 28), dtype=np.uint8),
+         rng.integers(0, 10, 20).astype(np.uint8)),
+        (rng.integers(0, 256, (5, 28, 28), dtype=np.uint8),
+         rng.integers(0, 10, 5).astype(np.uint8))
+    )
+    with patch(
+        "pipeline.dataset._download_mnist",
+        return_value=data
+    ) as load_data:
+        yield data, load_data
+
+
+def test_materialize_downloads_once(tmp_path, fake_mnist):
+    _, load_data = fake_mnist
+    
+    materialize_mnist(str(tmp_path))
+    materialize_mnist(str(tmp_path))
+    
+    assert load_data.call_count == 1
+    assert sorted(path.name for path in tmp_path.glob("*.npy")) == [
+        "x_test.npy", "x_train.npy", "y_test.npy", "y_train.npy"
+    ]
+
+
+def test_load_mnist_returns_read_only_memmaps(tmp_path, fake_mnist):
+    (x_train, _), _ = fake_mnist[0]
+    
+    arrays = load_mnist(str(tmp_path))
+    
+    assert isinstance(arrays.x_train, np.memmap)
+    assert arrays.x_train.dtype == np.uint8
+    assert not arrays.x_train.flags.writeable
+    np.testing.assert_array_equal(arrays.x_train, x_train)
+
+
+def test_normalized_view_is_lazy(tmp_path, fake_mnist):
+    arrays = load_mnist(str(tmp_path))
+    view = NormalizedView(arrays.x_train)
+    
+    batch = view[2:6]
+    
+    assert view.shape == (20, 28, 28, 1)
+    assert batch.shape == (4, 28, 28, 1)
+    assert batch.dtype == np.float32
+    np.testing.assert_allclose(
+        batch[..., 0],
+        arrays.x_train[2:6] / 255.0,
+        rtol=1e-6
+    )
+    assert np.asarray(view).shape == view.shape
+
+
+def test_load_mnist_data_returns_arrays_unless_lazy(
+    tmp_path,
+    fake_mnist,
+    monkeypatch
+):
+    monkeypatch.setenv("MNIST_CACHE_DIR", str(tmp_path))
+    
+    x_train, _, x_test, _ = load_mnist_data()
+    lazy_train, _, _, _ = load_mnist_data(lazy=True)
+    
+    assert type(x_train) is np.ndarray and type(x_test) is np.ndarray
+    assert x_train.shape == (20, 28, 28, 1)
+    assert x_train.dtype == np.float32
+    assert isinstance(lazy_train, NormalizedView)
+    np.testing.assert_array_equal(np.asarray(lazy_train), x_train)
+
+
+def test_load_labeled_npz_accepts_normalized_images(tmp_path):
+    raw = np.random.default_rng(1).integers(0, 256, (4, 28, 28, 1))
+    path = tmp_path / "new_digits.npz"
+    np.savez(path, x=raw / 255.0, y=np.arange(4))
+    
+    images, labels = load_labeled_npz(str(path))
+    
+    assert images.dtype == np.uint8
+    np.testing.assert_array_equal(images, raw[..., 0])
+    np.testing.assert_array_equal(labels, np.arange(4))
+
+
+def test_load_labeled_npz_requires_labels(tmp_path):
+    path = tmp_path / "unlabeled.npz"
+    np.savez(path, x=np.zeros((2, 28, 28), dtype=np.uint8))
+    
+    with pytest.raises(ValueError, match="'y'"):
+        load_labeled_npz(str(path))
@@ -0,0 +1,31 @@
+# file: cnn_image/tests/test_distill.py
+import pytest
+import numpy as np
+
+pytest.importorskip("tensorflow")
+
+from pipeline.distill import distillation_loss, soften
+
+
+def test_soften_matches_tempered_softmax():
+    logits = np.array([[2.0, 1.0, -1.0]])
+    probabilities = np.exp(logits) / np.exp(logits).sum()
+    tempered = np.exp(logits / 4.0) / np.exp(logits / 4.0).sum()
+    
+    np.testing.assert_allclose(soften(probabilities, 4.0), tempered, rtol=1e-5)
+
+
+def test_distillation_loss_is_zero_when_student_copies_teacher():
+    probabilities = np.array([[0.7, 0.2, 0.1] + [0.0] * 7], dtype=np.float32)
+    probabilities = probabilities / probabilities.sum()
+    labels = np.eye(10, dtype=np.float32)[[0]]
+    y_true = np.concatenate([labels, soften(probabilities, 2.0)], axis=1)
+    
+    soft_only = distillation_loss(temperature=2.0, alpha=1.0)
+    mismatch = np.roll(probabilities, 1, axis=1)
+    
+    assert float(soft_only(y_true, probabilities)[0]) == pytest.approx(
+        0.0,
+        abs=1e-4
+    )
+    assert float(soft_only(y_true, mismatch)[0]) > 0.1
@@ -0,0 +1,84 @@
+# file: cnn_image/tests/test_evaluate.py
+import json
+import numpy as np
+
+from pipeline import evaluate as evaluation
+from pipeline.dataset import MnistArrays
+
+
+def test_confusion_matrix_counts_pairs():
+    y_true = np.array([0, 0, 1, 2, 2, 2])
+    y_pred = np.array([0, 1, 1, 2, 0, 2])
+    
+    matrix = evaluation.confusion_matrix(y_true, y_pred, 3)
+    
+    np.testing.assert_array_equal(matrix, [[1, 1, 0], [0, 1, 0], [1, 0, 2]])
+    pairs = evaluation.most_confused_pairs(matrix, top_k=5)
+    assert sorted((pair["true"], pair["predicted"]) for pair in pairs) == [
+        (0, 1), (2, 0)
+    ]
+
+
+def test_per_class_stats_split_confidence_by_outcome():
+    probabilities = np.array([
+        [0.9, 0.1],
+        [0.4, 0.6],
+        [0.2, 0.8],
+    ])
+    y_true = np.array([0, 0, 1])
+    matrix = evaluation.confusion_matrix(
+        y_true,
+        probabilities.argmax(axis=1),
+        2
+    )
+    
+    stats = evaluation.per_class_stats(probabilities, y_true, matrix)
+    
+    assert stats[0]["support"] == 2
+    assert stats[0]["recall"] == 0.5
+    assert stats[0]["mean_confidence_correct"] == 0.9
+    assert stats[0]["mean_confidence_wrong"] == 0.6
+    assert stats[1]["precision"] == 0.5
+    assert stats[1]["mean_confidence_wrong"] is None
+
+
+class FixedService:
+    model_variant = "default"
+    backend = "numpy"
+    numpy_model_path = "fixed.npz"
+    cnn_model_path = "fixed.keras"
+    num_classes = 10
+    
+    def is_available(self):
+        return True
+    
+    def predict_batch(self, batch):
+        # Predicts the mean pixel bucket, so the labels below decide
+        # which images count as mistakes.
+        buckets = np.round(batch.mean(axis=(1, 2, 3)) * 10).astype(int)
+        buckets = np.clip(buckets, 0, 9)
+        return np.eye(10)[buckets] * 0.9 + 0.01
+
+
+def test_evaluate_writes_report_and_grid(tmp_path, monkeypatch):
+    images = np.repeat(np.arange(0, 250, 25, dtype=np.uint8), 28 * 28)
+    images = images.reshape(10, 28, 28)
+    labels = np.array([0, 1, 2, 3, 4, 5, 6, 7, 8, 0], dtype=np.uint8)
+    monkeypatch.setattr(
+        evaluation,
+        "load_mnist",
+        lambda: MnistArrays(images, labels, images, labels)
+    )
+    
+    report = evaluation.evaluate(
+        cnn_service=FixedService(),
+        batch_size=4,
+        output_dir=str(tmp_path)
+    )
+    
+    assert report["samples"] == 10
+    assert report["errors"] == 1
+    assert report["confident_mistakes"][0]["index"] == 9
+    assert (tmp_path / "confident_mistakes.png").exists()
+    saved = json.loads((tmp_path / "evaluation.json").read_text())
+    assert saved["confusion_matrix"][0][9] == 1
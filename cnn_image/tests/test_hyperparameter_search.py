@@ -0,0 +1,47 @@
+# file: cnn_image/tests/test_hyperparameter_search.py
+import pytest
+import numpy as np
+
+pytest.importorskip("tensorflow")
+
+from pipeline.hyperparameter_search import (
+    hyperband_brackets,
+    sample_config,
+    select_survivors
+)
+from pipeline.model_builder import build_mnist_cnn
+
+
+def test_hyperband_brackets_follow_the_halving_schedule():
+    brackets = hyperband_brackets(max_epochs=9, eta=3)
+    
+    assert brackets == [
+        [(9, 1), (3, 3), (1, 9)],
+        [(5, 3), (1, 9)],
+        [(3, 9)]
+    ]
+
+
+def test_select_survivors_keeps_lowest_val_loss():
+    trials = [
+        {"trial_id": index, "val_loss": loss, "val_accuracy": 0.9}
+        for index, loss in enumerate([0.4, 0.1, 0.3, 0.2])
+    ]
+    
+    survivors = select_survivors(trials, 2)
+    
+    assert [trial["trial_id"] for trial in survivors] == [1, 3]
+    assert len(select_survivors(trials, 0)) == 1
+
+
+def test_sampled_configs_build_models():
+    config = sample_config(np.random.default_rng(0))
+    
+    model = build_mnist_cnn(
+        filters=config["filters"],
+        dropout=config["dropout"],
+        dense_units=config["dense_units"]
+    )
+    
+    assert model.output_shape == (None, 10)
+    assert 1e-4 <= config["learning_rate"] <= 3e-3
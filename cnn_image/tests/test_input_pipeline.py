@@ -0,0 +1,78 @@
+# file: cnn_image/tests/test_input_pipeline.py
+import pytest
+import numpy as np
+
+pytest.importorskip("tensorflow")
+
+from pipeline.input_pipeline import make_dataset, split_validation
+
+
+@pytest.fixture
+def raw_data():
+    images = np.random.randint(0, 256, (50, 28, 28), dtype=np.uint8)
+    labels = np.random.randint(0, 10, 50).astype(np.uint8)
+    return images, labels
+
+
+def test_dataset_normalizes_uint8_batches(raw_data):
+    images, labels = raw_data
+    dataset = make_dataset(images, labels, batch_size=16, training=False)
+    
+    batch_images, batch_labels = next(iter(dataset))
+    
+    assert batch_images.shape == (16, 28, 28, 1)
+    assert batch_images.dtype.name == "float32"
+    np.testing.assert_allclose(
+        batch_images.numpy()[..., 0],
+        images[:16] / 255.0,
+        rtol=1e-6
+    )
+    np.testing.assert_array_equal(batch_labels.numpy(), labels[:16])
+
+
+def test_training_dataset_with_augmentation_keeps_shape(raw_data):
+    images, labels = raw_data
+    dataset = make_dataset(
+        images,
+        labels,
+        batch_size=16,
+        training=True,
+        augment=True,
+        seed=0
+    )
+    
+    sizes = [batch_images.shape[0] for batch_images, _ in dataset]
+    
+    assert sum(sizes) == len(images)
+
+
+def test_dataset_rejects_float_images(raw_data):
+    images, labels = raw_data
+    
+    with pytest.raises(ValueError):
+        make_dataset(images.astype(np.float32), labels)
+
+
+def test_split_validation_takes_last_fraction(raw_data):
+    images, labels = raw_data
+    
+    (x_fit, _), (x_val, _) = split_validation(images, labels, 0.1)
+    
+    assert len(x_fit) == 45
+    np.testing.assert_array_equal(x_val, images[45:])
+
+
+def test_memmap_dataset_gathers_batches(tmp_path, raw_data):
+    images, labels = raw_data
+    np.save(tmp_path / "images.npy", images)
+    mapped = np.load(tmp_path / "images.npy", mmap_mode="r")
+    
+    dataset = make_dataset(mapped, labels, batch_size=16, training=False)
+    batches = list(dataset)
+    
+    assert sum(batch_images.shape[0] for batch_images, _ in batches) == 50
+    np.testing.assert_allclose(
+        batches[0][0].numpy()[..., 0],
+        images[:16] / 255.0,
+        rtol=1e-6
+    )
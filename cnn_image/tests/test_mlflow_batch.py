@@ -0,0 +1,96 @@
+# file: cnn_image/tests/test_mlflow_batch.py
+import time
+import threading
+from pathlib import Path
+
+import pytest
+
+import pipeline.mlflow_batch
+from pipeline.mlflow_batch import BatchedMlflowLogger
+
+
+class RecordingClient:
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.batches = []
+        self.lock = threading.Lock()
+    
+    def log_batch(self, run_id, metrics=(), params=(), tags=(),
+                  synchronous=None):
+        time.sleep(self.delay)
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("tracking server unavailable")
+            self.batches.append((run_id, list(metrics), list(params),
+                                 list(tags)))
+
+
+def test_entries_are_sent_in_batches_within_limits():
+    client = RecordingClient()
+    
+    with BatchedMlflowLogger("run", flush_interval=60, client=client) as log:
+        for step in range(600):
+            log.log_metrics({"loss": 1.0 / (step + 1), "acc": 0.5}, step=step)
+        log.log_params({f"p{index}": index for index in range(150)})
+        log.set_tag("stage", "test")
+    
+    metrics = [metric for batch in client.batches for metric in batch[1]]
+    params = [param for batch in client.batches for param in batch[2]]
+    assert len(metrics) == 1200
+    assert len(params) == 150
+    assert all(len(batch[1]) <= 1000 for batch in client.batches)
+    assert all(len(batch[2]) <= 100 for batch in client.batches)
+    assert all(
+        len(batch[1]) + len(batch[2]) + len(batch[3]) <= 1000
+        for batch in client.batches
+    )
+    assert [metric.step for metric in metrics if metric.key == "loss"] == (
+        list(range(600))
+    )
+    assert [tag.value for batch in client.batches for tag in batch[3]] == [
+        "test"
+    ]
+
+
+def test_logging_does_not_wait_for_a_slow_server():
+    client = RecordingClient(delay=0.5)
+    log = BatchedMlflowLogger("run", flush_interval=0.01, client=client)
+    
+    start = time.perf_counter()
+    for epoch in range(50):
+        log.log_metric("val_loss", 0.1, step=epoch)
+    elapsed = time.perf_counter() - start
+    log.close()
+    
+    assert elapsed < 0.1
+    assert sum(len(batch[1]) for batch in client.batches) == 50
+
+
+def test_failed_batches_are_retried():
+    client = RecordingClient(failures=2)
+    
+    with BatchedMlflowLogger(
+        "run",
+        flush_interval=0.01,
+        max_retries=3,
+        client=client
+    ) as log:
+        log.log_param("epochs", 5)
+    
+    assert [param.value for _, _, params, _ in client.batches
+            for param in params] == ["5"]
+
+
+def test_sklearn_model_copy_is_identical():
+    # Each service has its own Docker build context, so the module is
+    # duplicated; this keeps the two copies from drifting apart.
+    this_copy = Path(pipeline.mlflow_batch.__file__)
+    other_copy = (
+        this_copy.parents[2] / "sklearn_model" / "pipeline" / "mlflow_batch.py"
+    )
+    if not other_copy.exists():
+        pytest.skip("sklearn_model is not checked out next to cnn_image")
+    
+    assert other_copy.read_bytes() == this_copy.read_bytes()
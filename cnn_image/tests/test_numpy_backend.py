@@ -0,0 +1,114 @@
+# file: cnn_image/tests/test_numpy_backend.py
+import pytest
+import numpy as np
+from PIL import Image
+
+from app.services.cnn_service import CNNService
+from app.services.numpy_backend import NumpyCNN
+
+
+keras = pytest.importorskip("tensorflow.keras")
+
+
+@pytest.fixture
+def exported_model(tmp_path):
+    from pipeline.model_builder import build_mnist_cnn
+    from pipeline.export_numpy import export_numpy_weights
+
+    model = build_mnist_cnn(input_shape=(28, 28, 1), num_classes=10)
+    output_path = export_numpy_weights(model, str(tmp_path / "weights.npz"))
+    return model, output_path
+
+
+def test_numpy_forward_matches_keras(exported_model):
+    model, output_path = exported_model
+    batch = np.random.rand(4, 28, 28, 1).astype(np.float32)
+
+    expected = model.predict(batch, verbose=0)
+    result = NumpyCNN.load(str(output_path)).predict(batch)
+
+    assert result.shape == expected.shape
+    np.testing.assert_allclose(result, expected, rtol=1e-4, atol=1e-5)
+
+
+@pytest.mark.parametrize("options", [
+    {"separable": True},
+    {"head": "gap", "width_multiplier": 0.5},
+    {"separable": True, "head": "gap", "dense_units": 16},
+])
+def test_numpy_forward_matches_keras_variants(tmp_path, options):
+    from pipeline.model_builder import build_mnist_cnn
+    from pipeline.export_numpy import export_numpy_weights
+
+    model = build_mnist_cnn(**options)
+    output_path = export_numpy_weights(model, str(tmp_path / "variant.npz"))
+    batch = np.random.rand(3, 28, 28, 1).astype(np.float32)
+
+    np.testing.assert_allclose(
+        NumpyCNN.load(str(output_path)).predict(batch),
+        model.predict(batch, verbose=0),
+        rtol=1e-4,
+        atol=1e-5
+    )
+
+
+def test_numpy_weights_are_read_only(exported_model):
+    _, output_path = exported_model
+    numpy_model = NumpyCNN.load(str(output_path))
+
+    for array in numpy_model.weights.values():
+        assert not array.flags.writeable
+
+
+def test_cnn_service_numpy_backend(exported_model):
+    _, output_path = exported_model
+    service = CNNService(
+        cnn_model_path="unused.keras",
+        image_size=28,
+        num_classes=10,
+        backend="numpy",
+        numpy_model_path=str(output_path)
+    )
+
+    result = service.predict(Image.new('L', (28, 28), color=128))
+
+    assert service.is_available()
+    assert 0 <= result["predicted_class"] < 10
+    assert abs(sum(result["probabilities"].values()) - 1.0) < 1e-4
+
+
+def test_cnn_service_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        CNNService(
+            cnn_model_path="unused.keras",
+            image_size=28,
+            num_classes=10,
+            backend="torch"
+        )
+
+
+def test_cnn_service_serves_student_variant(exported_model):
+    _, output_path = exported_model
+    service = CNNService(
+        cnn_model_path="unused.keras",
+        image_size=28,
+        num_classes=10,
+        backend="numpy",
+        numpy_model_path="missing.npz",
+        model_variant="student",
+        student_numpy_model_path=str(output_path)
+    )
+
+    assert service.is_available()
+    assert service.numpy_model_path == str(output_path)
+    assert service.get_model_info()["model_variant"] == "student"
+
+
+def test_cnn_service_rejects_unknown_variant():
+    with pytest.raises(ValueError):
+        CNNService(
+            cnn_model_path="unused.keras",
+            image_size=28,
+            num_classes=10,
+            model_variant="tiny"
+        )
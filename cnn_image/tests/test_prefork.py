@@ -0,0 +1,39 @@
+# file: cnn_image/tests/test_prefork.py
+from prometheus_client import Histogram, values
+
+from app.core.metrics import render_metrics
+from app.prefork import prepare_metrics_dir
+
+
+def test_prepare_metrics_dir_removes_stale_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path / "metrics"))
+    (tmp_path / "metrics").mkdir()
+    (tmp_path / "metrics" / "histogram_4242.db").write_bytes(b"stale")
+    
+    path, created = prepare_metrics_dir()
+    
+    assert path == tmp_path / "metrics"
+    assert not created
+    assert list(path.iterdir()) == []
+
+
+def test_metrics_are_aggregated_across_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    for pid in (101, 102):
+        # What each forked worker does with its own pid.
+        monkeypatch.setattr(
+            values,
+            "ValueClass",
+            values.MultiProcessValue(lambda pid=pid: pid)
+        )
+        histogram = Histogram(
+            "worker_stage_seconds",
+            "Stage time",
+            ["stage"],
+            registry=None
+        )
+        histogram.labels(stage="decode").observe(0.01)
+    
+    content, _ = render_metrics()
+    
+    assert b'worker_stage_seconds_count{stage="decode"} 2.0' in content
@@ -0,0 +1,30 @@
+# file: cnn_image/tests/test_tf_runtime.py
+import pytest
+
+from app.core.tf_runtime import resolve_thread_counts
+
+
+def test_latency_profile_uses_intra_op_parallelism():
+    assert resolve_thread_counts("latency", cpus=4) == (4, 1)
+
+
+def test_throughput_profile_uses_inter_op_parallelism():
+    assert resolve_thread_counts("throughput", cpus=4) == (1, 4)
+
+
+def test_explicit_thread_counts_override_profile():
+    assert resolve_thread_counts(
+        "latency",
+        intra_op_threads=2,
+        inter_op_threads=3,
+        cpus=4
+    ) == (2, 3)
+
+
+def test_no_profile_keeps_tensorflow_defaults():
+    assert resolve_thread_counts(None, cpus=4) == (0, 0)
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_thread_counts("turbo", cpus=4)
@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CachePredicciones:
+    """
+    Caché LRU acotada y segura entre hilos para predicciones.
+    
+    Las claves las arma quien la usa (en GestorModelo, la huella del
+    modelo más los bytes exactos de la fila), así que una entrada nunca
+    sirve para otro modelo aunque se olvide limpiarla.
+    """
+    
+    def __init__(self, capacidad: int):
+        self.capacidad = capacidad
+        self._entradas: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+    
+    @property
+    def habilitada(self) -> bool:
+        """Indica si la caché guarda algo (capacidad 0 la desactiva)."""
+        return self.capacidad > 0
+    
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        """
+        Busca una clave y la marca como la más reciente.
+        
+        Args:
+            clave: Clave de la predicción
+        
+        Returns:
+            El valor guardado, o None si no está
+        """
+        with self._candado:
+            valor = self._entradas.get(clave)
+            if valor is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+    
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        """Guarda un valor y descarta el menos usado si se llenó."""
+        if not self.habilitada:
+            return
+        with self._candado:
+            self._entradas[clave] = valor
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+    
+    def limpiar(self) -> None:
+        """Descarta todas las entradas; las métricas se conservan."""
+        with self._candado:
+            self._entradas.clear()
+    
+    def estadisticas(self) -> Dict[str, Any]:
+        """Devuelve aciertos, fallos, tasa de aciertos y ocupación."""
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "capacidad": self.capacidad,
+                "entradas": len(self._entradas),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": (
+                    self.aciertos / consultas if consultas else 0.0
+                )
+            }
@@ -37,6 +37,9 @@ def configurar_logging() -> None:
     )
 
 
+BACKENDS_MODELO = ("sklearn", "onnx")
+
+
 class Configuracion:
     """Configuración centralizada del servicio."""
     
@@ -50,10 +53,57 @@ class Configuracion:
             "MODEL_PATH",
             "/app/models/wine_classifier.pkl"
         )
+        # Por defecto los demás artefactos van junto a MODEL_PATH, en el
+        # mismo volumen.
+        directorio_modelos = os.path.dirname(self.ruta_modelo)
+        self.ruta_modelo_compilado: str = os.getenv(
+            "COMPILED_MODEL_PATH",
+            os.path.join(
+                directorio_modelos,
+                "wine_classifier_compilado.joblib"
+            )
+        )
+        self.ruta_modelo_onnx: str = os.getenv(
+            "ONNX_MODEL_PATH",
+            os.path.join(directorio_modelos, "wine_classifier.onnx")
+        )
+        self.backend_modelo: str = os.getenv(
+            "MODEL_BACKEND",
+            "sklearn"
+        ).lower()
         self.nombre_experimento: str = os.getenv(
             "MLFLOW_EXPERIMENT_NAME",
             "sklearn_wine_classifier"
         )
+        self.tamanio_maximo_lote: int = int(
+            os.getenv("MAX_BATCH_ROWS", "50000")
+        )
+        self.tamanio_cache_predicciones: int = int(
+            os.getenv("PREDICTION_CACHE_SIZE", "10000")
+        )
+        self.ventana_microlotes_ms: float = float(
+            os.getenv("MICROBATCH_WINDOW_MS", "2")
+        )
+        self.tamanio_maximo_microlote: int = int(
+            os.getenv("MICROBATCH_MAX_SIZE", "64")
+        )
+        self.intervalo_recarga_modelo_s: float = float(
+            os.getenv("MODEL_RELOAD_INTERVAL_S", "30")
+        )
+        self.nombre_modelo_registro: str = os.getenv(
+            "MODEL_REGISTRY_NAME",
+            "wine_classifier"
+        )
+        self.alias_modelo_registro: str = os.getenv(
+            "MODEL_REGISTRY_ALIAS",
+            ""
+        )
+        self.intervalo_sonda_mlflow_s: float = float(
+            os.getenv("MLFLOW_PROBE_INTERVAL_S", "15")
+        )
+        self.timeout_sonda_mlflow_s: float = float(
+            os.getenv("MLFLOW_PROBE_TIMEOUT_S", "2")
+        )
         
     def validar(self) -> None:
         """Valida que la configuración sea correcta."""
@@ -61,6 +111,11 @@ class Configuracion:
             raise ValueError(
                 "MLFLOW_TRACKING_URI no está configurado correctamente"
             )
+        if self.backend_modelo not in BACKENDS_MODELO:
+            raise ValueError(
+                f"MODEL_BACKEND debe ser uno de {BACKENDS_MODELO}, "
+                f"se recibió {self.backend_modelo!r}"
+            )
 
 
 configuracion = Configuracion()
@@ -0,0 +1,128 @@
+"""
+Decodificación rápida del cuerpo de /predict.
+
+El camino rápido lee el JSON con orjson y copia los 13 valores directo a
+una fila float64, con las mismas cotas que CaracteristicasVino. Cualquier
+cuerpo que no pase por ese camino se valida con pydantic tal como lo haría
+FastAPI, así los errores 422 son idénticos a los de siempre.
+"""
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+import orjson
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from app.schemas import (
+    CaracteristicasVino,
+    LIMITES_INFERIORES,
+    LIMITES_SUPERIORES,
+    NOMBRES_CARACTERISTICAS
+)
+
+ESQUEMA_CUERPO_PREDICCION: Dict[str, Any] = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": CaracteristicasVino.model_json_schema()
+            }
+        }
+    }
+}
+
+
+def _validar_con_pydantic(cuerpo: bytes) -> List[float]:
+    """
+    Valida el cuerpo igual que FastAPI con un parámetro CaracteristicasVino.
+    
+    Args:
+        cuerpo: Bytes del cuerpo de la petición
+    
+    Returns:
+        Valores de las características en el orden del modelo
+    
+    Raises:
+        RequestValidationError: Con el mismo detalle que daría FastAPI
+    """
+    if not cuerpo:
+        raise RequestValidationError([{
+            "type": "missing",
+            "loc": ("body",),
+            "msg": "Field required",
+            "input": None
+        }])
+    
+    try:
+        datos = json.loads(cuerpo)
+    except json.JSONDecodeError as error:
+        raise RequestValidationError(
+            [{
+                "type": "json_invalid",
+                "loc": ("body", error.pos),
+                "msg": "JSON decode error",
+                "input": {},
+                "ctx": {"error": error.msg}
+            }],
+            body=error.doc
+        ) from error
+    
+    try:
+        caracteristicas = CaracteristicasVino.model_validate(
+            datos,
+            from_attributes=True
+        )
+    except ValidationError as error:
+        raise RequestValidationError(
+            [
+                {**detalle, "loc": ("body", *detalle["loc"])}
+                for detalle in error.errors(include_url=False)
+            ],
+            body=datos
+        ) from error
+    
+    return [
+        getattr(caracteristicas, nombre) for nombre in NOMBRES_CARACTERISTICAS
+    ]
+
+
+def decodificar_fila(cuerpo: bytes, fila: np.ndarray) -> np.ndarray:
+    """
+    Llena una fila (1, 13) preasignada con las características del cuerpo.
+    
+    Solo acepta por el camino rápido números JSON finitos y dentro de
+    rango; el resto (cadenas numéricas, campos faltantes, valores fuera de
+    rango o no finitos, JSON inválido) pasa por pydantic, que lo acepta o
+    produce el error.
+    
+    Args:
+        cuerpo: Bytes del cuerpo de la petición
+        fila: Arreglo float64 de forma (1, 13) que se sobrescribe
+    
+    Returns:
+        La misma fila, ya llenada
+    
+    Raises:
+        RequestValidationError: Si el cuerpo no es válido
+    """
+    valores = fila[0]
+    try:
+        datos = orjson.loads(cuerpo)
+        for indice, nombre in enumerate(NOMBRES_CARACTERISTICAS):
+            valor = datos[nombre]
+            # bool es subclase de int, por eso se compara el tipo exacto.
+            if type(valor) is not float and type(valor) is not int:
+                raise TypeError(nombre)
+            valores[indice] = valor
+    except (orjson.JSONDecodeError, KeyError, TypeError, OverflowError):
+        valores[:] = _validar_con_pydantic(cuerpo)
+        return fila
+    
+    if not (
+        np.isfinite(valores).all()
+        and (valores >= LIMITES_INFERIORES).all()
+        and (valores <= LIMITES_SUPERIORES).all()
+    ):
+        valores[:] = _validar_con_pydantic(cuerpo)
+    return fila
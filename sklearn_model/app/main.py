@@ -2,15 +2,25 @@ import logging
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import FastAPI, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, ORJSONResponse
 import mlflow
+import numpy as np
 
 from app.config import configuracion
+from app.json_rapido import ESQUEMA_CUERPO_PREDICCION, decodificar_fila
+from app.microlotes import agrupador_predicciones
 from app.model import gestor_modelo
+from app.recarga_modelo import vigilante_modelo
+from app.sonda_mlflow import sonda_mlflow
 from app.schemas import (
-    CaracteristicasVino,
+    NOMBRES_CARACTERISTICAS,
     PrediccionRespuesta,
+    LoteCaracteristicas,
+    PrediccionLoteRespuesta,
+    ExplicacionRespuesta,
     EstadoSalud
 )
 
@@ -35,8 +45,13 @@ async def ciclo_vida_aplicacion(app: FastAPI) -> AsyncGenerator:
     except Exception as error:
         logger.error(f"Error al cargar el modelo: {error}")
     
+    vigilante_modelo.iniciar()
+    sonda_mlflow.iniciar()
+    
     yield
     
+    await sonda_mlflow.detener()
+    await vigilante_modelo.detener()
     logger.info("Cerrando servicio sklearn_model")
 
 
@@ -44,7 +59,8 @@ app = FastAPI(
     title="Servicio ML Clásico - Wine Classifier",
     description="API para clasificación de vinos usando scikit-learn",
     version="1.0.0",
-    lifespan=ciclo_vida_aplicacion
+    lifespan=ciclo_vida_aplicacion,
+    default_response_class=ORJSONResponse
 )
 
 
@@ -54,39 +70,56 @@ app = FastAPI(
     tags=["Salud"]
 )
 async def verificar_salud() -> EstadoSalud:
-    """Verifica el estado de salud del servicio."""
-    mlflow_conectado = False
-    
-    try:
-        mlflow.set_tracking_uri(configuracion.mlflow_tracking_uri)
-        mlflow.get_tracking_uri()
-        mlflow_conectado = True
-    except Exception:
-        pass
+    """
+    Verifica el estado de salud del servicio.
     
+    La conectividad con MLflow es el último resultado de la sonda en
+    segundo plano, así que este endpoint nunca espera a la red.
+    """
     return EstadoSalud(
         estado="healthy" if gestor_modelo.esta_cargado() else "degraded",
         modelo_cargado=gestor_modelo.esta_cargado(),
-        mlflow_conectado=mlflow_conectado
+        mlflow_conectado=sonda_mlflow.conectado,
+        mlflow=sonda_mlflow.estado(),
+        cache_predicciones=gestor_modelo.cache.estadisticas(),
+        microlotes=agrupador_predicciones.estadisticas(),
+        modelo=gestor_modelo.descripcion(),
+        recarga_modelo=vigilante_modelo.estadisticas()
     )
 
 
+# Fila reutilizada por /predict: se llena y se copia al micro-lote (o se
+# predice) sin ningún await entre medio, así que dos peticiones nunca la
+# comparten a la vez.
+_FILA_PREDICCION = np.empty((1, len(NOMBRES_CARACTERISTICAS)))
+
+
 @app.post(
     "/predict",
     response_model=PrediccionRespuesta,
     tags=["Predicción"],
-    status_code=status.HTTP_200_OK
+    status_code=status.HTTP_200_OK,
+    openapi_extra=ESQUEMA_CUERPO_PREDICCION
 )
 async def predecir_vino(
-    caracteristicas: CaracteristicasVino
-) -> PrediccionRespuesta:
+    request: Request,
+    usar_cache: bool = True
+) -> ORJSONResponse:
     """
     Clasifica un vino según sus características químicas.
     
     El modelo clasifica vinos en tres categorías basándose en 13 
     características químicas. Devuelve la clase predicha junto con 
     las probabilidades para cada clase.
+    
+    El cuerpo tiene el esquema de CaracteristicasVino, pero se decodifica
+    con orjson directo a una fila float64 en lugar de construir el modelo
+    pydantic en cada petición. Las filas repetidas se responden desde la
+    caché de predicciones salvo que se envíe usar_cache=false, y el resto
+    se agrupa en micro-lotes que se predicen fuera del event loop.
     """
+    fila = decodificar_fila(await request.body(), _FILA_PREDICCION)
+    
     if not gestor_modelo.esta_cargado():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -94,41 +127,149 @@ async def predecir_vino(
         )
     
     try:
-        features_list = [
-            caracteristicas.alcohol,
-            caracteristicas.acido_malico,
-            caracteristicas.ceniza,
-            caracteristicas.alcalinidad_ceniza,
-            caracteristicas.magnesio,
-            caracteristicas.fenoles_totales,
-            caracteristicas.flavonoides,
-            caracteristicas.fenoles_no_flavonoides,
-            caracteristicas.proantocianinas,
-            caracteristicas.intensidad_color,
-            caracteristicas.matiz,
-            caracteristicas.od280_od315,
-            caracteristicas.prolina
-        ]
+        if agrupador_predicciones.habilitado:
+            clase_predicha, probabilidades = (
+                await agrupador_predicciones.predecir(fila, usar_cache)
+            )
+        else:
+            clase_predicha, probabilidades = gestor_modelo.predecir_fila(
+                fila,
+                usar_cache
+            )
         
-        clase_predicha, probabilidades = gestor_modelo.predecir(
-            features_list
-        )
+        return ORJSONResponse({
+            "clase_predicha": clase_predicha,
+            "nombre_clase": gestor_modelo.obtener_nombre_clase(
+                clase_predicha
+            ),
+            "probabilidades": probabilidades,
+            "confianza": probabilidades.max()
+        })
         
-        return PrediccionRespuesta(
-            clase_predicha=clase_predicha,
-            nombre_clase=gestor_modelo.obtener_nombre_clase(clase_predicha),
-            probabilidades=probabilidades,
-            confianza=max(probabilidades)
+    except Exception as error:
+        logger.error(f"Error en la predicción: {error}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al realizar la predicción: {str(error)}"
+        )
+
+
+@app.post(
+    "/predict/batch",
+    response_model=PrediccionLoteRespuesta,
+    tags=["Predicción"],
+    status_code=status.HTTP_200_OK
+)
+def predecir_lote_vinos(lote: LoteCaracteristicas) -> ORJSONResponse:
+    """
+    Clasifica un lote de vinos con una sola llamada al modelo.
+    
+    El lote se valida y convierte a una matriz (N, 13) de una vez, y la
+    respuesta es columnar para no repetir nombres de clase por fila. Se
+    define como función síncrona para que FastAPI la ejecute en su pool
+    de hilos y no bloquee el event loop con lotes grandes.
+    """
+    if not gestor_modelo.esta_cargado():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="El modelo no está disponible. Ejecute el entrenamiento."
+        )
+    
+    try:
+        clases, probabilidades = gestor_modelo.predecir_lote(
+            lote.a_matriz()
         )
         
+        # orjson serializa los arreglos de NumPy directamente; devolver la
+        # respuesta ya armada evita convertir y revalidar N filas.
+        return ORJSONResponse({
+            "total": len(clases),
+            "clases_predichas": clases,
+            "confianzas": probabilidades.max(axis=1),
+            "probabilidades": probabilidades,
+            "nombres_clases": {
+                int(clase): gestor_modelo.obtener_nombre_clase(int(clase))
+                for clase in gestor_modelo.clases
+            }
+        })
+        
     except Exception as error:
-        logger.error(f"Error en la predicción: {error}")
+        logger.error(f"Error en la predicción por lotes: {error}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al realizar la predicción: {str(error)}"
         )
 
 
+@app.post(
+    "/explain",
+    response_model=ExplicacionRespuesta,
+    tags=["Predicción"],
+    status_code=status.HTTP_200_OK
+)
+def explicar_vinos(lote: LoteCaracteristicas) -> ORJSONResponse:
+    """
+    Explica por qué el modelo eligió la clase de cada vino.
+    
+    Cada contribución es el cambio en la probabilidad de la clase
+    predicha atribuido a esa característica a lo largo de los caminos
+    recorridos en los árboles del bosque, promediado entre árboles.
+    """
+    if not gestor_modelo.esta_cargado():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="El modelo no está disponible. Ejecute el entrenamiento."
+        )
+    
+    try:
+        clases, probabilidades, valor_base, contribuciones = (
+            gestor_modelo.explicar_lote(lote.a_matriz())
+        )
+        indices_clase = np.argmax(probabilidades, axis=1)
+        
+        return ORJSONResponse({
+            "total": len(clases),
+            "clases_predichas": clases,
+            "probabilidades": probabilidades,
+            "valor_base": valor_base,
+            "nombres_caracteristicas": NOMBRES_CARACTERISTICAS,
+            "contribuciones": np.ascontiguousarray(
+                contribuciones[np.arange(len(clases)), :, indices_clase]
+            ),
+            "nombres_clases": {
+                int(clase): gestor_modelo.obtener_nombre_clase(int(clase))
+                for clase in gestor_modelo.clases
+            }
+        })
+        
+    except NotImplementedError as error:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=str(error)
+        )
+    except Exception as error:
+        logger.error(f"Error en la explicación: {error}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al explicar la predicción: {str(error)}"
+        )
+
+
+@app.exception_handler(RequestValidationError)
+async def manejador_errores_validacion(request, exc):
+    """
+    Responde 422 como FastAPI, pero con orjson.
+    
+    El manejador por defecto no puede serializar un Infinity rechazado
+    (queda en el campo input del error) y terminaba en un 500; orjson lo
+    escribe como null.
+    """
+    return ORJSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": jsonable_encoder(exc.errors())}
+    )
+
+
 @app.exception_handler(Exception)
 async def manejador_excepciones_global(request, exc):
     """Maneja excepciones no capturadas."""
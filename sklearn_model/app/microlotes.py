@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import configuracion
+from app.model import GestorModelo, gestor_modelo
+
+logger = logging.getLogger(__name__)
+
+
+class AgrupadorPredicciones:
+    """
+    Agrupa predicciones individuales en micro-lotes.
+    
+    Si no hay ningún lote en ejecución, una fila se predice enseguida:
+    sin carga no se paga la ventana. Si lo hay, la fila abre una ventana
+    de tiempo y las que llegan mientras está abierta se escriben en la
+    misma matriz. Al cerrarse la ventana, o al llenarse el lote, se hace
+    una sola llamada a predecir_lote en el pool de hilos y cada petición
+    recibe su fila del resultado. Así el event loop nunca ejecuta el
+    modelo y, bajo carga, el costo crece con la cantidad de lotes y no con
+    la de peticiones.
+    """
+    
+    def __init__(
+        self,
+        gestor: GestorModelo,
+        ventana_segundos: float,
+        tamanio_maximo: int
+    ):
+        self.gestor = gestor
+        self.ventana_segundos = ventana_segundos
+        self.tamanio_maximo = tamanio_maximo
+        self._filas: Optional[np.ndarray] = None
+        self._futuros: List[asyncio.Future] = []
+        self._temporizador: Optional[asyncio.TimerHandle] = None
+        self._tareas: Set[asyncio.Task] = set()
+        self.lotes = 0
+        self.filas_procesadas = 0
+    
+    @property
+    def habilitado(self) -> bool:
+        """Indica si se agrupa (una ventana de 0 lo desactiva)."""
+        return self.ventana_segundos > 0 and self.tamanio_maximo > 1
+    
+    async def predecir(
+        self,
+        fila: np.ndarray,
+        usar_cache: bool = True
+    ) -> Tuple[int, np.ndarray]:
+        """
+        Encola una fila y espera la predicción de su lote.
+        
+        La fila se copia al encolarla, así que el llamador puede reutilizar
+        su arreglo apenas esta corrutina empieza a esperar.
+        
+        Args:
+            fila: Las 13 características, de forma (13,) o (1, 13)
+            usar_cache: Si es False no se consulta ni se llena la caché
+        
+        Returns:
+            Tupla con (clase_predicha, probabilidades de solo lectura)
+        """
+        clave = self.gestor.clave_cache(fila) if usar_cache else None
+        if clave is not None:
+            guardado = self.gestor.cache.obtener(clave)
+            if guardado is not None:
+                return guardado
+        
+        loop = asyncio.get_running_loop()
+        inmediato = self._filas is None and not self._tareas
+        if self._filas is None:
+            self._filas = np.empty((self.tamanio_maximo, np.size(fila)))
+            if not inmediato:
+                self._temporizador = loop.call_later(
+                    self.ventana_segundos,
+                    self._despachar
+                )
+        
+        futuro = loop.create_future()
+        self._filas[len(self._futuros)] = np.ravel(fila)
+        self._futuros.append(futuro)
+        if inmediato or len(self._futuros) >= self.tamanio_maximo:
+            self._despachar()
+        
+        resultado, huella = await futuro
+        # Un modelo recargado mientras se esperaba tiene otra huella: el
+        # resultado se guarda con la del modelo que realmente lo calculó.
+        if clave is not None:
+            self.gestor.cache.guardar((huella, clave[1]), resultado)
+        return resultado
+    
+    def _despachar(self) -> None:
+        """Cierra el lote abierto y lanza su predicción."""
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+        filas = self._filas[:len(self._futuros)]
+        futuros = self._futuros
+        self._filas, self._futuros, self._temporizador = None, [], None
+        
+        tarea = asyncio.get_running_loop().create_task(
+            self._ejecutar(filas, futuros)
+        )
+        # El loop solo guarda referencias débiles a las tareas.
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tareas.discard)
+    
+    async def _ejecutar(
+        self,
+        filas: np.ndarray,
+        futuros: List[asyncio.Future]
+    ) -> None:
+        """Predice un lote en el pool de hilos y resuelve sus futuros."""
+        loop = asyncio.get_running_loop()
+        try:
+            clases, probabilidades, huella = await loop.run_in_executor(
+                None,
+                self.gestor.predecir_lote_con_huella,
+                filas
+            )
+        except Exception as error:
+            logger.error(f"Error en el micro-lote de {len(filas)}: {error}")
+            for futuro in futuros:
+                if not futuro.done():
+                    futuro.set_exception(error)
+            return
+        
+        self.lotes += 1
+        self.filas_procesadas += len(filas)
+        probabilidades.setflags(write=False)
+        for indice, futuro in enumerate(futuros):
+            # Un cliente que se desconecta cancela su futuro.
+            if not futuro.done():
+                futuro.set_result((
+                    (int(clases[indice]), probabilidades[indice]),
+                    huella
+                ))
+    
+    def estadisticas(self) -> Dict[str, float]:
+        """Devuelve lotes ejecutados, filas y tamaño medio de lote."""
+        return {
+            "ventana_ms": self.ventana_segundos * 1000,
+            "tamanio_maximo": self.tamanio_maximo,
+            "lotes": self.lotes,
+            "filas": self.filas_procesadas,
+            "tamanio_medio": (
+                self.filas_procesadas / self.lotes if self.lotes else 0.0
+            )
+        }
+
+
+agrupador_predicciones = AgrupadorPredicciones(
+    gestor_modelo,
+    configuracion.ventana_microlotes_ms / 1000,
+    configuracion.tamanio_maximo_microlote
+)
@@ -1,14 +1,85 @@
-import pickle
+import time
+import hashlib
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union
+)
+import joblib
 import numpy as np
-from sklearn.pipeline import Pipeline
 
-from app.config import configuracion
+from app.bosque_compilado import BosqueCompilado
+from app.cache_predicciones import CachePredicciones
+from app.config import BACKENDS_MODELO, configuracion
+from app.modelo_onnx import EvaluadorOnnx
+
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
 
 logger = logging.getLogger(__name__)
 
+# Arreglos de sklearn.tree._tree.Tree que determinan las predicciones.
+ARREGLOS_ARBOL = (
+    "children_left",
+    "children_right",
+    "feature",
+    "threshold",
+    "value"
+)
+
+
+def _arreglos_aprendidos(estimador: Any):
+    """Recorre los arreglos que aprendió un estimador, en orden estable."""
+    for nombre in sorted(vars(estimador)):
+        valor = vars(estimador)[nombre]
+        if nombre.endswith("_") and isinstance(valor, np.ndarray):
+            yield nombre, valor
+    
+    for indice, arbol in enumerate(getattr(estimador, "estimators_", [])):
+        nodos = arbol.tree_
+        for nombre in ARREGLOS_ARBOL:
+            yield f"arbol{indice}.{nombre}", getattr(nodos, nombre)
+
+
+def calcular_huella(modelo: "Pipeline") -> str:
+    """
+    Calcula una huella corta del contenido de un modelo entrenado.
+    
+    Se resumen los arreglos aprendidos (media y escala del StandardScaler,
+    nodos de cada árbol) y no los bytes del pickle, que cambian según el
+    modelo esté recién entrenado o se haya leído con joblib, con o sin
+    mmap_mode. Así el mismo modelo tiene la misma huella en cada réplica
+    y en los artefactos compilado y ONNX, que la guardan al entrenar.
+    """
+    resumen = hashlib.blake2b(digest_size=8)
+    pasos = getattr(modelo, "steps", [("modelo", modelo)])
+    for nombre_paso, paso in pasos:
+        resumen.update(f"{nombre_paso}:{type(paso).__name__}".encode())
+        for nombre, arreglo in _arreglos_aprendidos(paso):
+            arreglo = np.ascontiguousarray(arreglo)
+            resumen.update(f"{nombre}{arreglo.dtype}{arreglo.shape}".encode())
+            resumen.update(arreglo.tobytes())
+    return resumen.hexdigest()
+
+
+class ModeloActivo(NamedTuple):
+    """Modelo en uso junto con los datos de su carga."""
+    
+    modelo: Optional["Pipeline"]
+    evaluador: Optional[Union[BosqueCompilado, EvaluadorOnnx]]
+    huella: Optional[str]
+    origen: str
+    version: Optional[str] = None
+    segundos_carga: Optional[float] = None
+    cargado_en: Optional[float] = None
+
 
 class GestorModelo:
     """Gestor para cargar y usar el modelo entrenado."""
@@ -20,41 +91,282 @@ class GestorModelo:
     }
     
     def __init__(self):
-        self.modelo: Optional[Pipeline] = None
+        self.activo: Optional[ModeloActivo] = None
         self.ruta_modelo: Path = Path(configuracion.ruta_modelo)
+        self.ruta_modelo_compilado: Path = Path(
+            configuracion.ruta_modelo_compilado
+        )
+        self.ruta_modelo_onnx: Path = Path(configuracion.ruta_modelo_onnx)
+        self.backend: str = configuracion.backend_modelo
+        self.cache = CachePredicciones(
+            configuracion.tamanio_cache_predicciones
+        )
+    
+    @property
+    def modelo(self) -> Optional["Pipeline"]:
+        """Pipeline en uso, o None si se sirve solo desde un evaluador."""
+        activo = self.activo
+        return activo.modelo if activo is not None else None
+    
+    @property
+    def evaluador(self) -> Optional[Union[BosqueCompilado, EvaluadorOnnx]]:
+        """Evaluador en uso (compilado u ONNX), si lo hay."""
+        activo = self.activo
+        return activo.evaluador if activo is not None else None
+    
+    @property
+    def huella_modelo(self) -> Optional[str]:
+        """Huella del modelo en uso."""
+        activo = self.activo
+        return activo.huella if activo is not None else None
+    
+    @property
+    def segundos_carga(self) -> Optional[float]:
+        """Lo que tardó la carga del modelo en uso."""
+        activo = self.activo
+        return activo.segundos_carga if activo is not None else None
+    
+    def artefactos(self) -> List[Path]:
+        """Archivos de los que leer_modelo puede cargar el modelo."""
+        if self.backend == "onnx":
+            return [self.ruta_modelo_onnx]
+        return [self.ruta_modelo_compilado, self.ruta_modelo]
+        
+    def leer_modelo(self) -> Optional[ModeloActivo]:
+        """
+        Lee de disco el modelo del backend configurado, sin activarlo.
+        
+        Se prefiere el evaluador compilado, que se mapea en memoria: varias
+        réplicas o workers en el mismo nodo comparten sus páginas en lugar
+        de tener una copia cada uno. Si no existe se carga el pipeline con
+        joblib. Con MODEL_BACKEND=onnx se carga solo el modelo ONNX.
+        
+        Returns:
+            El modelo listo para activar, o None si no hay artefacto
+        """
+        if self.backend not in BACKENDS_MODELO:
+            raise ValueError(
+                f"MODEL_BACKEND debe ser uno de {BACKENDS_MODELO}, "
+                f"se recibió {self.backend!r}"
+            )
+        
+        inicio = time.perf_counter()
+        ruta = next((ruta for ruta in self.artefactos() if ruta.exists()), None)
+        if ruta is None:
+            return None
+        
+        if self.backend == "onnx":
+            activo = self.preparar_evaluador(EvaluadorOnnx(ruta), str(ruta))
+        elif ruta == self.ruta_modelo_compilado:
+            activo = self.preparar_evaluador(
+                BosqueCompilado.cargar(ruta),
+                str(ruta)
+            )
+        else:
+            # Los árboles de sklearn copian sus nodos al deserializarse,
+            # así que aquí mmap_mode solo evita copias intermedias.
+            activo = self.preparar_modelo(
+                joblib.load(ruta, mmap_mode="r"),
+                str(ruta)
+            )
+        
+        return activo._replace(segundos_carga=time.perf_counter() - inicio)
         
     def cargar_modelo(self) -> None:
-        """Carga el modelo desde el archivo pickle."""
+        """Carga y activa el modelo del backend configurado."""
         try:
-            if not self.ruta_modelo.exists():
+            activo = self.leer_modelo()
+            if activo is None:
                 logger.warning(
-                    f"Modelo no encontrado en {self.ruta_modelo}. "
+                    f"Modelo no encontrado en {self.artefactos()[-1]}. "
                     "Ejecute el entrenamiento primero."
                 )
                 return
-                
-            with open(self.ruta_modelo, 'rb') as archivo:
-                self.modelo = pickle.load(archivo)
-                
-            logger.info(f"Modelo cargado exitosamente desde {self.ruta_modelo}")
+            
+            self.activar(activo)
+            logger.info(
+                f"Modelo cargado exitosamente desde {activo.origen} "
+                f"en {activo.segundos_carga * 1000:.1f} ms"
+            )
             
         except Exception as error:
             logger.error(f"Error al cargar el modelo: {error}")
             raise
+    
+    def preparar_modelo(
+        self,
+        modelo: "Pipeline",
+        origen: str = "memoria",
+        version: Optional[str] = None
+    ) -> ModeloActivo:
+        """
+        Compila el evaluador rápido de un pipeline, sin activarlo.
+        
+        Si el pipeline no tiene la forma [StandardScaler] +
+        RandomForestClassifier se sigue usando predict_proba del pipeline.
+        
+        Args:
+            modelo: Pipeline entrenado
+            origen: Archivo o URI de donde se leyó
+            version: Versión del registro de MLflow, si viene de ahí
+            
+        Returns:
+            El modelo listo para activar
+        """
+        evaluador = None
+        try:
+            evaluador = BosqueCompilado.desde_pipeline(modelo)
+            evaluador.preparar_explicaciones()
+        except TypeError as error:
+            logger.warning(
+                f"Se usará el pipeline sin compilar: {error}"
+            )
+        
+        return ModeloActivo(
+            modelo=modelo,
+            evaluador=evaluador,
+            huella=calcular_huella(modelo),
+            origen=origen,
+            version=version
+        )
+    
+    def preparar_evaluador(
+        self,
+        evaluador: Union[BosqueCompilado, EvaluadorOnnx],
+        origen: str = "memoria",
+        version: Optional[str] = None
+    ) -> ModeloActivo:
+        """
+        Prepara un evaluador para servir sin pipeline, sin activarlo.
+        
+        Args:
+            evaluador: BosqueCompilado cargado de disco o EvaluadorOnnx
+            origen: Archivo o URI de donde se leyó
+            version: Versión del registro de MLflow, si viene de ahí
+            
+        Returns:
+            El modelo listo para activar
+        """
+        if (
+            isinstance(evaluador, BosqueCompilado)
+            and evaluador.contribuciones_nodo is None
+        ):
+            evaluador.preparar_explicaciones()
+        
+        return ModeloActivo(
+            modelo=None,
+            evaluador=evaluador,
+            huella=evaluador.huella,
+            origen=origen,
+            version=version
+        )
+    
+    def activar(self, activo: Optional[ModeloActivo]) -> None:
+        """
+        Cambia el modelo en uso y vacía la caché de predicciones.
+        
+        El cambio es una sola asignación y cada predicción toma una sola
+        referencia a self.activo, así que una petición en curso usa por
+        completo el modelo anterior o el nuevo, nunca una mezcla.
+        
+        Args:
+            activo: Modelo preparado, o None para descargarlo
+        """
+        if activo is not None and activo.cargado_en is None:
+            activo = activo._replace(cargado_en=time.time())
+        self.activo = activo
+        self.cache.limpiar()
+        
+    def establecer_modelo(self, modelo: Optional["Pipeline"]) -> None:
+        """
+        Reemplaza el modelo en uso por un pipeline ya entrenado.
+        
+        Args:
+            modelo: Pipeline entrenado, o None para descargarlo
+        """
+        self.activar(
+            self.preparar_modelo(modelo) if modelo is not None else None
+        )
+        
+    def establecer_evaluador(
+        self,
+        evaluador: Union[BosqueCompilado, EvaluadorOnnx]
+    ) -> None:
+        """
+        Sirve directamente desde un evaluador, sin pipeline.
+        
+        Args:
+            evaluador: BosqueCompilado cargado de disco o EvaluadorOnnx
+        """
+        self.activar(self.preparar_evaluador(evaluador))
+    
+    def validar(self, activo: ModeloActivo, filas: np.ndarray) -> None:
+        """
+        Comprueba un modelo preparado antes de activarlo.
+        
+        Predecir también sirve de calentamiento: recorre los arreglos del
+        evaluador (y con ello las páginas mapeadas) antes de recibir
+        tráfico.
+        
+        Args:
+            activo: Modelo leído con leer_modelo o preparar_modelo
+            filas: Filas válidas de prueba, forma (N, 13)
             
+        Raises:
+            ValueError: Si el modelo no predice probabilidades válidas
+        """
+        clases, probabilidades = self._predecir_con(activo, filas)
+        
+        if probabilidades.shape != (len(filas), len(self.NOMBRES_CLASES)):
+            raise ValueError(
+                "El modelo devuelve probabilidades de forma "
+                f"{probabilidades.shape}"
+            )
+        if not (
+            np.isfinite(probabilidades).all()
+            and np.allclose(probabilidades.sum(axis=1), 1.0)
+        ):
+            raise ValueError("El modelo no devuelve probabilidades válidas")
+        if not set(clases.tolist()) <= set(self.NOMBRES_CLASES):
+            raise ValueError("El modelo predice clases desconocidas")
+    
+    def descripcion(self) -> Optional[Dict[str, Any]]:
+        """Describe el modelo en uso para /health."""
+        activo = self.activo
+        if activo is None:
+            return None
+        return {
+            "huella": activo.huella,
+            "version_registro": activo.version,
+            "origen": activo.origen,
+            "backend": type(activo.evaluador or activo.modelo).__name__,
+            "cargado_en": activo.cargado_en,
+            "segundos_carga": activo.segundos_carga
+        }
+        
     def esta_cargado(self) -> bool:
         """Verifica si el modelo está cargado."""
-        return self.modelo is not None
+        return self.activo is not None
+    
+    @property
+    def clases(self) -> np.ndarray:
+        """Clases que predice el modelo, en el orden de probabilidades."""
+        activo = self.activo
+        if activo.evaluador is not None:
+            return activo.evaluador.clases
+        return activo.modelo.classes_
         
     def predecir(
         self,
-        caracteristicas: List[float]
+        caracteristicas: List[float],
+        usar_cache: bool = True
     ) -> tuple[int, List[float]]:
         """
         Realiza una predicción con el modelo.
         
         Args:
             caracteristicas: Lista de características del vino
+            usar_cache: Si es False se recalcula aunque esté en caché
             
         Returns:
             Tupla con (clase_predicha, probabilidades)
@@ -66,12 +378,11 @@ class GestorModelo:
             )
             
         try:
-            caracteristicas_array = np.array(caracteristicas).reshape(1, -1)
-            
-            clase_predicha = self.modelo.predict(caracteristicas_array)[0]
-            probabilidades = self.modelo.predict_proba(
-                caracteristicas_array
-            )[0].tolist()
+            clase_predicha, probabilidades = self.predecir_fila(
+                np.asarray(caracteristicas, dtype=np.float64),
+                usar_cache
+            )
+            probabilidades = probabilidades.tolist()
             
             logger.info(
                 f"Predicción realizada: clase={clase_predicha}, "
@@ -84,6 +395,171 @@ class GestorModelo:
             logger.error(f"Error en la predicción: {error}")
             raise
             
+    def predecir_fila(
+        self,
+        fila: np.ndarray,
+        usar_cache: bool = True
+    ) -> Tuple[int, np.ndarray]:
+        """
+        Predice una sola fila pasando por la caché de predicciones.
+        
+        La clave es la huella del modelo más los bytes exactos de la fila,
+        así que solo se reutiliza un resultado para valores idénticos.
+        
+        Args:
+            fila: Las 13 características, de forma (13,) o (1, 13)
+            usar_cache: Si es False no se consulta ni se llena la caché
+            
+        Returns:
+            Tupla con (clase_predicha, probabilidades de solo lectura)
+        """
+        activo = self._obtener_activo()
+        fila = np.asarray(fila, dtype=np.float64).reshape(1, -1)
+        
+        clave = self.clave_cache(fila, activo.huella) if usar_cache else None
+        if clave is not None:
+            guardado = self.cache.obtener(clave)
+            if guardado is not None:
+                return guardado
+        
+        clases, probabilidades = self._predecir_con(activo, fila)
+        probabilidades.setflags(write=False)
+        resultado = (int(clases[0]), probabilidades[0])
+        
+        if clave is not None:
+            self.cache.guardar(clave, resultado)
+        return resultado
+    
+    def clave_cache(
+        self,
+        fila: np.ndarray,
+        huella: Optional[str] = None
+    ) -> Optional[Tuple[str, bytes]]:
+        """
+        Arma la clave de caché de una fila.
+        
+        Args:
+            fila: Las 13 características
+            huella: Huella del modelo; por defecto la del modelo en uso
+        
+        Returns:
+            (huella, bytes de la fila), o None si la caché está
+            desactivada
+        """
+        if not self.cache.habilitada:
+            return None
+        return (
+            self.huella_modelo if huella is None else huella,
+            np.asarray(fila, dtype=np.float64).tobytes()
+        )
+    
+    def _obtener_activo(self) -> ModeloActivo:
+        """Toma el modelo en uso, o falla si no hay ninguno."""
+        activo = self.activo
+        if activo is None:
+            raise RuntimeError(
+                "El modelo no está cargado. "
+                "Verifique que el entrenamiento se haya ejecutado."
+            )
+        return activo
+    
+    def predecir_lote(
+        self,
+        caracteristicas: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predice un lote completo con una sola pasada sobre los árboles.
+        
+        Usa el evaluador cuando existe. Las probabilidades del compilado
+        son idénticas bit a bit a las de predict_proba del pipeline; las
+        de ONNX difieren a lo sumo por el redondeo de float32.
+        
+        Args:
+            caracteristicas: Matriz (N, 13) con una fila por vino
+            
+        Returns:
+            Tupla con (clases_predichas, probabilidades) de formas
+            (N,) y (N, n_clases)
+        """
+        return self._predecir_con(self._obtener_activo(), caracteristicas)
+    
+    def predecir_lote_con_huella(
+        self,
+        caracteristicas: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[str]]:
+        """
+        Igual que predecir_lote, y además la huella del modelo que predijo.
+        
+        Toma una sola referencia al modelo activo, así que la huella
+        corresponde a las probabilidades aunque una recarga lo cambie
+        durante la predicción.
+        
+        Args:
+            caracteristicas: Matriz (N, 13) con una fila por vino
+            
+        Returns:
+            Tupla con (clases_predichas, probabilidades, huella)
+        """
+        activo = self._obtener_activo()
+        clases, probabilidades = self._predecir_con(activo, caracteristicas)
+        return clases, probabilidades, activo.huella
+    
+    def _predecir_con(
+        self,
+        activo: ModeloActivo,
+        caracteristicas: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Predice un lote con un modelo concreto, activo o no."""
+        caracteristicas = np.asarray(caracteristicas, dtype=np.float64)
+        if caracteristicas.ndim != 2:
+            raise ValueError(
+                "Se esperaba una matriz (N, n_caracteristicas), "
+                f"se recibió forma {caracteristicas.shape}"
+            )
+        
+        if activo.evaluador is not None:
+            clases, probabilidades = activo.evaluador.predecir(caracteristicas)
+            return clases.astype(np.int64), probabilidades
+        
+        probabilidades = activo.modelo.predict_proba(caracteristicas)
+        # Es exactamente lo que hace predict() del RandomForest, sin
+        # recorrer los árboles una segunda vez.
+        clases = activo.modelo.classes_[np.argmax(probabilidades, axis=1)]
+        
+        return clases.astype(np.int64), probabilidades
+    
+    def explicar_lote(
+        self,
+        caracteristicas: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Predice un lote y descompone cada predicción por característica.
+        
+        Args:
+            caracteristicas: Matriz (N, 13) con una fila por vino
+            
+        Returns:
+            Tupla con (clases_predichas, probabilidades, valor_base,
+            contribuciones) de formas (N,), (N, C), (C,) y (N, 13, C)
+        """
+        evaluador = self._obtener_activo().evaluador
+        if not isinstance(evaluador, BosqueCompilado):
+            raise NotImplementedError(
+                "Las explicaciones requieren el RandomForest compilado"
+            )
+        
+        probabilidades, valor_base, contribuciones = evaluador.explicar(
+            caracteristicas
+        )
+        clases = evaluador.clases[np.argmax(probabilidades, axis=1)]
+        
+        return (
+            clases.astype(np.int64),
+            probabilidades,
+            valor_base,
+            contribuciones
+        )
+    
     def obtener_nombre_clase(self, clase: int) -> str:
         """Obtiene el nombre descriptivo de una clase."""
         return self.NOMBRES_CLASES.get(
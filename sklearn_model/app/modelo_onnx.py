@@ -0,0 +1,89 @@
+"""
+Evaluador del clasificador de vinos exportado a ONNX.
+
+Solo depende de onnxruntime y NumPy: con MODEL_BACKEND=onnx el servicio
+predice sin importar scikit-learn ni deserializar el pipeline.
+"""
+import logging
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Nombres fijados al exportar en pipeline/exportar_onnx.py.
+ENTRADA_ONNX = "caracteristicas"
+SALIDA_CLASES = "label"
+SALIDA_PROBABILIDADES = "probabilities"
+METADATO_HUELLA = "huella"
+# Directorio del run de MLflow donde pipeline.train guarda el modelo ONNX.
+DIRECTORIO_REGISTRO_ONNX = "onnx"
+
+
+class EvaluadorOnnx:
+    """
+    Ejecuta el pipeline exportado con una sesión de ONNX Runtime.
+    
+    Expone la misma interfaz de predicción que BosqueCompilado
+    (predecir, predecir_proba y clases) para que GestorModelo los use
+    de forma intercambiable.
+    """
+    
+    def __init__(self, ruta: Union[str, Path], hilos: int = 1):
+        try:
+            import onnxruntime
+        except ImportError as error:
+            raise RuntimeError(
+                "MODEL_BACKEND=onnx requiere tener onnxruntime instalado"
+            ) from error
+        
+        opciones = onnxruntime.SessionOptions()
+        # Las peticiones ya se reparten entre hilos del servidor; un hilo
+        # por sesión evita sobresuscribir la CPU.
+        opciones.intra_op_num_threads = hilos
+        opciones.inter_op_num_threads = 1
+        self.sesion = onnxruntime.InferenceSession(
+            str(ruta),
+            sess_options=opciones,
+            providers=["CPUExecutionProvider"]
+        )
+        
+        metadatos = self.sesion.get_modelmeta().custom_metadata_map
+        self.huella: Optional[str] = metadatos.get(METADATO_HUELLA)
+        self.clases = np.asarray(
+            metadatos.get("clases", "0,1,2").split(","),
+            dtype=np.int64
+        )
+        self.n_caracteristicas = self.sesion.get_inputs()[0].shape[1]
+    
+    def predecir(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predice clases y probabilidades de un lote.
+        
+        Args:
+            X: Matriz (N, 13) en la escala original de las características
+        
+        Returns:
+            Tupla con (clases, probabilidades) de formas (N,) y (N, C)
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_caracteristicas:
+            raise ValueError(
+                f"Se esperaban {self.n_caracteristicas} características, "
+                f"se recibió forma {X.shape}"
+            )
+        
+        _, probabilidades = self.sesion.run(
+            [SALIDA_CLASES, SALIDA_PROBABILIDADES],
+            {ENTRADA_ONNX: X}
+        )
+        probabilidades = np.asarray(probabilidades, dtype=np.float64)
+        # Se decide con argmax sobre las probabilidades, igual que
+        # predict() del RandomForest, en lugar de usar la etiqueta de ONNX.
+        clases = self.clases[np.argmax(probabilidades, axis=1)]
+        return clases, probabilidades
+    
+    def predecir_proba(self, X: np.ndarray) -> np.ndarray:
+        """Devuelve solo las probabilidades de predecir()."""
+        return self.predecir(X)[1]
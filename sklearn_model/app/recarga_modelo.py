@@ -0,0 +1,267 @@
+"""
+Recarga en caliente del modelo.
+
+Un reentrenamiento con pipeline.train reescribe los artefactos en disco y
+registra una versión nueva de wine_classifier en MLflow. El vigilante los
+revisa periódicamente y, cuando cambian, lee el modelo nuevo en el pool
+de hilos, lo valida y calienta, y recién entonces lo activa con una sola
+asignación. Las peticiones en curso terminan con el modelo anterior.
+"""
+import asyncio
+import logging
+import time
+import tempfile
+from contextlib import suppress
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.config import configuracion
+from app.model import GestorModelo, ModeloActivo, gestor_modelo
+from app.modelo_onnx import DIRECTORIO_REGISTRO_ONNX, EvaluadorOnnx
+from app.schemas import LIMITES_INFERIORES, LIMITES_SUPERIORES
+
+logger = logging.getLogger(__name__)
+
+
+def filas_de_prueba(cantidad: int) -> np.ndarray:
+    """
+    Genera filas válidas que recorren el rango de cada característica.
+    
+    Las características sin cota superior se recorren hasta 2000, por
+    encima de cualquier valor del dataset Wine.
+    """
+    topes = np.minimum(LIMITES_SUPERIORES, 2000.0)
+    fracciones = np.linspace(0.0, 1.0, max(cantidad, 2))[:, None]
+    return LIMITES_INFERIORES + fracciones * (topes - LIMITES_INFERIORES)
+
+
+class VigilanteModelo:
+    """
+    Detecta modelos nuevos y los activa sin reiniciar el servicio.
+    
+    Sin alias de registro se vigilan la fecha de modificación y el tamaño
+    de los artefactos que usaría GestorModelo.leer_modelo. Un cambio se
+    carga recién cuando se mantiene igual durante una revisión completa,
+    para no leer un archivo que el entrenamiento todavía está escribiendo.
+    Con MODEL_REGISTRY_ALIAS se vigila en cambio la versión a la que
+    apunta ese alias en el registro de MLflow.
+    """
+    
+    def __init__(
+        self,
+        gestor: GestorModelo,
+        intervalo_segundos: float,
+        nombre_registro: str,
+        alias_registro: Optional[str] = None,
+        filas_validacion: int = 64
+    ):
+        self.gestor = gestor
+        self.intervalo_segundos = intervalo_segundos
+        self.nombre_registro = nombre_registro
+        self.alias_registro = alias_registro or None
+        self.filas_validacion = filas_de_prueba(filas_validacion)
+        self._firma_cargada: Optional[Tuple] = None
+        self._firma_pendiente: Optional[Tuple] = None
+        self._version_cargada: Optional[str] = None
+        self._tarea: Optional[asyncio.Task] = None
+        self.recargas = 0
+        self.fallos = 0
+        self.ultima_revision: Optional[float] = None
+    
+    @property
+    def habilitado(self) -> bool:
+        """Indica si se vigila (un intervalo de 0 lo desactiva)."""
+        return self.intervalo_segundos > 0
+    
+    def _firma_artefactos(self) -> Tuple:
+        """Ruta, mtime y tamaño de cada artefacto que existe."""
+        firma = []
+        for ruta in self.gestor.artefactos():
+            with suppress(FileNotFoundError):
+                estado = ruta.stat()
+                firma.append((str(ruta), estado.st_mtime_ns, estado.st_size))
+        return tuple(firma)
+    
+    def _leer_registro(self) -> Optional[ModeloActivo]:
+        """Lee el modelo del alias si apunta a una versión nueva."""
+        from mlflow.tracking import MlflowClient
+        
+        version_modelo = MlflowClient().get_model_version_by_alias(
+            self.nombre_registro,
+            self.alias_registro
+        )
+        version = version_modelo.version
+        if version == self._version_cargada:
+            return None
+        
+        # Se marca antes de leer para no reintentar en cada revisión una
+        # versión que no se puede cargar.
+        self._version_cargada = version
+        uri = f"models:/{self.nombre_registro}@{self.alias_registro}"
+        inicio = time.perf_counter()
+        if self.gestor.backend == "onnx":
+            activo = self.leer_onnx_registro(
+                version_modelo.run_id,
+                uri,
+                version
+            )
+        else:
+            import mlflow.sklearn
+            
+            activo = self.gestor.preparar_modelo(
+                mlflow.sklearn.load_model(uri),
+                uri,
+                version
+            )
+        return activo._replace(segundos_carga=time.perf_counter() - inicio)
+    
+    def leer_onnx_registro(
+        self,
+        run_id: str,
+        origen: str,
+        version: Optional[str] = None
+    ) -> ModeloActivo:
+        """
+        Lee el modelo ONNX que el entrenamiento guardó junto a la versión.
+        
+        Con MODEL_BACKEND=onnx una recarga no cambia el backend con el que
+        se predice, y el servicio no necesita scikit-learn ni skl2onnx
+        para leer el pipeline del registro.
+        
+        Args:
+            run_id: Run de MLflow que registró la versión
+            origen: URI del modelo en el registro
+            version: Versión a la que apunta el alias
+        
+        Returns:
+            El modelo listo para activar
+        
+        Raises:
+            RuntimeError: Si el run no guardó un modelo ONNX
+        """
+        import mlflow.artifacts
+        from mlflow.tracking import MlflowClient
+        
+        archivos = [
+            artefacto.path
+            for artefacto in MlflowClient().list_artifacts(
+                run_id,
+                DIRECTORIO_REGISTRO_ONNX
+            )
+            if artefacto.path.endswith(".onnx")
+        ]
+        if not archivos:
+            raise RuntimeError(
+                f"El run {run_id} no tiene un modelo ONNX en "
+                f"{DIRECTORIO_REGISTRO_ONNX}/"
+            )
+        
+        # La sesión de ONNX Runtime lee el archivo completo al crearse,
+        # así que el directorio temporal se puede borrar enseguida.
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = mlflow.artifacts.download_artifacts(
+                run_id=run_id,
+                artifact_path=archivos[0],
+                dst_path=directorio
+            )
+            evaluador = EvaluadorOnnx(ruta)
+        return self.gestor.preparar_evaluador(evaluador, origen, version)
+    
+    def _leer_archivo(self) -> Optional[ModeloActivo]:
+        """Lee los artefactos si cambiaron y ya terminaron de escribirse."""
+        firma = self._firma_artefactos()
+        if firma == self._firma_cargada:
+            self._firma_pendiente = None
+            return None
+        if firma != self._firma_pendiente:
+            self._firma_pendiente = firma
+            return None
+        
+        self._firma_cargada = firma
+        self._firma_pendiente = None
+        return self.gestor.leer_modelo()
+    
+    def revisar(self) -> bool:
+        """
+        Hace una revisión y activa el modelo nuevo si lo hay.
+        
+        Bloquea mientras lee y valida, así que desde el event loop se
+        llama en el pool de hilos.
+        
+        Returns:
+            True si se activó un modelo nuevo
+        """
+        self.ultima_revision = time.time()
+        leer: Callable[[], Optional[ModeloActivo]] = (
+            self._leer_registro if self.alias_registro else self._leer_archivo
+        )
+        
+        try:
+            activo = leer()
+            if activo is None:
+                return False
+            self.gestor.validar(activo, self.filas_validacion)
+        except Exception as error:
+            self.fallos += 1
+            logger.error(
+                f"No se activó el modelo nuevo, se mantiene el actual: {error}"
+            )
+            return False
+        
+        if activo.huella is not None and activo.huella == (
+            self.gestor.huella_modelo
+        ):
+            return False
+        
+        self.gestor.activar(activo)
+        self.recargas += 1
+        logger.info(
+            f"Modelo recargado desde {activo.origen} "
+            f"(huella={activo.huella}, version={activo.version}) "
+            f"en {activo.segundos_carga * 1000:.1f} ms"
+        )
+        return True
+    
+    async def _vigilar(self) -> None:
+        """Revisa cada intervalo_segundos hasta que se cancele."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.intervalo_segundos)
+            await loop.run_in_executor(None, self.revisar)
+    
+    def iniciar(self) -> None:
+        """Toma como punto de partida el modelo cargado y empieza a vigilar."""
+        if not self.habilitado:
+            return
+        self._firma_cargada = self._firma_artefactos()
+        activo = self.gestor.activo
+        self._version_cargada = activo.version if activo is not None else None
+        self._tarea = asyncio.get_running_loop().create_task(self._vigilar())
+    
+    async def detener(self) -> None:
+        """Cancela la vigilancia y espera a que termine."""
+        if self._tarea is None:
+            return
+        self._tarea.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._tarea
+        self._tarea = None
+    
+    def estadisticas(self) -> Dict[str, Any]:
+        """Devuelve recargas, fallos y la hora de la última revisión."""
+        return {
+            "intervalo_s": self.intervalo_segundos,
+            "alias_registro": self.alias_registro,
+            "recargas": self.recargas,
+            "fallos": self.fallos,
+            "ultima_revision": self.ultima_revision
+        }
+
+
+vigilante_modelo = VigilanteModelo(
+    gestor_modelo,
+    configuracion.intervalo_recarga_modelo_s,
+    configuracion.nombre_modelo_registro,
+    configuracion.alias_modelo_registro
+)
@@ -1,5 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from app.config import configuracion
 
 
 class CaracteristicasVino(BaseModel):
@@ -73,6 +76,9 @@ class CaracteristicasVino(BaseModel):
     )
     
     class Config:
+        # Igual que /predict/batch: sin esto Infinity cumple ge=0.0 y el
+        # evaluador compilado lo clasificaría como un valor más.
+        allow_inf_nan = False
         json_schema_extra = {
             "example": {
                 "alcohol": 13.2,
@@ -92,6 +98,122 @@ class CaracteristicasVino(BaseModel):
         }
 
 
+NOMBRES_CARACTERISTICAS = list(CaracteristicasVino.model_fields)
+
+# Límites de cada característica en el mismo orden que las columnas,
+# para validar un lote completo con una sola comparación vectorizada.
+LIMITES_INFERIORES = np.array([
+    CaracteristicasVino.model_fields[nombre].metadata[0].ge
+    for nombre in NOMBRES_CARACTERISTICAS
+])
+LIMITES_SUPERIORES = np.array([
+    next(
+        (
+            restriccion.le
+            for restriccion in CaracteristicasVino.model_fields[
+                nombre
+            ].metadata
+            if getattr(restriccion, "le", None) is not None
+        ),
+        np.inf
+    )
+    for nombre in NOMBRES_CARACTERISTICAS
+])
+
+
+class LoteCaracteristicas(BaseModel):
+    """
+    Esquema para predicción por lotes.
+    
+    Acepta filas (una lista de 13 valores por vino, en el orden de
+    NOMBRES_CARACTERISTICAS) o columnas (una lista de valores por
+    característica). Se debe enviar exactamente uno de los dos.
+    """
+    
+    filas: Optional[List[List[float]]] = Field(
+        None,
+        description="Matriz de vinos, 13 valores por fila"
+    )
+    columnas: Optional[Dict[str, List[float]]] = Field(
+        None,
+        description="Valores por característica, todas del mismo largo"
+    )
+    
+    _matriz: np.ndarray = PrivateAttr()
+    
+    @model_validator(mode="after")
+    def construir_matriz(self) -> "LoteCaracteristicas":
+        if (self.filas is None) == (self.columnas is None):
+            raise ValueError("Envíe exactamente uno de 'filas' o 'columnas'")
+        
+        if self.filas is not None:
+            matriz = np.asarray(self.filas, dtype=np.float64)
+            if matriz.ndim != 2 or matriz.shape[1] != len(
+                NOMBRES_CARACTERISTICAS
+            ):
+                raise ValueError(
+                    f"Cada fila debe tener {len(NOMBRES_CARACTERISTICAS)} "
+                    "valores"
+                )
+        else:
+            faltantes = set(NOMBRES_CARACTERISTICAS) - set(self.columnas)
+            sobrantes = set(self.columnas) - set(NOMBRES_CARACTERISTICAS)
+            if faltantes or sobrantes:
+                raise ValueError(
+                    f"Columnas faltantes: {sorted(faltantes)}, "
+                    f"desconocidas: {sorted(sobrantes)}"
+                )
+            largos = {len(valores) for valores in self.columnas.values()}
+            if len(largos) != 1:
+                raise ValueError(
+                    "Todas las columnas deben tener el mismo largo"
+                )
+            matriz = np.column_stack([
+                np.asarray(self.columnas[nombre], dtype=np.float64)
+                for nombre in NOMBRES_CARACTERISTICAS
+            ])
+        
+        if len(matriz) == 0:
+            raise ValueError("El lote está vacío")
+        if len(matriz) > configuracion.tamanio_maximo_lote:
+            raise ValueError(
+                f"El lote tiene {len(matriz)} filas, el máximo es "
+                f"{configuracion.tamanio_maximo_lote}"
+            )
+        
+        invalidos = (
+            ~np.isfinite(matriz)
+            | (matriz < LIMITES_INFERIORES)
+            | (matriz > LIMITES_SUPERIORES)
+        )
+        if invalidos.any():
+            filas, columnas = np.nonzero(invalidos)
+            detalle = ", ".join(
+                f"fila {fila}: {NOMBRES_CARACTERISTICAS[columna]}"
+                for fila, columna in zip(filas[:5], columnas[:5])
+            )
+            raise ValueError(
+                f"{invalidos.sum()} valores fuera de rango ({detalle})"
+            )
+        
+        self._matriz = matriz
+        return self
+    
+    def a_matriz(self) -> np.ndarray:
+        """Devuelve el lote validado como matriz (N, 13)."""
+        return self._matriz
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "filas": [
+                    [13.2, 2.3, 2.4, 19.5, 100.0, 2.8, 3.0,
+                     0.3, 1.9, 5.6, 1.0, 3.2, 1050.0]
+                ]
+            }
+        }
+
+
 class PrediccionRespuesta(BaseModel):
     """Esquema para la respuesta de predicción."""
     
@@ -115,10 +237,72 @@ class PrediccionRespuesta(BaseModel):
     )
 
 
+class PrediccionLoteRespuesta(BaseModel):
+    """Esquema columnar para la respuesta de predicción por lotes."""
+    
+    total: int = Field(..., description="Cantidad de vinos clasificados")
+    clases_predichas: List[int] = Field(
+        ...,
+        description="Clase predicha para cada fila"
+    )
+    confianzas: List[float] = Field(
+        ...,
+        description="Probabilidad máxima de cada fila"
+    )
+    probabilidades: List[List[float]] = Field(
+        ...,
+        description="Probabilidades por clase de cada fila"
+    )
+    nombres_clases: Dict[int, str] = Field(
+        ...,
+        description="Nombre descriptivo de cada clase, enviado una sola vez"
+    )
+
+
+class ExplicacionRespuesta(BaseModel):
+    """
+    Esquema para la explicación de predicciones por característica.
+    
+    Para cada fila, valor_base de la clase predicha más la suma de sus
+    contribuciones da la confianza de esa predicción.
+    """
+    
+    total: int = Field(..., description="Cantidad de vinos explicados")
+    clases_predichas: List[int] = Field(
+        ...,
+        description="Clase predicha para cada fila"
+    )
+    probabilidades: List[List[float]] = Field(
+        ...,
+        description="Probabilidades por clase de cada fila"
+    )
+    valor_base: List[float] = Field(
+        ...,
+        description="Probabilidad media por clase en la raíz de los árboles"
+    )
+    nombres_caracteristicas: List[str] = Field(
+        ...,
+        description="Orden de las columnas de contribuciones"
+    )
+    contribuciones: List[List[float]] = Field(
+        ...,
+        description="Aporte de cada característica a la clase predicha"
+    )
+    nombres_clases: Dict[int, str] = Field(
+        ...,
+        description="Nombre descriptivo de cada clase, enviado una sola vez"
+    )
+
+
 class EstadoSalud(BaseModel):
     """Esquema para el estado de salud del servicio."""
     
     estado: str
     modelo_cargado: bool
     mlflow_conectado: bool
-    version: str = "1.0.0"
\ No newline at end of file
+    mlflow: Optional[Dict[str, Any]] = None
+    version: str = "1.0.0"
+    cache_predicciones: Optional[Dict[str, float]] = None
+    microlotes: Optional[Dict[str, float]] = None
+    modelo: Optional[Dict[str, Any]] = None
+    recarga_modelo: Optional[Dict[str, Any]] = None
\ No newline at end of file
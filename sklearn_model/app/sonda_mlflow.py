@@ -0,0 +1,131 @@
+"""
+Sonda de conectividad con el servidor de tracking de MLflow.
+
+mlflow.set_tracking_uri y get_tracking_uri solo guardan y leen la URI, sin
+contactar al servidor. La sonda hace un GET real a /health del servidor
+en segundo plano, con un timeout corto, y guarda el último resultado para
+que /health lo devuelva sin esperar a la red.
+"""
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.config import configuracion
+
+logger = logging.getLogger(__name__)
+
+
+class SondaMlflow:
+    """
+    Verifica periódicamente que el servidor de MLflow responda.
+    
+    Las URIs que no son http(s) (un directorio local, por ejemplo) no
+    tienen servidor al que consultar y se consideran siempre conectadas.
+    """
+    
+    def __init__(
+        self,
+        uri: str,
+        intervalo_segundos: float,
+        timeout_segundos: float,
+        transporte: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.uri = uri.rstrip("/")
+        self.intervalo_segundos = intervalo_segundos
+        self.timeout_segundos = timeout_segundos
+        self._transporte = transporte
+        self._tarea: Optional[asyncio.Task] = None
+        self.es_remota = self.uri.startswith(("http://", "https://"))
+        self.conectado = not self.es_remota
+        self.verificado_en: Optional[float] = None
+        self.latencia_ms: Optional[float] = None
+        self.error: Optional[str] = None
+    
+    async def verificar(self) -> bool:
+        """
+        Consulta una vez el servidor y guarda el resultado.
+        
+        Returns:
+            True si el servidor respondió 200 dentro del timeout
+        """
+        if not self.es_remota:
+            self.verificado_en = time.time()
+            return self.conectado
+        
+        inicio = time.perf_counter()
+        try:
+            async with httpx.AsyncClient(
+                transport=self._transporte,
+                timeout=self.timeout_segundos
+            ) as cliente:
+                respuesta = await cliente.get(f"{self.uri}/health")
+            conectado = respuesta.status_code == 200
+            error = None if conectado else f"HTTP {respuesta.status_code}"
+        except Exception as excepcion:
+            # No solo httpx.HTTPError: una URI mal formada o un fallo del
+            # transporte también dejan al servidor inalcanzable.
+            conectado = False
+            error = f"{type(excepcion).__name__}: {excepcion}"
+        
+        # Solo se registran los cambios de estado, no cada verificación.
+        if self.verificado_en is None or conectado != self.conectado:
+            nivel = logging.INFO if conectado else logging.WARNING
+            logger.log(
+                nivel,
+                f"MLflow {'conectado' if conectado else 'no disponible'} "
+                f"en {self.uri}" + (f": {error}" if error else "")
+            )
+        
+        self.latencia_ms = (time.perf_counter() - inicio) * 1000
+        self.conectado = conectado
+        self.error = error
+        self.verificado_en = time.time()
+        return conectado
+    
+    async def _vigilar(self) -> None:
+        """Verifica cada intervalo_segundos hasta que se cancele."""
+        while True:
+            try:
+                await self.verificar()
+            except Exception as excepcion:
+                # Un fallo inesperado no debe detener la vigilancia ni
+                # dejar en /health el último resultado como vigente.
+                logger.exception("Falló la verificación de MLflow")
+                self.conectado = False
+                self.error = f"{type(excepcion).__name__}: {excepcion}"
+                self.verificado_en = time.time()
+            await asyncio.sleep(self.intervalo_segundos)
+    
+    def iniciar(self) -> None:
+        """Lanza la verificación periódica; la primera es inmediata."""
+        self._tarea = asyncio.get_running_loop().create_task(self._vigilar())
+    
+    async def detener(self) -> None:
+        """Cancela la verificación periódica y espera a que termine."""
+        if self._tarea is None:
+            return
+        self._tarea.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._tarea
+        self._tarea = None
+    
+    def estado(self) -> Dict[str, Any]:
+        """Devuelve el último resultado, sin contactar al servidor."""
+        return {
+            "uri": self.uri,
+            "conectado": self.conectado,
+            "verificado_en": self.verificado_en,
+            "latencia_ms": self.latencia_ms,
+            "error": self.error
+        }
+
+
+sonda_mlflow = SondaMlflow(
+    configuracion.mlflow_tracking_uri,
+    configuracion.intervalo_sonda_mlflow_s,
+    configuracion.timeout_sonda_mlflow_s
+)
@@ -0,0 +1,135 @@
+"""
+Compara la carga del modelo con pickle contra el evaluador compilado
+mapeado en memoria.
+
+Cada carga corre en un proceso nuevo para medir un arranque en frío. Se
+reporta el tiempo de carga y cuánta memoria sumó el proceso, separada en
+anónima (privada de cada réplica) y de archivo (páginas del page cache,
+compartidas entre todos los procesos que mapean el mismo artefacto).
+
+Uso:
+    python -m benchmarks.carga_modelo --repeticiones 5
+"""
+import sys
+import json
+import pickle
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, List
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from app.bosque_compilado import BosqueCompilado
+from app.model import calcular_huella
+from pipeline.utils import cargar_datos_wine, crear_escalador
+
+CARGAS = {
+    "pickle": (
+        "import pickle\n"
+        "with open(RUTA, 'rb') as archivo:\n"
+        "    modelo = pickle.load(archivo)\n"
+    ),
+    "mmap": (
+        "from app.bosque_compilado import BosqueCompilado\n"
+        "modelo = BosqueCompilado.cargar(RUTA)\n"
+    )
+}
+
+PROCESO_HIJO = """
+import sys, json, time
+import numpy, sklearn.pipeline, sklearn.ensemble, joblib
+
+def memoria():
+    campos = {{}}
+    with open("/proc/self/status") as archivo:
+        for linea in archivo:
+            nombre, _, valor = linea.partition(":")
+            if nombre in ("RssAnon", "RssFile"):
+                campos[nombre] = int(valor.split()[0]) / 1024
+    return campos
+
+RUTA = sys.argv[1]
+antes = memoria()
+inicio = time.perf_counter()
+{carga}
+segundos = time.perf_counter() - inicio
+despues = memoria()
+print(json.dumps({{
+    "segundos": segundos,
+    "mb_anonimos": despues["RssAnon"] - antes["RssAnon"],
+    "mb_archivo": despues["RssFile"] - antes["RssFile"]
+}}))
+"""
+
+
+def preparar_artefactos(directorio: Path) -> Dict[str, Path]:
+    """Entrena el modelo de producción y lo guarda en ambos formatos."""
+    X, y, _, _ = cargar_datos_wine()
+    pipeline = Pipeline([
+        ("escalador", crear_escalador()),
+        ("clasificador", RandomForestClassifier(
+            n_estimators=100,
+            max_depth=10,
+            min_samples_split=5,
+            min_samples_leaf=2,
+            random_state=42
+        ))
+    ]).fit(X, y)
+    
+    ruta_pickle = directorio / "wine_classifier.pkl"
+    with open(ruta_pickle, "wb") as archivo:
+        pickle.dump(pipeline, archivo)
+    
+    bosque = BosqueCompilado.desde_pipeline(pipeline)
+    bosque.huella = calcular_huella(pipeline)
+    bosque.preparar_explicaciones()
+    ruta_mmap = bosque.guardar(directorio / "wine_classifier_compilado.joblib")
+    
+    return {"pickle": ruta_pickle, "mmap": ruta_mmap}
+
+
+def medir_carga(forma: str, ruta: Path, repeticiones: int) -> Dict:
+    """Carga el artefacto en procesos nuevos y resume las mediciones."""
+    codigo = PROCESO_HIJO.format(carga=CARGAS[forma])
+    mediciones: List[Dict] = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", codigo, str(ruta)],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        mediciones.append(json.loads(salida.stdout))
+    
+    return {
+        "archivo_mb": ruta.stat().st_size / 2**20,
+        **{
+            campo: statistics.median(m[campo] for m in mediciones)
+            for campo in ("segundos", "mb_anonimos", "mb_archivo")
+        }
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Tiempo y memoria de carga del modelo, pickle vs mmap"
+    )
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        artefactos = preparar_artefactos(Path(directorio))
+        resultados = {
+            forma: medir_carga(forma, ruta, args.repeticiones)
+            for forma, ruta in artefactos.items()
+        }
+    
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Compara peticiones por segundo de /predict con el decodificador rápido
+contra el camino anterior (pydantic + features_list + JSONResponse).
+
+Ambas rutas corren en el mismo proceso vía ASGI, sin red, con el mismo
+modelo, así la diferencia es la decodificación y codificación JSON.
+
+Uso:
+    python -m benchmarks.json_predict --peticiones 20000 --concurrencia 32
+"""
+import json
+import time
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict
+
+import httpx
+from fastapi.responses import JSONResponse
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from app.cache_predicciones import CachePredicciones
+from app.config import configuracion
+from app.main import app
+from app.model import gestor_modelo
+from app.schemas import CaracteristicasVino, PrediccionRespuesta
+from pipeline.utils import cargar_datos_wine, crear_escalador
+
+CUERPO = json.dumps({
+    "alcohol": 13.2,
+    "acido_malico": 2.3,
+    "ceniza": 2.4,
+    "alcalinidad_ceniza": 19.5,
+    "magnesio": 100.0,
+    "fenoles_totales": 2.8,
+    "flavonoides": 3.0,
+    "fenoles_no_flavonoides": 0.3,
+    "proantocianinas": 1.9,
+    "intensidad_color": 5.6,
+    "matiz": 1.0,
+    "od280_od315": 3.2,
+    "prolina": 1050.0
+}).encode()
+
+
+@app.post(
+    "/benchmark/predict-pydantic",
+    response_model=PrediccionRespuesta,
+    response_class=JSONResponse,
+    include_in_schema=False
+)
+async def predecir_pydantic(
+    caracteristicas: CaracteristicasVino
+) -> PrediccionRespuesta:
+    """Versión anterior de /predict, usada como referencia."""
+    features_list = [
+        caracteristicas.alcohol,
+        caracteristicas.acido_malico,
+        caracteristicas.ceniza,
+        caracteristicas.alcalinidad_ceniza,
+        caracteristicas.magnesio,
+        caracteristicas.fenoles_totales,
+        caracteristicas.flavonoides,
+        caracteristicas.fenoles_no_flavonoides,
+        caracteristicas.proantocianinas,
+        caracteristicas.intensidad_color,
+        caracteristicas.matiz,
+        caracteristicas.od280_od315,
+        caracteristicas.prolina
+    ]
+    
+    clase_predicha, probabilidades = gestor_modelo.predecir(features_list)
+    
+    return PrediccionRespuesta(
+        clase_predicha=clase_predicha,
+        nombre_clase=gestor_modelo.obtener_nombre_clase(clase_predicha),
+        probabilidades=probabilidades,
+        confianza=max(probabilidades)
+    )
+
+
+def preparar_modelo() -> str:
+    """Carga el modelo entrenado o, si no existe, entrena uno igual."""
+    if Path(configuracion.ruta_modelo).exists():
+        gestor_modelo.cargar_modelo()
+        return configuracion.ruta_modelo
+    
+    X, y, _, _ = cargar_datos_wine()
+    gestor_modelo.establecer_modelo(Pipeline([
+        ("escalador", crear_escalador()),
+        ("clasificador", RandomForestClassifier(
+            n_estimators=100,
+            max_depth=10,
+            min_samples_split=5,
+            min_samples_leaf=2,
+            random_state=42
+        ))
+    ]).fit(X, y))
+    return "entrenado en memoria"
+
+
+async def medir_ruta(ruta: str, peticiones: int, concurrencia: int) -> Dict:
+    """Envía peticiones en lazo cerrado y mide el rendimiento."""
+    transporte = httpx.ASGITransport(app=app)
+    cabeceras = {"content-type": "application/json"}
+    
+    async with httpx.AsyncClient(
+        transport=transporte,
+        base_url="http://benchmark"
+    ) as cliente:
+        respuesta = await cliente.post(ruta, content=CUERPO, headers=cabeceras)
+        respuesta.raise_for_status()
+        
+        pendientes = iter(range(peticiones))
+        
+        async def trabajador() -> None:
+            for _ in pendientes:
+                respuesta = await cliente.post(
+                    ruta,
+                    content=CUERPO,
+                    headers=cabeceras
+                )
+                respuesta.raise_for_status()
+        
+        inicio = time.perf_counter()
+        await asyncio.gather(*[trabajador() for _ in range(concurrencia)])
+        transcurrido = time.perf_counter() - inicio
+    
+    return {
+        "ruta": ruta,
+        "peticiones": peticiones,
+        "segundos": transcurrido,
+        "peticiones_por_segundo": peticiones / transcurrido
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Peticiones por segundo de /predict antes y después"
+    )
+    parser.add_argument("--peticiones", type=int, default=5000)
+    parser.add_argument("--concurrencia", type=int, default=16)
+    args = parser.parse_args()
+    
+    # Los logs por predicción del camino anterior medirían el logging.
+    logging.disable(logging.INFO)
+    modelo = preparar_modelo()
+    # Todas las peticiones llevan el mismo cuerpo; sin caché se mide la
+    # decodificación y el modelo en ambos caminos, no aciertos de caché.
+    gestor_modelo.cache = CachePredicciones(0)
+    
+    antes = asyncio.run(medir_ruta(
+        "/benchmark/predict-pydantic",
+        args.peticiones,
+        args.concurrencia
+    ))
+    despues = asyncio.run(medir_ruta(
+        "/predict",
+        args.peticiones,
+        args.concurrencia
+    ))
+    
+    print(json.dumps({
+        "modelo": modelo,
+        "antes": antes,
+        "despues": despues,
+        "mejora": (
+            despues["peticiones_por_segundo"]
+            / antes["peticiones_por_segundo"]
+        )
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,27 @@ echo "========================================"
 echo "Inicializando y entrenando modelos"
 echo "========================================"
 
-# Esperar a que MLflow esté disponible
-echo "Esperando MLflow..."
-until curl -f http://mlflow:5000/api/2.0/mlflow/experiments/search 2>/dev/null; do
-    echo "MLflow no disponible, reintentando..."
-    sleep 5
-done
-echo "✓ MLflow disponible"
-
-# Entrenar modelo sklearn
-echo ""
-echo "Entrenando modelo sklearn..."
 cd /service
-python -m pipeline.train
-echo "✓ Modelo sklearn entrenado"
+
+# Omitir el entrenamiento si los artefactos corresponden a los datos,
+# parámetros y código actuales (huella junto a wine_classifier.pkl)
+if [ "${FORCE_TRAINING:-false}" != "true" ] && python -m pipeline.huella_entrenamiento; then
+    echo "✓ Modelo sklearn vigente, se omite el entrenamiento"
+else
+    # Esperar a que MLflow esté disponible
+    echo "Esperando MLflow..."
+    until curl -f http://mlflow:5000/api/2.0/mlflow/experiments/search 2>/dev/null; do
+        echo "MLflow no disponible, reintentando..."
+        sleep 5
+    done
+    echo "✓ MLflow disponible"
+
+    # Entrenar modelo sklearn
+    echo ""
+    echo "Entrenando modelo sklearn..."
+    python -m pipeline.train
+    echo "✓ Modelo sklearn entrenado"
+fi
 
 echo ""
-echo "Modelos listos - iniciando servicio..."
\ No newline at end of file
+echo "Modelos listos - iniciando servicio..."
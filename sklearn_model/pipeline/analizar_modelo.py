@@ -1,7 +1,7 @@
 """
 Script para analizar el rendimiento del modelo en detalle.
 """
-import pickle
+import joblib
 import numpy as np
 from pathlib import Path
 from sklearn.datasets import load_wine
@@ -28,8 +28,7 @@ def analizar_modelo_detallado():
         logger.error(f"Modelo no encontrado en {ruta_modelo}")
         return
     
-    with open(ruta_modelo, 'rb') as archivo:
-        modelo = pickle.load(archivo)
+    modelo = joblib.load(ruta_modelo, mmap_mode="r")
     
     datos = load_wine()
     X, y = datos.data, datos.target
@@ -0,0 +1,200 @@
+"""
+Exportación del pipeline de vinos a ONNX y comparación contra scikit-learn.
+"""
+import os
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from app.modelo_onnx import (
+    ENTRADA_ONNX,
+    METADATO_HUELLA,
+    SALIDA_CLASES,
+    SALIDA_PROBABILIDADES,
+    EvaluadorOnnx
+)
+
+logger = logging.getLogger(__name__)
+
+# Máxima diferencia absoluta de probabilidad que se acepta. Los árboles
+# de ONNX Runtime acumulan en float32, así que la paridad no es bit a bit.
+TOLERANCIA_PROBABILIDADES = 1e-5
+
+
+def _comparar_como_sklearn(modelo_onnx, bosque) -> None:
+    """
+    Hace que el TreeEnsembleClassifier tome las mismas ramas que sklearn.
+    
+    scikit-learn convierte la fila escalada a float32 y la compara contra
+    umbrales float64 que caen entre dos valores float32. ONNX Runtime, con
+    entrada double, compara la fila sin convertir contra los umbrales que
+    skl2onnx redondeó al float32 más cercano. Se agrega un Cast a float32
+    antes de los árboles y cada umbral se redondea hacia abajo: así
+    cualquier entrada float32 toma la misma rama que en scikit-learn.
+    """
+    from onnx import TensorProto, helper
+    
+    indice_arboles, nodo = next(
+        (indice, nodo) for indice, nodo in enumerate(modelo_onnx.graph.node)
+        if nodo.op_type == "TreeEnsembleClassifier"
+    )
+    entrada_float32 = f"{nodo.input[0]}_float32"
+    modelo_onnx.graph.node.insert(indice_arboles, helper.make_node(
+        "Cast",
+        [nodo.input[0]],
+        [entrada_float32],
+        to=TensorProto.FLOAT
+    ))
+    nodo.input[0] = entrada_float32
+    
+    atributos = {
+        atributo.name: helper.get_attribute_value(atributo)
+        for atributo in nodo.attribute
+    }
+    umbrales = np.array([
+        bosque.estimators_[arbol].tree_.threshold[indice]
+        if modo == b"BRANCH_LEQ" else 0.0
+        for arbol, indice, modo in zip(
+            atributos["nodes_treeids"],
+            atributos["nodes_nodeids"],
+            atributos["nodes_modes"]
+        )
+    ])
+    umbrales_32 = umbrales.astype(np.float32)
+    por_encima = umbrales_32 > umbrales
+    umbrales_32[por_encima] = np.nextafter(
+        umbrales_32[por_encima],
+        np.float32(-np.inf)
+    )
+    
+    for atributo in nodo.attribute:
+        if atributo.name == "nodes_values":
+            atributo.floats[:] = umbrales_32.tolist()
+
+
+def exportar_onnx(
+    pipeline: Pipeline,
+    ruta: Union[str, Path],
+    huella: str
+) -> Path:
+    """
+    Convierte el pipeline entrenado a ONNX y lo guarda.
+    
+    La entrada es float64, así el StandardScaler se aplica en doble
+    precisión como en scikit-learn; las probabilidades salen como tensor
+    (sin ZipMap) para leerlas directo como matriz.
+    
+    Args:
+        pipeline: Pipeline [StandardScaler] + RandomForestClassifier
+        ruta: Archivo .onnx de destino
+        huella: Huella del pipeline, guardada en los metadatos
+    
+    Returns:
+        La ruta escrita
+    
+    Raises:
+        RuntimeError: Si skl2onnx no está instalado
+    """
+    try:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import DoubleTensorType
+    except ImportError as error:
+        raise RuntimeError(
+            "La exportación a ONNX requiere tener skl2onnx instalado"
+        ) from error
+    
+    clasificador = pipeline.steps[-1][1]
+    modelo_onnx = convert_sklearn(
+        pipeline,
+        initial_types=[(
+            ENTRADA_ONNX,
+            DoubleTensorType([None, pipeline.n_features_in_])
+        )],
+        options={id(clasificador): {"zipmap": False}}
+    )
+    _comparar_como_sklearn(modelo_onnx, clasificador)
+    nombres_salida = [salida.name for salida in modelo_onnx.graph.output]
+    if nombres_salida != [SALIDA_CLASES, SALIDA_PROBABILIDADES]:
+        raise RuntimeError(f"Salidas ONNX inesperadas: {nombres_salida}")
+    
+    for clave, valor in {
+        METADATO_HUELLA: huella,
+        "clases": ",".join(str(int(c)) for c in pipeline.classes_)
+    }.items():
+        metadato = modelo_onnx.metadata_props.add()
+        metadato.key = clave
+        metadato.value = valor
+    
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta_temporal = ruta.with_name(f".{ruta.name}.tmp")
+    ruta_temporal.write_bytes(modelo_onnx.SerializeToString())
+    os.replace(ruta_temporal, ruta)
+    return ruta
+
+
+def _latencia_ms(predecir, X: np.ndarray, repeticiones: int) -> float:
+    """Mediana en milisegundos de predecir(X) tras un calentamiento."""
+    predecir(X)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        predecir(X)
+        tiempos.append(time.perf_counter() - inicio)
+    return float(np.median(tiempos) * 1000)
+
+
+def comparar_onnx(
+    pipeline: Pipeline,
+    ruta: Union[str, Path],
+    X: np.ndarray,
+    repeticiones: int = 200
+) -> Dict[str, float]:
+    """
+    Compara el modelo ONNX contra el pipeline en paridad y latencia.
+    
+    Args:
+        pipeline: Pipeline entrenado
+        ruta: Archivo escrito por exportar_onnx
+        X: Filas de evaluación, normalmente el conjunto de prueba
+        repeticiones: Mediciones de latencia por caso
+    
+    Returns:
+        Métricas listas para registrar en MLflow
+    """
+    evaluador = EvaluadorOnnx(ruta)
+    clases_onnx, probabilidades_onnx = evaluador.predecir(X)
+    
+    fila = X[:1]
+    return {
+        "onnx_max_diff_probabilidades": float(np.max(np.abs(
+            probabilidades_onnx - pipeline.predict_proba(X)
+        ))),
+        "onnx_coincidencia_clases": float(np.mean(
+            clases_onnx == pipeline.predict(X)
+        )),
+        "latencia_fila_sklearn_ms": _latencia_ms(
+            pipeline.predict_proba,
+            fila,
+            repeticiones
+        ),
+        "latencia_fila_onnx_ms": _latencia_ms(
+            evaluador.predecir_proba,
+            fila,
+            repeticiones
+        ),
+        "latencia_lote_sklearn_ms": _latencia_ms(
+            pipeline.predict_proba,
+            X,
+            repeticiones
+        ),
+        "latencia_lote_onnx_ms": _latencia_ms(
+            evaluador.predecir_proba,
+            X,
+            repeticiones
+        )
+    }
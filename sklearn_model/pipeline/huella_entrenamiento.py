@@ -0,0 +1,140 @@
+"""
+Huella de entrenamiento para no reentrenar un modelo que ya está vigente.
+
+La huella resume todo lo que determina los artefactos: los datos, los
+hiperparámetros, el código del pipeline y los evaluadores, y las versiones
+de las librerías que los serializan. pipeline.train la guarda junto a
+wine_classifier.pkl al terminar, e init-models.sh omite el entrenamiento
+(y la espera a MLflow) cuando la huella actual coincide.
+
+Uso:
+    python -m pipeline.huella_entrenamiento
+    (termina con código 0 si el modelo está vigente y 1 si hay que entrenar)
+"""
+import os
+import sys
+import json
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import sklearn
+
+from app.config import configuracion
+from pipeline.utils import PARAMETROS_MODELO, cargar_datos_wine
+
+logger = logging.getLogger(__name__)
+
+RAIZ_SERVICIO = Path(__file__).resolve().parents[1]
+
+# Código que cambia lo que se entrena o cómo se guardan los artefactos.
+# app/model.py calcula la huella del modelo que llevan los artefactos.
+ARCHIVOS_CODIGO = [
+    "pipeline/train.py",
+    "pipeline/utils.py",
+    "pipeline/exportar_onnx.py",
+    "pipeline/huella_entrenamiento.py",
+    "app/bosque_compilado.py",
+    "app/modelo_onnx.py",
+    "app/model.py",
+    "requirements.txt"
+]
+
+
+def ruta_huella() -> Path:
+    """Archivo de la huella, junto a wine_classifier.pkl."""
+    ruta_modelo = Path(configuracion.ruta_modelo)
+    return ruta_modelo.with_name(f"{ruta_modelo.name}.huella.json")
+
+
+def artefactos_requeridos() -> List[Path]:
+    """Artefactos que el servicio necesita según su backend."""
+    if configuracion.backend_modelo == "onnx":
+        return [Path(configuracion.ruta_modelo_onnx)]
+    return [
+        Path(configuracion.ruta_modelo),
+        Path(configuracion.ruta_modelo_compilado)
+    ]
+
+
+def calcular_huella_entrenamiento() -> str:
+    """
+    Calcula la huella de los datos, parámetros y código actuales.
+
+    Returns:
+        Resumen SHA-256 en hexadecimal
+    """
+    resumen = hashlib.sha256()
+
+    X, y, nombres_features, nombres_clases = cargar_datos_wine()
+    for arreglo in (X, y):
+        arreglo = np.ascontiguousarray(arreglo)
+        resumen.update(f"{arreglo.dtype}{arreglo.shape}".encode())
+        resumen.update(arreglo.tobytes())
+
+    resumen.update(json.dumps(
+        {
+            "parametros": PARAMETROS_MODELO,
+            "caracteristicas": list(nombres_features),
+            "clases": list(nombres_clases),
+            "sklearn": sklearn.__version__,
+            "numpy": np.__version__
+        },
+        sort_keys=True
+    ).encode())
+
+    for relativa in ARCHIVOS_CODIGO:
+        ruta = RAIZ_SERVICIO / relativa
+        resumen.update(relativa.encode())
+        resumen.update(ruta.read_bytes() if ruta.exists() else b"")
+
+    return resumen.hexdigest()
+
+
+def guardar_huella_entrenamiento() -> Path:
+    """Guarda la huella actual junto al modelo recién entrenado."""
+    ruta = ruta_huella()
+    ruta_temporal = ruta.with_name(f".{ruta.name}.tmp")
+    ruta_temporal.write_text(json.dumps({
+        "huella": calcular_huella_entrenamiento(),
+        "entrenado_en": datetime.now().isoformat(timespec="seconds")
+    }))
+    os.replace(ruta_temporal, ruta)
+    logger.info(f"Huella de entrenamiento guardada en {ruta}")
+    return ruta
+
+
+def modelo_vigente() -> bool:
+    """
+    Indica si los artefactos en disco corresponden al código actual.
+
+    Returns:
+        True si la huella guardada coincide y existen los artefactos
+    """
+    faltantes = [
+        str(ruta) for ruta in artefactos_requeridos() if not ruta.exists()
+    ]
+    if faltantes:
+        logger.info(f"Faltan artefactos: {', '.join(faltantes)}")
+        return False
+
+    try:
+        guardada = json.loads(ruta_huella().read_text())["huella"]
+    except (FileNotFoundError, KeyError, ValueError):
+        logger.info(f"No hay una huella válida en {ruta_huella()}")
+        return False
+
+    if guardada != calcular_huella_entrenamiento():
+        logger.info("La huella cambió: datos, parámetros o código nuevos")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    from app.config import configurar_logging
+
+    configurar_logging()
+    sys.exit(0 if modelo_vigente() else 1)
@@ -1,8 +1,10 @@
+import os
 import logging
-import pickle
 from pathlib import Path
 from datetime import datetime
 
+import joblib
+import numpy as np
 import mlflow
 import mlflow.sklearn
 from sklearn.ensemble import RandomForestClassifier
@@ -16,8 +18,19 @@ from sklearn.metrics import (
     confusion_matrix
 )
 
+from app.bosque_compilado import BosqueCompilado
 from app.config import configuracion
+from app.model import calcular_huella
+from app.modelo_onnx import DIRECTORIO_REGISTRO_ONNX
+from pipeline.exportar_onnx import (
+    TOLERANCIA_PROBABILIDADES,
+    comparar_onnx,
+    exportar_onnx
+)
+from pipeline.mlflow_batch import BatchedMlflowLogger
+from pipeline.huella_entrenamiento import guardar_huella_entrenamiento
 from pipeline.utils import (
+    PARAMETROS_MODELO,
     cargar_datos_wine,
     dividir_datos,
     crear_escalador
@@ -37,24 +50,20 @@ def entrenar_modelo() -> None:
     
     X_train, X_test, y_train, y_test = dividir_datos(X, y)
     
-    parametros = {
-        "n_estimators": 100,
-        "max_depth": 10,
-        "min_samples_split": 5,
-        "min_samples_leaf": 2,
-        "random_state": 42
-    }
+    parametros = PARAMETROS_MODELO
     
     with mlflow.start_run(
         run_name=f"wine_classifier_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    ):
+    ), BatchedMlflowLogger() as registro:
         logger.info("Iniciando run de MLflow")
         
-        mlflow.log_params(parametros)
-        mlflow.log_param("dataset", "wine")
-        mlflow.log_param("n_samples_train", X_train.shape[0])
-        mlflow.log_param("n_samples_test", X_test.shape[0])
-        mlflow.log_param("n_features", X_train.shape[1])
+        registro.log_params({
+            **parametros,
+            "dataset": "wine",
+            "n_samples_train": X_train.shape[0],
+            "n_samples_test": X_test.shape[0],
+            "n_features": X_train.shape[1]
+        })
         
         pipeline = Pipeline([
             ("escalador", crear_escalador()),
@@ -97,8 +106,7 @@ def entrenar_modelo() -> None:
             "test_f1": f1_score(y_test, y_pred_test, average="weighted")
         }
         
-        mlflow.log_metrics(metricas_train)
-        mlflow.log_metrics(metricas_test)
+        registro.log_metrics({**metricas_train, **metricas_test})
         
         logger.info("Métricas de entrenamiento:")
         for metrica, valor in metricas_train.items():
@@ -118,11 +126,61 @@ def entrenar_modelo() -> None:
         matriz_confusion = confusion_matrix(y_test, y_pred_test)
         logger.info(f"\nMatriz de confusión:\n{matriz_confusion}")
         
+        # Los evaluadores se verifican antes de escribir o registrar nada:
+        # si no reproducen el pipeline, el run falla sin dejar artefactos
+        # que el servicio o el vigilante del registro puedan cargar.
+        bosque_compilado = BosqueCompilado.desde_pipeline(pipeline)
+        bosque_compilado.huella = calcular_huella(pipeline)
+        if not np.array_equal(
+            bosque_compilado.predecir_proba(X_test),
+            pipeline.predict_proba(X_test)
+        ):
+            raise RuntimeError(
+                "El evaluador compilado no reproduce las probabilidades "
+                "del pipeline"
+            )
+        
+        ruta_onnx = Path(configuracion.ruta_modelo_onnx)
+        ruta_onnx_temporal = ruta_onnx.with_name(f".{ruta_onnx.name}.nuevo")
+        try:
+            exportar_onnx(
+                pipeline,
+                ruta_onnx_temporal,
+                bosque_compilado.huella
+            )
+            metricas_onnx = comparar_onnx(
+                pipeline,
+                ruta_onnx_temporal,
+                X_test
+            )
+        except RuntimeError as error:
+            ruta_onnx_temporal.unlink(missing_ok=True)
+            logger.warning(f"Se omite la exportación a ONNX: {error}")
+            metricas_onnx = None
+        else:
+            registro.log_metrics(metricas_onnx)
+            for metrica, valor in metricas_onnx.items():
+                logger.info(f"  {metrica}: {valor:.6f}")
+            if (
+                metricas_onnx["onnx_max_diff_probabilidades"]
+                > TOLERANCIA_PROBABILIDADES
+                or metricas_onnx["onnx_coincidencia_clases"] < 1.0
+            ):
+                ruta_onnx_temporal.unlink()
+                raise RuntimeError(
+                    "El modelo ONNX no reproduce las predicciones "
+                    "del pipeline"
+                )
+        
         ruta_modelo = Path(configuracion.ruta_modelo)
         ruta_modelo.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(ruta_modelo, 'wb') as archivo:
-            pickle.dump(pipeline, archivo)
+        # Sin compresión, para poder abrirlo con mmap_mode. Se reemplaza
+        # el archivo en lugar de sobrescribirlo porque el servicio puede
+        # tenerlo mapeado.
+        ruta_temporal = ruta_modelo.with_name(f".{ruta_modelo.name}.tmp")
+        joblib.dump(pipeline, ruta_temporal)
+        os.replace(ruta_temporal, ruta_modelo)
         
         logger.info(f"Modelo guardado en {ruta_modelo}")
         
@@ -134,11 +192,28 @@ def entrenar_modelo() -> None:
         
         mlflow.log_artifact(str(ruta_modelo))
         
+        # Las contribuciones de /explain viajan en el artefacto para que
+        # el servicio no tenga que recalcularlas al arrancar.
+        bosque_compilado.preparar_explicaciones()
+        ruta_compilado = bosque_compilado.guardar(
+            configuracion.ruta_modelo_compilado
+        )
+        logger.info(f"Evaluador compilado guardado en {ruta_compilado}")
+        mlflow.log_artifact(str(ruta_compilado))
+        
+        if metricas_onnx is not None:
+            os.replace(ruta_onnx_temporal, ruta_onnx)
+            logger.info(f"Modelo ONNX guardado en {ruta_onnx}")
+            mlflow.log_artifact(str(ruta_onnx), DIRECTORIO_REGISTRO_ONNX)
+        
         Path("/tmp").mkdir(parents=True, exist_ok=True)
         with open("/tmp/classification_report.txt", "w") as archivo:
             archivo.write(reporte)
         mlflow.log_artifact("/tmp/classification_report.txt")
         
+        # Se escribe al final: si algo falla antes, el próximo arranque
+        # vuelve a entrenar.
+        guardar_huella_entrenamiento()
         logger.info("Entrenamiento completado y registrado en MLflow")
 
 
@@ -7,6 +7,15 @@ from sklearn.preprocessing import StandardScaler
 
 logger = logging.getLogger(__name__)
 
+# Hiperparámetros del RandomForestClassifier de producción.
+PARAMETROS_MODELO = {
+    "n_estimators": 100,
+    "max_depth": 10,
+    "min_samples_split": 5,
+    "min_samples_leaf": 2,
+    "random_state": 42
+}
+
 
 def cargar_datos_wine() -> Tuple[np.ndarray, np.ndarray, list, list]:
     """
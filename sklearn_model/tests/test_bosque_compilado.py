@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+from sklearn.datasets import load_wine
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.bosque_compilado import BosqueCompilado
+from app.config import Configuracion
+
+
+def entrenar_pipeline(**parametros) -> Pipeline:
+    """Entrena un pipeline como el de producción, pero más pequeño."""
+    X, y = load_wine(return_X_y=True)
+    return Pipeline([
+        ("escalador", StandardScaler()),
+        ("clasificador", RandomForestClassifier(
+            n_estimators=20,
+            random_state=0,
+            **parametros
+        ))
+    ]).fit(X, y)
+
+
+def filas_en_umbrales(pipeline: Pipeline) -> np.ndarray:
+    """Genera filas cuyo valor cae justo en cada umbral o a un ulp."""
+    X, _ = load_wine(return_X_y=True)
+    escalador = pipeline.named_steps["escalador"]
+    rng = np.random.default_rng(0)
+    filas = []
+    for estimador in pipeline.named_steps["clasificador"].estimators_:
+        arbol = estimador.tree_
+        internos = arbol.children_left != -1
+        for caracteristica, umbral in zip(
+            arbol.feature[internos],
+            arbol.threshold[internos]
+        ):
+            frontera = (
+                umbral * escalador.scale_[caracteristica]
+                + escalador.mean_[caracteristica]
+            )
+            for valor in (
+                frontera,
+                np.nextafter(frontera, np.inf),
+                np.nextafter(frontera, -np.inf),
+                frontera + rng.integers(-500, 500) * np.spacing(frontera)
+            ):
+                fila = X[rng.integers(len(X))].copy()
+                fila[caracteristica] = valor
+                filas.append(fila)
+    return np.array(filas)
+
+
+@pytest.mark.parametrize("parametros", [{}, {"max_depth": 3}])
+def test_probabilidades_identicas_bit_a_bit(parametros):
+    """Verifica que el evaluador reproduzca exactamente predict_proba."""
+    pipeline = entrenar_pipeline(**parametros)
+    bosque = BosqueCompilado.desde_pipeline(pipeline)
+    X, _ = load_wine(return_X_y=True)
+    filas = np.vstack([
+        X,
+        filas_en_umbrales(pipeline),
+        np.random.default_rng(1).normal(
+            X.mean(axis=0),
+            3 * X.std(axis=0),
+            size=(500, X.shape[1])
+        )
+    ])
+    
+    clases, probabilidades = bosque.predecir(filas)
+    
+    assert np.array_equal(probabilidades, pipeline.predict_proba(filas))
+    assert np.array_equal(clases, pipeline.predict(filas))
+    # Una sola fila se evalúa con las máscaras de hojas, no por niveles.
+    assert bosque._mascaras_fila is not None
+    for fila, esperada in zip(filas, probabilidades):
+        assert np.array_equal(bosque.predecir_proba(fila[None])[0], esperada)
+
+
+def test_fila_con_mas_de_64_hojas_por_arbol():
+    """Verifica el recorrido por niveles con árboles de más de 64 hojas."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 13))
+    y = rng.integers(0, 3, size=600)
+    bosque_sklearn = RandomForestClassifier(
+        n_estimators=5,
+        random_state=0
+    ).fit(X, y)
+    bosque = BosqueCompilado.desde_pipeline(bosque_sklearn)
+    
+    assert max(e.tree_.n_leaves for e in bosque_sklearn.estimators_) > 64
+    assert bosque._mascaras_fila is None
+    assert np.array_equal(
+        bosque.predecir_proba(X[:1]),
+        bosque_sklearn.predict_proba(X[:1])
+    )
+
+
+def test_guardar_y_cargar(tmp_path):
+    """Verifica que el evaluador mapeado en memoria prediga lo mismo."""
+    pipeline = entrenar_pipeline()
+    bosque = BosqueCompilado.desde_pipeline(pipeline)
+    bosque.preparar_explicaciones()
+    bosque.huella = "abc123"
+    X, _ = load_wine(return_X_y=True)
+    
+    cargado = BosqueCompilado.cargar(bosque.guardar(tmp_path / "b.joblib"))
+    
+    assert isinstance(cargado.umbral.base, np.memmap)
+    assert not cargado.umbral.flags.writeable
+    assert cargado.huella == "abc123"
+    assert np.array_equal(cargado.predecir_proba(X), bosque.predecir_proba(X))
+    assert np.array_equal(
+        cargado.explicar(X)[2],
+        bosque.explicar(X)[2]
+    )
+    with pytest.raises(ValueError):
+        cargado.predecir_proba(X[:, :5])
+
+
+def test_pipeline_no_soportado():
+    """Verifica que se rechacen modelos que no son un RandomForest."""
+    X, y = load_wine(return_X_y=True)
+    pipeline = Pipeline([
+        ("escalador", StandardScaler()),
+        ("clasificador", LogisticRegression(max_iter=1000))
+    ]).fit(X, y)
+    
+    with pytest.raises(TypeError):
+        BosqueCompilado.desde_pipeline(pipeline)
+
+
+def test_explicacion_suma_la_prediccion():
+    """Verifica que base más contribuciones reconstruya la predicción."""
+    pipeline = entrenar_pipeline(max_depth=4)
+    bosque = BosqueCompilado.desde_pipeline(pipeline)
+    X, _ = load_wine(return_X_y=True)
+    
+    probabilidades, valor_base, contribuciones = bosque.explicar(
+        X,
+        filas_por_bloque=50
+    )
+    
+    assert contribuciones.shape == (len(X), X.shape[1], 3)
+    assert np.array_equal(probabilidades, pipeline.predict_proba(X))
+    np.testing.assert_allclose(
+        valor_base + contribuciones.sum(axis=1),
+        probabilidades,
+        atol=1e-12
+    )
+    # Solo las características usadas en algún corte pueden aportar.
+    usadas = np.unique(np.concatenate([
+        estimador.tree_.feature[estimador.tree_.feature >= 0]
+        for estimador in pipeline.named_steps["clasificador"].estimators_
+    ]))
+    no_usadas = np.setdiff1d(np.arange(X.shape[1]), usadas)
+    assert not contribuciones[:, no_usadas].any()
+
+
+def test_artefactos_junto_a_model_path(monkeypatch):
+    """Verifica que los artefactos compilado y ONNX sigan a MODEL_PATH."""
+    monkeypatch.setenv("MODEL_PATH", "/service/models/wine_classifier.pkl")
+    monkeypatch.delenv("COMPILED_MODEL_PATH", raising=False)
+    monkeypatch.delenv("ONNX_MODEL_PATH", raising=False)
+    
+    configuracion = Configuracion()
+    
+    assert configuracion.ruta_modelo_compilado == (
+        "/service/models/wine_classifier_compilado.joblib"
+    )
+    assert configuracion.ruta_modelo_onnx == (
+        "/service/models/wine_classifier.onnx"
+    )
@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+from sklearn.datasets import load_wine
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.cache_predicciones import CachePredicciones
+from app.model import GestorModelo, calcular_huella
+
+
+def entrenar_pipeline(semilla: int) -> Pipeline:
+    """Entrena un pipeline pequeño con la semilla indicada."""
+    X, y = load_wine(return_X_y=True)
+    return Pipeline([
+        ("escalador", StandardScaler()),
+        ("clasificador", RandomForestClassifier(
+            n_estimators=10,
+            random_state=semilla
+        ))
+    ]).fit(X, y)
+
+
+def test_descarta_la_menos_usada():
+    """Verifica el orden LRU y las métricas de aciertos y fallos."""
+    cache = CachePredicciones(capacidad=2)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    
+    assert cache.obtener("a") == 1
+    cache.guardar("c", 3)
+    
+    assert cache.obtener("b") is None
+    assert cache.obtener("a") == 1
+    assert cache.obtener("c") == 3
+    assert cache.estadisticas() == {
+        "capacidad": 2,
+        "entradas": 2,
+        "aciertos": 3,
+        "fallos": 1,
+        "tasa_aciertos": 0.75
+    }
+
+
+def test_acceso_concurrente():
+    """Verifica que las métricas cuadren con muchos hilos a la vez."""
+    cache = CachePredicciones(capacidad=50)
+    
+    def trabajar(indice: int) -> None:
+        for paso in range(500):
+            clave = (indice * paso) % 80
+            if cache.obtener(clave) is None:
+                cache.guardar(clave, paso)
+    
+    with ThreadPoolExecutor(max_workers=8) as ejecutor:
+        list(ejecutor.map(trabajar, range(16)))
+    
+    estadisticas = cache.estadisticas()
+    assert estadisticas["aciertos"] + estadisticas["fallos"] == 16 * 500
+    assert estadisticas["entradas"] <= 50
+
+
+def test_gestor_usa_e_invalida_la_cache():
+    """Verifica aciertos, omisión e invalidación al recargar el modelo."""
+    X, _ = load_wine(return_X_y=True)
+    gestor = GestorModelo()
+    gestor.cache = CachePredicciones(capacidad=100)
+    gestor.establecer_modelo(entrenar_pipeline(semilla=0))
+    fila = X[70]
+    
+    primera = gestor.predecir_fila(fila)
+    segunda = gestor.predecir_fila(fila.copy())
+    gestor.predecir_fila(fila, usar_cache=False)
+    
+    assert segunda is primera
+    assert gestor.cache.aciertos == 1
+    assert gestor.cache.fallos == 1
+    
+    huella_anterior = gestor.huella_modelo
+    otro_modelo = entrenar_pipeline(semilla=1)
+    gestor.establecer_modelo(otro_modelo)
+    
+    assert gestor.huella_modelo != huella_anterior
+    assert gestor.cache.estadisticas()["entradas"] == 0
+    _, probabilidades = gestor.predecir_fila(fila)
+    assert np.array_equal(
+        probabilidades,
+        otro_modelo.predict_proba(fila.reshape(1, -1))[0]
+    )
+
+
+def test_huella_no_depende_de_como_se_cargo(tmp_path):
+    """Verifica que la huella sea la misma en memoria y tras joblib.load."""
+    pipeline = entrenar_pipeline(semilla=0)
+    ruta = tmp_path / "modelo.pkl"
+    joblib.dump(pipeline, ruta)
+    
+    huella = calcular_huella(pipeline)
+    
+    assert calcular_huella(joblib.load(ruta)) == huella
+    assert calcular_huella(joblib.load(ruta, mmap_mode="r")) == huella
+    assert calcular_huella(entrenar_pipeline(semilla=1)) != huella
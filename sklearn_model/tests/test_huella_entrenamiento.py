@@ -0,0 +1,53 @@
+from app.config import configuracion
+from pipeline import huella_entrenamiento
+from pipeline.huella_entrenamiento import (
+    ARCHIVOS_CODIGO,
+    RAIZ_SERVICIO,
+    guardar_huella_entrenamiento,
+    modelo_vigente
+)
+
+
+def test_modelo_vigente_segun_la_huella(tmp_path, monkeypatch):
+    """Verifica que solo se omita el entrenamiento con la misma huella."""
+    ruta_modelo = tmp_path / "wine_classifier.pkl"
+    ruta_compilado = tmp_path / "wine_classifier_compilado.joblib"
+    monkeypatch.setattr(configuracion, "ruta_modelo", str(ruta_modelo))
+    monkeypatch.setattr(
+        configuracion,
+        "ruta_modelo_compilado",
+        str(ruta_compilado)
+    )
+    monkeypatch.setattr(configuracion, "backend_modelo", "sklearn")
+    
+    assert not modelo_vigente()
+    
+    ruta_modelo.write_bytes(b"pipeline")
+    ruta_compilado.write_bytes(b"compilado")
+    assert not modelo_vigente()
+    
+    guardar_huella_entrenamiento()
+    assert modelo_vigente()
+    
+    ruta_compilado.unlink()
+    assert not modelo_vigente()
+    ruta_compilado.write_bytes(b"compilado")
+    assert modelo_vigente()
+    
+    monkeypatch.setitem(
+        huella_entrenamiento.PARAMETROS_MODELO,
+        "n_estimators",
+        200
+    )
+    assert not modelo_vigente()
+
+
+def test_archivos_codigo_existen():
+    """Verifica que la huella no omita código renombrado o movido."""
+    faltantes = [
+        relativa for relativa in ARCHIVOS_CODIGO
+        if not (RAIZ_SERVICIO / relativa).exists()
+    ]
+    
+    assert not faltantes
+    assert "app/model.py" in ARCHIVOS_CODIGO
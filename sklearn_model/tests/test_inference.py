@@ -1,6 +1,9 @@
+import json
+
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.schemas import NOMBRES_CARACTERISTICAS
 
 client = TestClient(app)
 
@@ -69,7 +72,7 @@ def test_predict_endpoint_sin_modelo():
     from app.model import gestor_modelo
     
     modelo_original = gestor_modelo.modelo
-    gestor_modelo.modelo = None
+    gestor_modelo.establecer_modelo(None)
     
     datos_prueba = {
         "alcohol": 13.2,
@@ -91,4 +94,165 @@ def test_predict_endpoint_sin_modelo():
     
     assert respuesta.status_code == 503
     
-    gestor_modelo.modelo = modelo_original
\ No newline at end of file
+    gestor_modelo.establecer_modelo(modelo_original)
+
+
+def test_predict_batch_validacion():
+    """Verifica que el lote rechace valores fuera de rango y formatos malos."""
+    fila_valida = [13.2, 2.3, 2.4, 19.5, 100.0, 2.8, 3.0,
+                   0.3, 1.9, 5.6, 1.0, 3.2, 1050.0]
+    fila_invalida = [-5.0] + fila_valida[1:]
+    
+    respuesta = client.post(
+        "/predict/batch",
+        json={"filas": [fila_valida, fila_invalida]}
+    )
+    assert respuesta.status_code == 422
+    assert "fila 1: alcohol" in respuesta.text
+    
+    respuesta = client.post(
+        "/predict/batch",
+        json={"filas": [fila_valida[:5]]}
+    )
+    assert respuesta.status_code == 422
+    
+    respuesta = client.post("/predict/batch", json={})
+    assert respuesta.status_code == 422
+
+
+def test_predict_batch_y_explain_coinciden_con_predict():
+    """Verifica que lote y explicación coincidan con predicciones sueltas."""
+    from sklearn.datasets import load_wine
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from app.model import gestor_modelo
+    
+    X, y = load_wine(return_X_y=True)
+    modelo_original = gestor_modelo.modelo
+    gestor_modelo.establecer_modelo(Pipeline([
+        ('scaler', StandardScaler()),
+        ('classifier', RandomForestClassifier(n_estimators=10, random_state=0))
+    ]).fit(X, y))
+    
+    try:
+        muestras = X[::20]
+        respuesta = client.post(
+            "/predict/batch",
+            json={
+                "columnas": {
+                    nombre: muestras[:, indice].tolist()
+                    for indice, nombre in enumerate(NOMBRES_CARACTERISTICAS)
+                }
+            }
+        )
+        
+        assert respuesta.status_code == 200
+        datos = respuesta.json()
+        assert datos["total"] == len(muestras)
+        for indice, fila in enumerate(muestras):
+            clase, probabilidades = gestor_modelo.predecir(fila.tolist())
+            assert datos["clases_predichas"][indice] == clase
+            assert datos["probabilidades"][indice] == probabilidades
+        
+        respuesta = client.post(
+            "/explain",
+            json={"filas": muestras.tolist()}
+        )
+        
+        assert respuesta.status_code == 200
+        explicacion = respuesta.json()
+        assert explicacion["clases_predichas"] == datos["clases_predichas"]
+        for indice, clase in enumerate(explicacion["clases_predichas"]):
+            reconstruida = explicacion["valor_base"][clase] + sum(
+                explicacion["contribuciones"][indice]
+            )
+            assert abs(reconstruida - datos["confianzas"][indice]) < 1e-9
+    finally:
+        gestor_modelo.establecer_modelo(modelo_original)
+
+
+def test_predict_errores_iguales_a_pydantic():
+    """Verifica que el camino rápido devuelva los mismos 422 que pydantic."""
+    from fastapi import FastAPI
+    from app.schemas import CaracteristicasVino
+    
+    referencia = FastAPI()
+    
+    @referencia.post("/predict")
+    async def predecir_referencia(caracteristicas: CaracteristicasVino):
+        return {}
+    
+    cliente_referencia = TestClient(referencia)
+    valido = {
+        "alcohol": 13.2,
+        "acido_malico": 2.3,
+        "ceniza": 2.4,
+        "alcalinidad_ceniza": 19.5,
+        "magnesio": 100.0,
+        "fenoles_totales": 2.8,
+        "flavonoides": 3.0,
+        "fenoles_no_flavonoides": 0.3,
+        "proantocianinas": 1.9,
+        "intensidad_color": 5.6,
+        "matiz": 1.0,
+        "od280_od315": 3.2,
+        "prolina": 1050.0
+    }
+    cuerpos = [
+        b"",
+        b"{",
+        b"[]",
+        b'"texto"',
+        json.dumps({**valido, "alcohol": 25}).encode(),
+        json.dumps({**valido, "magnesio": -1, "matiz": "x"}).encode(),
+        json.dumps({k: v for k, v in valido.items() if k != "ceniza"}).encode()
+    ]
+    
+    for cuerpo in cuerpos:
+        esperada = cliente_referencia.post(
+            "/predict",
+            content=cuerpo,
+            headers={"content-type": "application/json"}
+        )
+        obtenida = client.post(
+            "/predict",
+            content=cuerpo,
+            headers={"content-type": "application/json"}
+        )
+        
+        assert esperada.status_code == 422
+        assert obtenida.status_code == esperada.status_code, cuerpo
+        assert obtenida.json() == esperada.json(), cuerpo
+
+
+def test_predict_rechaza_valores_no_finitos():
+    """Verifica que /predict y /predict/batch rechacen Infinity por igual."""
+    valido = [13.2, 2.3, 2.4, 19.5, 100.0, 2.8, 3.0, 0.3, 1.9, 5.6, 1.0, 3.2]
+    cuerpo = json.dumps({
+        **dict(zip(NOMBRES_CARACTERISTICAS, valido)),
+        "prolina": float("inf")
+    })
+    
+    individual = client.post(
+        "/predict",
+        content=cuerpo,
+        headers={"content-type": "application/json"}
+    )
+    lote = client.post(
+        "/predict/batch",
+        content=json.dumps({"filas": [valido + [float("inf")]]}),
+        headers={"content-type": "application/json"}
+    )
+    
+    assert individual.status_code == 422
+    assert individual.json()["detail"][0]["loc"] == ["body", "prolina"]
+    assert individual.json()["detail"][0]["type"] == "finite_number"
+    assert lote.status_code == 422
+    
+    desbordado = client.post(
+        "/predict",
+        content=cuerpo.replace("Infinity", "1e999"),
+        headers={"content-type": "application/json"}
+    )
+    assert desbordado.status_code == 422
@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+import numpy as np
+from sklearn.datasets import load_wine
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.cache_predicciones import CachePredicciones
+from app.microlotes import AgrupadorPredicciones
+from app.model import GestorModelo
+
+
+def entrenar_pipeline(semilla: int = 0) -> Pipeline:
+    """Entrena un pipeline pequeño con la semilla indicada."""
+    X, y = load_wine(return_X_y=True)
+    return Pipeline([
+        ("escalador", StandardScaler()),
+        ("clasificador", RandomForestClassifier(
+            n_estimators=10,
+            random_state=semilla
+        ))
+    ]).fit(X, y)
+
+
+def crear_gestor() -> GestorModelo:
+    """Crea un gestor con un pipeline pequeño y sin caché."""
+    gestor = GestorModelo()
+    gestor.cache = CachePredicciones(capacidad=0)
+    gestor.establecer_modelo(entrenar_pipeline())
+    return gestor
+
+
+def test_agrupa_peticiones_concurrentes():
+    """Verifica que muchas peticiones se resuelvan con pocos lotes."""
+    X, _ = load_wine(return_X_y=True)
+    gestor = crear_gestor()
+    agrupador = AgrupadorPredicciones(
+        gestor,
+        ventana_segundos=0.05,
+        tamanio_maximo=16
+    )
+    
+    async def enviar_todas():
+        fila_compartida = np.empty((1, X.shape[1]))
+        
+        async def enviar(fila):
+            # Igual que /predict: se reutiliza el arreglo de entrada.
+            fila_compartida[0] = fila
+            return await agrupador.predecir(fila_compartida)
+        
+        return await asyncio.gather(*[enviar(fila) for fila in X[:40]])
+    
+    resultados = asyncio.run(enviar_todas())
+    
+    clases, probabilidades = gestor.predecir_lote(X[:40])
+    assert [clase for clase, _ in resultados] == clases.tolist()
+    assert np.array_equal(
+        np.stack([fila for _, fila in resultados]),
+        probabilidades
+    )
+    # La primera fila sale sola; el resto se agrupa mientras se predice.
+    assert agrupador.lotes == 4
+    assert agrupador.estadisticas()["filas"] == 40
+
+
+def test_propaga_errores_a_todo_el_lote():
+    """Verifica que un fallo del modelo llegue a cada petición del lote."""
+    gestor = crear_gestor()
+    agrupador = AgrupadorPredicciones(
+        gestor,
+        ventana_segundos=0.01,
+        tamanio_maximo=8
+    )
+    
+    async def enviar_mal_formadas():
+        return await asyncio.gather(
+            *[agrupador.predecir(np.zeros(5)) for _ in range(3)],
+            return_exceptions=True
+        )
+    
+    errores = asyncio.run(enviar_mal_formadas())
+    
+    assert len(errores) == 3
+    assert all(isinstance(error, ValueError) for error in errores)
+
+
+def test_sin_carga_no_espera_la_ventana():
+    """Verifica que una petición sola no espere a que cierre la ventana."""
+    X, _ = load_wine(return_X_y=True)
+    agrupador = AgrupadorPredicciones(
+        crear_gestor(),
+        ventana_segundos=5.0,
+        tamanio_maximo=8
+    )
+    
+    inicio = time.perf_counter()
+    asyncio.run(agrupador.predecir(X[0]))
+    
+    assert time.perf_counter() - inicio < 1.0
+    assert agrupador.lotes == 1
+
+
+def test_cache_usa_la_huella_del_modelo_que_predijo():
+    """Verifica la clave de caché cuando el modelo cambia durante el lote."""
+    X, _ = load_wine(return_X_y=True)
+    gestor = crear_gestor()
+    gestor.cache = CachePredicciones(capacidad=10)
+    huella_anterior = gestor.huella_modelo
+    predecir_original = gestor.predecir_lote_con_huella
+    
+    def recargar_y_predecir(filas):
+        # Simula una recarga en caliente justo antes de predecir el lote.
+        gestor.establecer_modelo(entrenar_pipeline(semilla=1))
+        return predecir_original(filas)
+    
+    gestor.predecir_lote_con_huella = recargar_y_predecir
+    agrupador = AgrupadorPredicciones(
+        gestor,
+        ventana_segundos=0.01,
+        tamanio_maximo=8
+    )
+    
+    _, probabilidades = asyncio.run(agrupador.predecir(X[0]))
+    
+    assert gestor.huella_modelo != huella_anterior
+    assert gestor.cache.obtener((huella_anterior, X[0].tobytes())) is None
+    assert gestor.cache.obtener(gestor.clave_cache(X[0])) is not None
+    assert np.array_equal(
+        probabilidades,
+        gestor.predecir_lote(X[:1])[1][0]
+    )
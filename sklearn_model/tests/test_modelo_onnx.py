@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from sklearn.datasets import load_wine
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("skl2onnx")
+
+from app.model import GestorModelo, calcular_huella  # noqa: E402
+from app.modelo_onnx import EvaluadorOnnx  # noqa: E402
+from pipeline.exportar_onnx import (  # noqa: E402
+    TOLERANCIA_PROBABILIDADES,
+    comparar_onnx,
+    exportar_onnx
+)
+
+
+def entrenar_pipeline() -> Pipeline:
+    """Entrena un pipeline como el de producción, pero más pequeño."""
+    X, y = load_wine(return_X_y=True)
+    return Pipeline([
+        ("escalador", StandardScaler()),
+        ("clasificador", RandomForestClassifier(
+            n_estimators=30,
+            random_state=0
+        ))
+    ]).fit(X, y)
+
+
+def test_paridad_con_el_pipeline(tmp_path):
+    """Verifica que ONNX tome las mismas ramas que scikit-learn."""
+    pipeline = entrenar_pipeline()
+    X, _ = load_wine(return_X_y=True)
+    ruta = exportar_onnx(pipeline, tmp_path / "m.onnx", "abc123")
+    
+    metricas = comparar_onnx(pipeline, ruta, X, repeticiones=3)
+    
+    assert metricas["onnx_max_diff_probabilidades"] <= TOLERANCIA_PROBABILIDADES
+    assert metricas["onnx_coincidencia_clases"] == 1.0
+    evaluador = EvaluadorOnnx(ruta)
+    assert evaluador.huella == "abc123"
+    assert evaluador.clases.tolist() == [0, 1, 2]
+    with pytest.raises(ValueError):
+        evaluador.predecir(X[:, :5])
+
+
+def test_gestor_sirve_desde_onnx(tmp_path):
+    """Verifica que MODEL_BACKEND=onnx cargue y prediga sin el pipeline."""
+    pipeline = entrenar_pipeline()
+    X, _ = load_wine(return_X_y=True)
+    gestor = GestorModelo()
+    gestor.backend = "onnx"
+    gestor.ruta_modelo_onnx = exportar_onnx(
+        pipeline,
+        tmp_path / "m.onnx",
+        calcular_huella(pipeline)
+    )
+    
+    gestor.cargar_modelo()
+    clases, probabilidades = gestor.predecir_lote(X)
+    
+    assert gestor.esta_cargado() and gestor.modelo is None
+    assert gestor.huella_modelo == calcular_huella(pipeline)
+    assert np.array_equal(clases, pipeline.predict(X))
+    assert np.allclose(
+        probabilidades,
+        pipeline.predict_proba(X),
+        atol=TOLERANCIA_PROBABILIDADES
+    )
+    with pytest.raises(NotImplementedError):
+        gestor.explicar_lote(X[:1])
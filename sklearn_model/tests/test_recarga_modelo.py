@@ -0,0 +1,150 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.datasets import load_wine
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.bosque_compilado import BosqueCompilado
+from app.model import GestorModelo, calcular_huella
+from app.recarga_modelo import VigilanteModelo
+
+
+def entrenar_pipeline(semilla: int) -> Pipeline:
+    """Entrena un pipeline pequeño con la semilla indicada."""
+    X, y = load_wine(return_X_y=True)
+    return Pipeline([
+        ("escalador", StandardScaler()),
+        ("clasificador", RandomForestClassifier(
+            n_estimators=10,
+            random_state=semilla
+        ))
+    ]).fit(X, y)
+
+
+def guardar_compilado(ruta, semilla: int) -> str:
+    """Entrena un pipeline pequeño y guarda su evaluador compilado."""
+    pipeline = entrenar_pipeline(semilla)
+    bosque = BosqueCompilado.desde_pipeline(pipeline)
+    bosque.huella = calcular_huella(pipeline)
+    bosque.guardar(ruta)
+    return bosque.huella
+
+
+def crear_vigilante(tmp_path):
+    """Arma un gestor que lee de tmp_path y su vigilante."""
+    gestor = GestorModelo()
+    gestor.ruta_modelo = tmp_path / "modelo.pkl"
+    gestor.ruta_modelo_compilado = tmp_path / "compilado.joblib"
+    return gestor, VigilanteModelo(gestor, 1.0, "wine_classifier")
+
+
+def test_recarga_cuando_cambia_el_archivo(tmp_path):
+    """Verifica que un artefacto nuevo se active tras una revisión estable."""
+    gestor, vigilante = crear_vigilante(tmp_path)
+    huella_inicial = guardar_compilado(gestor.ruta_modelo_compilado, 0)
+    gestor.cargar_modelo()
+    vigilante._firma_cargada = vigilante._firma_artefactos()
+    
+    assert not vigilante.revisar()
+    
+    huella_nueva = guardar_compilado(gestor.ruta_modelo_compilado, 1)
+    os.utime(gestor.ruta_modelo_compilado, ns=(0, 1))
+    
+    assert not vigilante.revisar()
+    assert gestor.huella_modelo == huella_inicial
+    assert vigilante.revisar()
+    assert gestor.huella_modelo == huella_nueva
+    assert gestor.descripcion()["origen"] == str(gestor.ruta_modelo_compilado)
+    assert gestor.descripcion()["segundos_carga"] > 0
+    assert vigilante.estadisticas()["recargas"] == 1
+
+
+def test_mismo_modelo_no_se_reemplaza(tmp_path):
+    """Verifica que el mismo modelo en disco no reemplace al cargado."""
+    gestor, vigilante = crear_vigilante(tmp_path)
+    gestor.establecer_modelo(entrenar_pipeline(0))
+    activo = gestor.activo
+    vigilante._firma_cargada = vigilante._firma_artefactos()
+    gestor.predecir_fila(load_wine(return_X_y=True)[0][0])
+    
+    joblib.dump(entrenar_pipeline(0), gestor.ruta_modelo)
+    os.utime(gestor.ruta_modelo, ns=(0, 1))
+    
+    assert not vigilante.revisar()
+    assert not vigilante.revisar()
+    assert gestor.activo is activo
+    assert gestor.cache.estadisticas()["entradas"] == 1
+    assert vigilante.estadisticas()["recargas"] == 0
+
+
+def test_registro_respeta_el_backend_onnx(tmp_path, monkeypatch):
+    """Verifica que una versión del registro se sirva con su modelo ONNX."""
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("skl2onnx")
+    from mlflow.tracking import MlflowClient
+    
+    from app.modelo_onnx import DIRECTORIO_REGISTRO_ONNX, EvaluadorOnnx
+    from pipeline.exportar_onnx import exportar_onnx
+    
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", (tmp_path / "mlruns").as_uri())
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    gestor, vigilante = crear_vigilante(tmp_path)
+    gestor.backend = "onnx"
+    pipeline = entrenar_pipeline(0)
+    ruta_onnx = exportar_onnx(
+        pipeline,
+        tmp_path / "wine_classifier.onnx",
+        calcular_huella(pipeline)
+    )
+    cliente = MlflowClient()
+    run_id = cliente.create_run(
+        cliente.create_experiment("recarga")
+    ).info.run_id
+    cliente.log_artifact(run_id, str(ruta_onnx), DIRECTORIO_REGISTRO_ONNX)
+    
+    activo = vigilante.leer_onnx_registro(run_id, "models:/wine@prod", "3")
+    
+    assert isinstance(activo.evaluador, EvaluadorOnnx)
+    assert activo.modelo is None
+    assert activo.huella == calcular_huella(pipeline)
+    assert activo.version == "3"
+    gestor.validar(activo, vigilante.filas_validacion)
+    
+    run_sin_onnx = cliente.create_run("0").info.run_id
+    with pytest.raises(RuntimeError):
+        vigilante.leer_onnx_registro(run_sin_onnx, "models:/wine@prod", "4")
+
+
+def test_artefacto_invalido_mantiene_el_modelo(tmp_path):
+    """Verifica que un artefacto que no carga no reemplace al actual."""
+    gestor, vigilante = crear_vigilante(tmp_path)
+    huella = guardar_compilado(gestor.ruta_modelo_compilado, 0)
+    gestor.cargar_modelo()
+    vigilante._firma_cargada = vigilante._firma_artefactos()
+    
+    temporal = tmp_path / "temporal"
+    temporal.write_bytes(b"no es un modelo")
+    os.replace(temporal, gestor.ruta_modelo_compilado)
+    vigilante.revisar()
+    
+    assert not vigilante.revisar()
+    assert gestor.huella_modelo == huella
+    assert vigilante.estadisticas()["fallos"] == 1
+    clases, _ = gestor.predecir_lote(load_wine(return_X_y=True)[0][:5])
+    assert clases.shape == (5,)
+
+
+def test_validar_rechaza_probabilidades_invalidas(tmp_path):
+    """Verifica la validación previa a activar un modelo."""
+    gestor, vigilante = crear_vigilante(tmp_path)
+    guardar_compilado(gestor.ruta_modelo_compilado, 0)
+    activo = gestor.leer_modelo()
+    activo.evaluador.valores = activo.evaluador.valores * 2
+    
+    with pytest.raises(ValueError):
+        gestor.validar(activo, vigilante.filas_validacion)
+    assert np.isfinite(vigilante.filas_validacion).all()
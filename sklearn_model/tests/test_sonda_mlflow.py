@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+
+from app.sonda_mlflow import SondaMlflow
+
+
+def crear_sonda(manejador) -> SondaMlflow:
+    """Arma una sonda cuyo servidor responde con el manejador dado."""
+    return SondaMlflow(
+        "http://mlflow:5000/",
+        intervalo_segundos=60,
+        timeout_segundos=0.5,
+        transporte=httpx.MockTransport(manejador)
+    )
+
+
+def test_servidor_disponible():
+    """Verifica que un 200 en /health marque la conexión."""
+    rutas = []
+    
+    def manejador(peticion: httpx.Request) -> httpx.Response:
+        rutas.append(peticion.url.path)
+        return httpx.Response(200, text="OK")
+    
+    sonda = crear_sonda(manejador)
+    
+    assert asyncio.run(sonda.verificar())
+    assert rutas == ["/health"]
+    estado = sonda.estado()
+    assert estado["conectado"] and estado["error"] is None
+    assert estado["verificado_en"] is not None
+
+
+def test_servidor_caido_o_con_error():
+    """Verifica que errores HTTP y de red marquen la desconexión."""
+    def con_error(peticion: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+    
+    def sin_respuesta(peticion: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectTimeout("timeout", request=peticion)
+    
+    sonda = crear_sonda(con_error)
+    assert not asyncio.run(sonda.verificar())
+    assert sonda.error == "HTTP 503"
+    
+    sonda = crear_sonda(sin_respuesta)
+    assert not asyncio.run(sonda.verificar())
+    assert sonda.error.startswith("ConnectTimeout")
+
+
+def test_error_inesperado_no_detiene_la_vigilancia():
+    """Verifica que cualquier excepción marque la desconexión y se siga."""
+    llamadas = []
+    
+    def manejador(peticion: httpx.Request) -> httpx.Response:
+        llamadas.append(peticion)
+        if len(llamadas) == 1:
+            raise ValueError("respuesta ilegible")
+        return httpx.Response(200)
+    
+    sonda = crear_sonda(manejador)
+    sonda.intervalo_segundos = 0.01
+    
+    assert not asyncio.run(sonda.verificar())
+    assert sonda.error == "ValueError: respuesta ilegible"
+    
+    async def vigilar_un_momento():
+        sonda.iniciar()
+        await asyncio.sleep(0.05)
+        await sonda.detener()
+    
+    asyncio.run(vigilar_un_momento())
+    
+    assert len(llamadas) > 2
+    assert sonda.conectado and sonda.error is None
+
+
+def test_uri_local_no_consulta_la_red():
+    """Verifica que una URI de archivo no intente conectarse."""
+    sonda = SondaMlflow("file:///tmp/mlruns", 60, 0.5)
+    
+    assert sonda.conectado
+    assert asyncio.run(sonda.verificar())